@@ -0,0 +1,238 @@
+"""
+Static asset build for CarriAcces.
+
+``python manage.py build_assets`` runs two steps before ``collectstatic``:
+
+1. Vendoring: Bootstrap, Bootstrap Icons and the Plus Jakarta Sans font are
+   downloaded once into ``static/vendor/`` so pages no longer depend on
+   third-party CDNs. Files already present are kept; Bootstrap and the icons
+   are committed, so the step only fetches what is missing (the font, which
+   is optional: without it the pages use the system font stack).
+2. Bundling: the vendored CSS and the project's own CSS are concatenated
+   into a single minified ``static/dist/carriacces.min.css``; relative
+   ``url()`` references are rewritten to stay valid from the bundle. The
+   bundle is committed too and needs no network (``build_assets --offline``,
+   as the Docker build runs it).
+
+``collectstatic`` then hashes every file (``ManifestStaticFilesStorage``) and
+WhiteNoise precompresses them with gzip and Brotli and serves the hashed
+names with far-future ``Cache-Control`` headers.
+"""
+
+import posixpath
+import re
+from pathlib import Path
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+
+BOOTSTRAP_URL = "https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist"
+BOOTSTRAP_ICONS_URL = "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.2/font"
+GOOGLE_FONTS_URL = (
+    "https://fonts.googleapis.com/css2?family=Plus+Jakarta+Sans:ital,wght@"
+    "0,200;0,300;0,400;0,500;0,600;0,700;0,800;"
+    "1,200;1,300;1,400;1,500;1,600;1,700;1,800&display=swap"
+)
+# Google Fonts only returns woff2 to browsers it recognizes
+FONTS_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+# Spanish only needs these subsets; the rest (cyrillic, vietnamese...) is
+# dropped from the vendored stylesheet
+FONT_SUBSETS = ("latin", "latin-ext")
+
+# Destination (relative to the static source dir) -> CDN URL
+VENDOR_FILES = {
+    "vendor/bootstrap/css/bootstrap.min.css": f"{BOOTSTRAP_URL}/css/bootstrap.min.css",
+    "vendor/bootstrap/js/bootstrap.bundle.min.js": (
+        f"{BOOTSTRAP_URL}/js/bootstrap.bundle.min.js"
+    ),
+    "vendor/bootstrap-icons/bootstrap-icons.css": (
+        f"{BOOTSTRAP_ICONS_URL}/bootstrap-icons.css"
+    ),
+    "vendor/bootstrap-icons/fonts/bootstrap-icons.woff2": (
+        f"{BOOTSTRAP_ICONS_URL}/fonts/bootstrap-icons.woff2"
+    ),
+    "vendor/bootstrap-icons/fonts/bootstrap-icons.woff": (
+        f"{BOOTSTRAP_ICONS_URL}/fonts/bootstrap-icons.woff"
+    ),
+}
+FONTS_CSS = "vendor/fonts/plus-jakarta-sans.css"
+FONTS_DIR = "vendor/fonts/plus-jakarta-sans"
+
+# Order matters: later rules override earlier ones, as with the old <link>s
+CSS_BUNDLE = (
+    FONTS_CSS,
+    "vendor/bootstrap/css/bootstrap.min.css",
+    "vendor/bootstrap-icons/bootstrap-icons.css",
+    "css/carriacces.css",
+    "css/layout.css",
+)
+CSS_BUNDLE_OUTPUT = "dist/carriacces.min.css"
+# Left out of the bundle while not vendored (needs network to download)
+OPTIONAL_CSS = (FONTS_CSS,)
+
+SOURCE_MAP_RE = re.compile(r"(?://|/\*)# sourceMappingURL=[^\s*]*(?:\s*\*/)?")
+URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+FONT_FACE_RE = re.compile(
+    r"/\* (?P<subset>[\w-]+) \*/\s*(?P<rule>@font-face\s*{[^}]*})"
+)
+# A quoted string (group 1, kept) or a comment (dropped)
+TOKEN_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/""", re.DOTALL)
+
+
+def static_source_dir():
+    """Return the project static directory (the first ``STATICFILES_DIRS``)."""
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def download(url, user_agent=None):
+    """Return the body of ``url`` as bytes."""
+    headers = {"User-Agent": user_agent} if user_agent else {}
+    with urlopen(Request(url, headers=headers), timeout=30) as response:
+        return response.read()
+
+
+def strip_source_maps(content):
+    """
+    Drop ``sourceMappingURL`` comments.
+
+    The maps are not vendored, and ``ManifestStaticFilesStorage`` fails on
+    references to files that do not exist.
+    """
+    return SOURCE_MAP_RE.sub("", content)
+
+
+def vendor_assets(root, fetch=download):
+    """
+    Download the CDN assets missing under ``root``.
+
+    Args:
+        root: Static source directory
+        fetch: Callable returning the bytes of a URL
+
+    Returns:
+        List of the paths written, relative to ``root``
+    """
+    written = []
+    for name, url in VENDOR_FILES.items():
+        path = root / name
+        if path.exists():
+            continue
+        content = fetch(url)
+        if path.suffix in (".css", ".js"):
+            content = strip_source_maps(content.decode("utf-8")).encode("utf-8")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        written.append(name)
+
+    if not (root / FONTS_CSS).exists():
+        written.extend(vendor_google_fonts(root, fetch))
+    return written
+
+
+def vendor_google_fonts(root, fetch=download):
+    """Download the Plus Jakarta Sans woff2 files and a local stylesheet."""
+    css = fetch(GOOGLE_FONTS_URL, user_agent=FONTS_USER_AGENT).decode("utf-8")
+    written = []
+    rules = []
+    for match in FONT_FACE_RE.finditer(css):
+        if match["subset"] not in FONT_SUBSETS:
+            continue
+        rule = match["rule"]
+        for url in {m[1] for m in URL_RE.findall(rule)}:
+            name = f"{FONTS_DIR}/{posixpath.basename(url)}"
+            path = root / name
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(fetch(url))
+                written.append(name)
+            rule = rule.replace(
+                url, posixpath.relpath(name, posixpath.dirname(FONTS_CSS))
+            )
+        rules.append(f"/* {match['subset']} */\n{rule}")
+
+    (root / FONTS_CSS).parent.mkdir(parents=True, exist_ok=True)
+    (root / FONTS_CSS).write_text("\n".join(rules) + "\n", encoding="utf-8")
+    written.append(FONTS_CSS)
+    return written
+
+
+def rebase_urls(css, source, target):
+    """
+    Rewrite relative ``url()`` references of ``source`` to work from ``target``.
+
+    Args:
+        css: Stylesheet content
+        source: Path of the stylesheet, relative to the static root
+        target: Path of the file the content is moved to
+    """
+    source_dir = posixpath.dirname(source)
+    target_dir = posixpath.dirname(target)
+
+    def replace(match):
+        url = match[2].strip()
+        if url.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match[0]
+        path, suffix = re.match(r"([^?#]*)(.*)", url).groups()
+        rebased = posixpath.relpath(posixpath.join(source_dir, path), target_dir)
+        return f'url("{rebased}{suffix}")'
+
+    return URL_RE.sub(replace, css)
+
+
+def _minify_segment(css):
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return re.sub(r":\s+", ":", css)
+
+
+def minify_css(css):
+    """
+    Minify CSS conservatively: drop comments and redundant whitespace.
+
+    Quoted strings (including data URIs) are copied verbatim, and whitespace
+    before ``:`` is kept because it is significant in selectors (``a :hover``
+    is not ``a:hover``).
+    """
+    parts = []
+    plain = ""
+    position = 0
+    for match in TOKEN_RE.finditer(css):
+        plain += css[position : match.start()]
+        if match[1]:
+            parts.extend([_minify_segment(plain), match[1]])
+            plain = ""
+        else:
+            # Comments are dropped but still separate the tokens around them
+            plain += " "
+        position = match.end()
+    parts.append(_minify_segment(plain + css[position:]))
+    return "".join(parts).replace(";}", "}").strip() + "\n"
+
+
+def build_css_bundle(root, sources=CSS_BUNDLE, output=CSS_BUNDLE_OUTPUT):
+    """
+    Concatenate and minify ``sources`` into ``output``.
+
+    Missing ``OPTIONAL_CSS`` sources are skipped; any other missing source
+    raises ``FileNotFoundError``.
+
+    Returns:
+        Tuple ``(original_bytes, bundle_bytes)``
+    """
+    parts = []
+    original = 0
+    for source in sources:
+        if source in OPTIONAL_CSS and not (root / source).exists():
+            continue
+        css = (root / source).read_text(encoding="utf-8")
+        original += len(css.encode("utf-8"))
+        parts.append(rebase_urls(css, source, output))
+
+    bundle = minify_css("\n".join(parts))
+    path = root / output
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(bundle, encoding="utf-8")
+    return original, len(bundle.encode("utf-8"))
@@ -0,0 +1,135 @@
+"""
+Async variants of the CarriAcces list and detail views.
+
+Their queries use Django's async ORM (``acount``, ``aiterator``, ``afirst``)
+so that, served through ``carriacces.asgi``, a worker keeps handling other
+connections while a query or a slow client is pending. Independent queries
+of a page, the paginated slice and the total count, are awaited together.
+
+Templates are still rendered synchronously: Django renders a
+``TemplateResponse`` returned by an async view in a worker thread, so lazy
+lookups made by templates and context processors keep working.
+
+The URLconfs route to these views when ``settings.ASYNC_VIEWS`` is enabled.
+"""
+
+import asyncio
+
+from django.core.paginator import InvalidPage
+from django.db import transaction
+from django.http import Http404
+from django.utils.translation import gettext as _
+from carriacces.counts import aget_display_count, aget_total_count
+
+
+async def afetch(queryset):
+    """Evaluate ``queryset`` with ``aiterator()`` and return a list."""
+    return [obj async for obj in queryset.aiterator()]
+
+
+class AsyncViewMixin:
+    """
+    Base de las vistas asíncronas de solo lectura.
+
+    Django no permite ``ATOMIC_REQUESTS`` en vistas async, así que se
+    excluyen de la transacción por petición; solo leen datos.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return transaction.non_atomic_requests(super().as_view(**initkwargs))
+
+
+class AsyncListMixin(AsyncViewMixin):
+    """
+    Mixin que vuelve asíncrona una ListView con ``CachedCountMixin`` y
+    ``KeysetPaginationMixin``.
+
+    Las consultas se resuelven en ``get`` antes de ``get_context_data``, que
+    reutiliza la página y el total ya obtenidos; así las vistas síncronas y
+    asíncronas comparten el mismo contexto y plantillas.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        page_size = self.get_paginate_by(self.object_list)
+
+        # El total se calcula mientras se obtiene la página
+        total = asyncio.ensure_future(aget_total_count(self.model))
+        try:
+            if page_size:
+                self.async_page = await self.apaginate_queryset(
+                    self.object_list, page_size, total
+                )
+            self.total_count = await total
+        finally:
+            total.cancel()
+        self.display_count = await aget_display_count(self.model, self.total_count)
+
+        context = self.get_context_data()
+        return self.render_to_response(context)
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.async_page
+
+    def get_total_count(self):
+        return self.total_count
+
+    def get_display_count(self):
+        return self.display_count
+
+    async def apaginate_queryset(self, queryset, page_size, total):
+        """
+        Async version of ``paginate_queryset``.
+
+        Args:
+            queryset: Queryset to paginate
+            page_size: Rows per page
+            total: Awaitable with the unfiltered total of the model
+        """
+        if self.use_keyset_pagination():
+            queryset, token, direction = self.get_keyset_queryset(queryset, page_size)
+            rows = await afetch(queryset)
+            return self.build_keyset_page(rows, page_size, token, direction)
+
+        orphans = self.get_paginate_orphans()
+        options = {"orphans": orphans, "allow_empty_first_page": self.get_allow_empty()}
+        page = self.kwargs.get(self.page_kwarg) or self.request.GET.get(
+            self.page_kwarg, 1
+        )
+        try:
+            number = int(page)
+        except ValueError:
+            if page != "last":
+                raise Http404(
+                    _("Page is not “last”, nor can it be converted to an int.")
+                )
+            number = None
+
+        count = total if not queryset.query.has_filters() else queryset.acount()
+        if number is None:
+            # "last" necesita el total antes de saber qué filas pedir
+            count = await count
+            paginator = self.get_paginator(queryset, page_size, total=count, **options)
+            number = paginator.num_pages
+            bottom = max(number - 1, 0) * page_size
+            rows = await afetch(queryset[bottom : bottom + page_size + orphans])
+        else:
+            bottom = max(number - 1, 0) * page_size
+            count, rows = await asyncio.gather(
+                count, afetch(queryset[bottom : bottom + page_size + orphans])
+            )
+            paginator = self.get_paginator(queryset, page_size, total=count, **options)
+
+        try:
+            number = paginator.validate_number(number)
+        except InvalidPage as e:
+            raise Http404(
+                _("Invalid page (%(page_number)s): %(message)s")
+                % {"page_number": page, "message": str(e)}
+            )
+        # Igual que Paginator.page(): los huérfanos se suman a la última página
+        if bottom + page_size + orphans < count:
+            rows = rows[:page_size]
+        page = paginator._get_page(rows, number, paginator)
+        return (paginator, page, page.object_list, page.has_other_pages())
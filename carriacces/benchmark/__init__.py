@@ -0,0 +1,13 @@
+"""
+Load benchmark of the CarriAcces catalogs.
+
+``seed`` fills the database with thousands of productos, proveedores and
+trabajadores using ``bulk_create``; ``runner`` drives their list, create,
+update and delete views, either in process through the Django test client
+or against a running server over HTTP, and summarizes latency percentiles,
+queries per request and memory in a JSON report that can be compared with
+the one of another commit. ``templates`` measures the render cost of the
+list cards under each template profile.
+
+Run it with ``python manage.py benchmark``.
+"""
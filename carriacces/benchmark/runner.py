@@ -0,0 +1,311 @@
+"""
+Drive the catalog views and summarize the measurements.
+
+Two modes:
+
+- ``run_client`` goes through the whole middleware stack in process with
+  ``django.test.Client`` and covers list, create, update and delete. Queries
+  per request come from ``response.request_metrics`` (see
+  ``carriacces.instrumentation``) and RSS is the one of the process serving
+  the requests.
+- ``run_http`` sends concurrent GET requests of the list views to a running
+  server. Unsafe methods need a CSRF token, so only lists are measured;
+  queries are read from the ``Server-Timing`` header and RSS is the one of
+  the load generator, not the server's.
+
+Reports are plain dicts, written as JSON with sorted keys so two runs can
+be diffed, or compared with ``compare_reports``.
+"""
+
+import json
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from statistics import fmean, quantiles
+from time import perf_counter
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from carriacces.benchmark.seed import FACTORIES, seeded_queryset
+
+CATALOGS = tuple(FACTORIES)
+
+SERVER_TIMING_QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+class BenchmarkError(Exception):
+    """A benchmark request did not get the expected response."""
+
+
+def create_payload(catalog, index):
+    """Form data creating a new object; ``index`` keeps unique fields apart."""
+    if catalog == "productos":
+        return {
+            "nombre": f"Nuevo Producto {index:06d}",
+            "descripcion": "Producto creado por el benchmark de carga.",
+            "precio": "19.99",
+            "iva": "15",
+        }
+    if catalog == "proveedores":
+        return {
+            "nombre": f"Nuevo Proveedor {index:06d}",
+            "descripcion": "Proveedor creado por el benchmark de carga.",
+            "telefono": "+593991234567",
+            "pais": "Ecuador",
+            "correo": f"nuevo{index}@bench.carriacces.test",
+            "direccion": "Av. Principal 123 y Secundaria",
+        }
+    return {
+        "nombre": "Nuevo",
+        "apellido": "Trabajador",
+        "correo": f"nuevo{index}@bench.carriacces.test",
+        "cedula": f"{8000000000 + index}",
+        "codigo_empleado": f"NUEVO{index:06d}",
+    }
+
+
+def update_payload(catalog, obj):
+    """Form data saving ``obj`` again with its own values."""
+    fields = create_payload(catalog, 0)
+    return {name: str(getattr(obj, name)) for name in fields}
+
+
+def percentile(values, percent):
+    """Return the ``percent`` percentile of ``values`` (inclusive method)."""
+    if len(values) == 1:
+        return values[0]
+    return quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def summarize(samples):
+    """
+    Summarize ``(latency_seconds, queries)`` samples of one scenario.
+
+    Returns:
+        Dict with the request count, latency percentiles in ms and the
+        mean/max queries per request
+    """
+    latencies = [latency * 1000 for latency, _ in samples]
+    queries = [count for _, count in samples]
+    return {
+        "requests": len(samples),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "mean": round(fmean(latencies), 3),
+            "max": round(max(latencies), 3),
+        },
+        "queries": {
+            "mean": round(fmean(queries), 2),
+            "max": max(queries),
+        },
+    }
+
+
+def rss():
+    """Return the current and peak resident memory of this process, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        current_mb = pages * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        current_mb = peak_mb
+    peak_mb = max(peak_mb, current_mb)
+    return {"current": round(current_mb, 1), "peak": round(peak_mb, 1)}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _timed(send, *args):
+    start = perf_counter()
+    response = send(*args)
+    return response, perf_counter() - start
+
+
+def _check(response, expected, scenario):
+    if response.status_code != expected:
+        raise BenchmarkError(
+            f"{scenario}: expected status {expected}, got {response.status_code}"
+        )
+
+
+def run_client(catalogs=CATALOGS, iterations=50, warmup=1):
+    """
+    Benchmark list, create, update and delete of ``catalogs`` in process.
+
+    Each iteration lists the first page, creates an object, updates a seeded
+    one and deletes the object it created, so the table size stays the same.
+    The first ``warmup`` iterations are not recorded.
+
+    Returns:
+        ``{"<catalog>:<action>": summary}``
+
+    Raises:
+        BenchmarkError: If a view answers with an unexpected status, e.g. a
+            form rejected by validation
+    """
+    client = Client()
+    samples = {}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+        for catalog in catalogs:
+            model = FACTORIES[catalog][0]
+            targets = list(seeded_queryset(catalog).order_by("pk")[:iterations])
+            if not targets:
+                raise BenchmarkError(f"{catalog}: no seeded rows to update")
+            list_url = reverse(f"{catalog}:list")
+            create_url = reverse(f"{catalog}:create")
+
+            for iteration in range(warmup + iterations):
+                results = []
+
+                response, latency = _timed(client.get, list_url)
+                _check(response, 200, f"{catalog}:list")
+                results.append(("list", response, latency))
+
+                data = create_payload(catalog, iteration)
+                response, latency = _timed(client.post, create_url, data)
+                _check(response, 302, f"{catalog}:create")
+                results.append(("create", response, latency))
+                created = model._default_manager.latest("pk")
+
+                target = targets[iteration % len(targets)]
+                url = reverse(f"{catalog}:update", args=[target.pk])
+                data = update_payload(catalog, target)
+                response, latency = _timed(client.post, url, data)
+                _check(response, 302, f"{catalog}:update")
+                results.append(("update", response, latency))
+
+                url = reverse(f"{catalog}:delete", args=[created.pk])
+                response, latency = _timed(client.post, url)
+                _check(response, 302, f"{catalog}:delete")
+                results.append(("delete", response, latency))
+
+                if iteration < warmup:
+                    continue
+                for action, response, latency in results:
+                    samples.setdefault(f"{catalog}:{action}", []).append(
+                        (latency, response.request_metrics.queries)
+                    )
+
+    return {scenario: summarize(values) for scenario, values in samples.items()}
+
+
+def _fetch(url):
+    start = perf_counter()
+    try:
+        with urlopen(url) as response:
+            response.read()
+            status, timing = response.status, response.headers.get("Server-Timing")
+    except HTTPError as error:
+        status, timing = error.code, None
+    latency = perf_counter() - start
+    match = SERVER_TIMING_QUERIES_RE.search(timing or "")
+    return status, latency, int(match.group(1)) if match else 0
+
+
+def run_http(base_url, catalogs=CATALOGS, iterations=50, concurrency=4, warmup=1):
+    """
+    Benchmark the list views of a running server at ``base_url``.
+
+    ``iterations`` requests per catalog are sent from ``concurrency``
+    threads, after ``warmup`` requests that are not recorded.
+
+    Returns:
+        ``{"<catalog>:list": summary}``
+    """
+    base_url = base_url.rstrip("/")
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for catalog in catalogs:
+            url = base_url + reverse(f"{catalog}:list")
+            for _ in range(warmup):
+                _fetch(url)
+            samples = []
+            for status, latency, queries in pool.map(_fetch, [url] * iterations):
+                if status != 200:
+                    raise BenchmarkError(
+                        f"{catalog}:list: expected status 200, got {status}"
+                    )
+                samples.append((latency, queries))
+            results[f"{catalog}:list"] = summarize(samples)
+    return results
+
+
+def build_report(scenarios, mode, iterations, sizes, seed_seconds=None):
+    """Wrap the scenario summaries with the context needed to compare runs."""
+    return {
+        "meta": {
+            "commit": git_revision(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "mode": mode,
+            "iterations": iterations,
+            "sizes": sizes,
+            "seed_seconds": seed_seconds,
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "rss_mb": rss(),
+        "scenarios": scenarios,
+    }
+
+
+def write_report(report, path):
+    Path(path).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def load_report(path):
+    return json.loads(Path(path).read_text())
+
+
+def compare_reports(old, new):
+    """
+    Compare the p95 latency and mean queries of the scenarios of two reports.
+
+    Returns:
+        List of ``(scenario, old_p95, new_p95, change_percent, old_queries,
+        new_queries)`` for the scenarios present in both
+    """
+    rows = []
+    for scenario, current in sorted(new["scenarios"].items()):
+        previous = old["scenarios"].get(scenario)
+        if previous is None:
+            continue
+        old_p95 = previous["latency_ms"]["p95"]
+        new_p95 = current["latency_ms"]["p95"]
+        change = (new_p95 - old_p95) / old_p95 * 100 if old_p95 else 0.0
+        rows.append(
+            (
+                scenario,
+                old_p95,
+                new_p95,
+                round(change, 1),
+                previous["queries"]["mean"],
+                current["queries"]["mean"],
+            )
+        )
+    return rows
@@ -0,0 +1,129 @@
+"""
+Fast deterministic generator of benchmark rows.
+
+Rows are built in memory from a seeded ``random.Random`` and written with
+``bulk_create``, so seeding tens of thousands of rows takes seconds. Every
+generated value passes the validation of the app's ModelForm, and the
+natural keys carry the ``SEED_PREFIX``/index so repeated runs only add the
+missing rows.
+"""
+
+import random
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+from carriacces.cache import bump_model_version
+from carriacces.counts import invalidate_total_count
+from productos.models import Producto
+from proveedores.models import Proveedor
+from trabajadores.models import Trabajador
+
+SEED_PREFIX = "Bench"
+DEFAULT_BATCH_SIZE = 1000
+
+PALABRAS = (
+    "acero",
+    "aluminio",
+    "cromado",
+    "deportivo",
+    "original",
+    "reforzado",
+    "resistente",
+    "universal",
+    "liviano",
+    "importado",
+)
+NOMBRES = ("Ana", "Carlos", "Diana", "Jorge", "Lucia", "Mario", "Paola", "Rafael")
+APELLIDOS = ("Andrade", "Bravo", "Castro", "Mora", "Ortiz", "Vera", "Zambrano")
+PAISES = ("Ecuador", "Colombia", "Peru", "Chile", "Mexico", "Estados Unidos")
+
+
+def _descripcion(rng):
+    return " ".join(rng.choice(PALABRAS) for _ in range(8)).capitalize() + "."
+
+
+def producto_factory(index, rng):
+    return Producto(
+        nombre=f"{SEED_PREFIX} Producto {index:06d}",
+        descripcion=_descripcion(rng),
+        precio=Decimal(rng.randint(100, 99999)) / 100,
+        iva=rng.choice((0, 15)),
+    )
+
+
+def proveedor_factory(index, rng):
+    return Proveedor(
+        nombre=f"{SEED_PREFIX} Proveedor {index:06d}",
+        descripcion=_descripcion(rng),
+        telefono=f"+5939{rng.randint(0, 99999999):08d}",
+        pais=rng.choice(PAISES),
+        correo=f"proveedor{index}@bench.carriacces.test",
+        direccion=f"Av. {rng.choice(APELLIDOS)} {index} y {rng.choice(APELLIDOS)}",
+    )
+
+
+def trabajador_factory(index, rng):
+    return Trabajador(
+        nombre=rng.choice(NOMBRES),
+        apellido=rng.choice(APELLIDOS),
+        correo=f"trabajador{index}@bench.carriacces.test",
+        cedula=f"{9000000000 + index}",
+        codigo_empleado=f"{SEED_PREFIX.upper()}{index:06d}",
+    )
+
+
+# Catalog -> (model, factory, lookup matching the generated rows)
+FACTORIES = {
+    "productos": (Producto, producto_factory, {"nombre__startswith": SEED_PREFIX}),
+    "proveedores": (Proveedor, proveedor_factory, {"nombre__startswith": SEED_PREFIX}),
+    "trabajadores": (
+        Trabajador,
+        trabajador_factory,
+        {"codigo_empleado__startswith": SEED_PREFIX.upper()},
+    ),
+}
+
+
+def seeded_queryset(catalog):
+    """Return the rows of ``catalog`` created by the generator."""
+    model, _, lookup = FACTORIES[catalog]
+    return model._default_manager.filter(**lookup)
+
+
+def seed_catalog(catalog, count, seed=0, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Make sure ``catalog`` holds ``count`` generated rows.
+
+    Args:
+        catalog: Key of ``FACTORIES``
+        count: Number of generated rows wanted
+        seed: Seed of the random generator; the same seed gives the same rows
+        batch_size: Rows per INSERT
+
+    Returns:
+        Number of rows created
+    """
+    model, factory, _ = FACTORIES[catalog]
+    start = seeded_queryset(catalog).count()
+    if start >= count:
+        return 0
+
+    rng = random.Random(f"{seed}:{catalog}:{start}")
+    rows = (factory(index, rng) for index in range(start, count))
+    with transaction.atomic():
+        while batch := list(islice(rows, batch_size)):
+            model._default_manager.bulk_create(batch, batch_size=batch_size)
+
+    # bulk_create skips the signals that invalidate the caches
+    invalidate_total_count(model)
+    bump_model_version(model)
+    return count - start
+
+
+def seed_catalogs(counts, seed=0, batch_size=DEFAULT_BATCH_SIZE):
+    """Seed several catalogs; ``counts`` maps catalog to rows wanted."""
+    return {
+        catalog: seed_catalog(catalog, count, seed=seed, batch_size=batch_size)
+        for catalog, count in counts.items()
+    }
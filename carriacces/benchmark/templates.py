@@ -0,0 +1,130 @@
+"""
+Per-card render cost of the list grids under each template profile.
+
+A grid template with the same ``{% for %}``/``{% include %}`` loop as the
+list pages is rendered with a page of unsaved cards, on a fresh engine per
+profile:
+
+- ``uncached``: no cached loader, every render parses the templates again;
+- ``development``: Django's cached loader (the setting before profiles);
+- ``production``: ``carriacces.template_loaders.CachedLoader``, with the
+  includes bound at load time.
+
+Cards are measured ``cold`` (a new ``card_version`` every round, so the
+``{% cache %}`` fragment is rendered) and ``warm`` (served from the fragment
+cache). A private LocMemCache is used so no real cache is written to.
+"""
+
+import random
+from statistics import median
+from time import perf_counter
+
+from django.conf import settings
+from django.template import Context, Engine, engines
+from django.test import override_settings
+from carriacces.benchmark.seed import FACTORIES
+
+GRID_NAME = "benchmark/grid.html"
+GRID_SOURCE = (
+    "{%% for %(var)s in objects %%}<div>{%% include '%(card)s' %%}</div>{%% endfor %%}"
+)
+
+# Catalog -> (card template, context variable of each card)
+CARDS = {
+    "productos": ("components/producto_card.html", "producto"),
+    "proveedores": ("components/proveedor_card.html", "proveedor"),
+    "trabajadores": ("components/trabajador_card.html", "trabajador"),
+}
+
+PROFILES = ("uncached", "development", "production")
+LABELS = ("cold_us", "warm_us")
+
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "carriacces-template-benchmark",
+    }
+}
+
+
+def build_engine(profile, catalog):
+    """Return a new engine configured like the project for ``profile``."""
+    card, var = CARDS[catalog]
+    base = engines["django"].engine
+    loaders = [
+        (
+            "django.template.loaders.locmem.Loader",
+            {GRID_NAME: GRID_SOURCE % {"var": var, "card": card}},
+        ),
+        *settings.TEMPLATE_LOADERS[0][1],
+    ]
+    if profile != "uncached":
+        loaders = [(settings.TEMPLATE_CACHED_LOADERS[profile], loaders)]
+    return Engine(
+        dirs=base.dirs,
+        loaders=loaders,
+        libraries=base.libraries,
+        builtins=[
+            name for name in base.builtins if name not in Engine.default_builtins
+        ],
+        debug=False,
+    )
+
+
+def sample_objects(catalog, count):
+    """Build ``count`` unsaved objects with a pk, as a list page shows them."""
+    _, factory, _ = FACTORIES[catalog]
+    rng = random.Random(catalog)
+    objects = []
+    for index in range(count):
+        obj = factory(index, rng)
+        obj.pk = index + 1
+        objects.append(obj)
+    return objects
+
+
+def render_grid(engine, objects, version):
+    """Load and render the grid as a view does; return the elapsed seconds."""
+    start = perf_counter()
+    engine.get_template(GRID_NAME).render(
+        Context({"objects": objects, "card_version": version})
+    )
+    return perf_counter() - start
+
+
+def run_templates(catalogs=tuple(CARDS), cards=15, rounds=200):
+    """
+    Measure the render cost per card of every profile and catalog.
+
+    The profiles take turns within each round, so a slower stretch of the
+    machine affects them all alike.
+
+    Returns:
+        ``{"<catalog>:<profile>": {"cold_us": ..., "warm_us": ...}}`` with
+        the median microseconds per card
+    """
+    results = {}
+    with override_settings(CACHES=BENCHMARK_CACHES):
+        for catalog in catalogs:
+            objects = sample_objects(catalog, cards)
+            engines_by_profile = {
+                profile: build_engine(profile, catalog) for profile in PROFILES
+            }
+            times = {(profile, label): [] for profile in PROFILES for label in LABELS}
+            for profile, engine in engines_by_profile.items():
+                # Compile (and bind) outside the measurement
+                render_grid(engine, objects, f"{profile}-warm")
+            for round_number in range(rounds):
+                for profile, engine in engines_by_profile.items():
+                    times[profile, "cold_us"].append(
+                        render_grid(engine, objects, f"{profile}-{round_number}")
+                    )
+                    times[profile, "warm_us"].append(
+                        render_grid(engine, objects, f"{profile}-warm")
+                    )
+            for profile in PROFILES:
+                results[f"{catalog}:{profile}"] = {
+                    label: round(median(times[profile, label]) / cards * 1e6, 2)
+                    for label in LABELS
+                }
+    return results
@@ -0,0 +1,158 @@
+"""
+Versioned caching helpers for CarriAcces.
+
+Each model has a version token stored in the cache. Page and fragment cache
+keys include the versions of the models they depend on, and the ``signals``
+module of every app bumps the version on ``post_save``/``post_delete``, so
+cached HTML is dropped exactly when the underlying data changes.
+"""
+
+import hashlib
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import urlencode
+from carriacces.routers import replica_cache_timeout
+
+VERSION_PREFIX = "carriacces:version"
+PAGE_PREFIX = "carriacces:page"
+
+
+def _version_key(label):
+    return f"{VERSION_PREFIX}:{label.lower()}"
+
+
+def _label(model):
+    return model if isinstance(model, str) else model._meta.label
+
+
+def get_model_versions(*models):
+    """
+    Return the current version token of each model.
+
+    Args:
+        models: Model classes or "app_label.ModelName" strings
+
+    Returns:
+        List of version tokens, in the same order as ``models``
+    """
+    keys = [_version_key(_label(model)) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+async def aget_model_versions(*models):
+    """Async version of ``get_model_versions``."""
+    keys = [_version_key(_label(model)) for model in models]
+    versions = await cache.aget_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        await cache.aset_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model):
+    """Invalidate every cache entry that depends on ``model``."""
+    key = _version_key(_label(model))
+    cache.set(key, uuid4().hex, None)
+    # Bump again on COMMIT: a concurrent reader may have cached the old rows
+    # under the new version before the transaction became visible
+    transaction.on_commit(lambda: cache.set(key, uuid4().hex, None))
+
+
+def page_cache_key(path, params, versions):
+    """
+    Return the cache key of a page.
+
+    The path and the query parameters (only those in ``params``, sorted) are
+    hashed, so the key has a fixed length whatever the URL.
+    """
+    query = urlencode(sorted(params.items()))
+    digest = hashlib.md5(f"{path}?{query}".encode()).hexdigest()
+    return ":".join([PAGE_PREFIX, digest, *versions])
+
+
+class VersionedCachePageMixin:
+    """
+    Mixin para vistas que cachea la página completa por versión de modelos.
+
+    ``cache_models`` lista los modelos de los que depende la página. Solo se
+    cachean respuestas GET/HEAD con estado 200 y sin mensajes pendientes, ya
+    que los mensajes son propios de cada usuario. ``cache_query_params``
+    lista los parámetros de la URL que cambian la página; los demás no
+    forman parte de la clave, así que no crean entradas nuevas.
+    """
+
+    cache_models = ()
+    cache_query_params = ()
+    cache_timeout = None
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return replica_cache_timeout(self.cache_timeout)
+        return replica_cache_timeout(getattr(settings, "PAGE_CACHE_TIMEOUT", 600))
+
+    def get_page_cache_params(self):
+        return {
+            name: self.request.GET[name]
+            for name in self.cache_query_params
+            if self.request.GET.get(name)
+        }
+
+    def get_page_cache_key(self):
+        versions = get_model_versions(*self.cache_models)
+        return page_cache_key(self.request.path, self.get_page_cache_params(), versions)
+
+    async def aget_page_cache_key(self):
+        versions = await aget_model_versions(*self.cache_models)
+        return page_cache_key(self.request.path, self.get_page_cache_params(), versions)
+
+    def store_page(self, key, response):
+        """Guarda la respuesta si es cacheable (tras renderizarla)."""
+        if response.status_code == 200 and not response.streaming:
+            timeout = self.get_cache_timeout()
+            if hasattr(response, "render") and callable(response.render):
+                response.add_post_render_callback(lambda r: cache.set(key, r, timeout))
+            else:
+                cache.set(key, response, timeout)
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.adispatch(request, *args, **kwargs)
+
+        if request.method not in ("GET", "HEAD") or len(messages.get_messages(request)):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = self.get_page_cache_key()
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        self.store_page(key, response)
+        return response
+
+    async def adispatch(self, request, *args, **kwargs):
+        """Versión de ``dispatch`` para vistas asíncronas."""
+        # Los mensajes pueden leerse de la sesión, que consulta la base
+        pending = await sync_to_async(len)(messages.get_messages(request))
+        if request.method not in ("GET", "HEAD") or pending:
+            return await super().dispatch(request, *args, **kwargs)
+
+        key = await self.aget_page_cache_key()
+        response = await cache.aget(key)
+        if response is not None:
+            return response
+
+        response = await super().dispatch(request, *args, **kwargs)
+        self.store_page(key, response)
+        return response
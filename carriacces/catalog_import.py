@@ -0,0 +1,385 @@
+"""
+Bulk import of productos, proveedores and trabajadores from CSV or XLSX.
+
+Rows are streamed from the file and handled in batches:
+
+1. Each row is validated with the field rules of the app's ModelForm
+   (``clean()`` of every field plus the form's ``clean_<field>`` hooks) and
+   the model's ``clean_fields()``/``clean()``, reusing a single unbound form
+   instead of building one per row. No queries are made per row.
+2. Rows are matched to existing objects by their natural key (``nombre``,
+   case-insensitive, or ``codigo_empleado``) with one query per batch; other
+   unique fields are checked with one ``find_taken_values`` query.
+3. New objects are written with ``bulk_create`` and existing ones with
+   ``bulk_update``. If the database still rejects the batch, it is retried
+   row by row so that only the offending rows are reported.
+
+Bulk writes skip model signals, so the cached totals and card versions are
+invalidated once at the end. The PostgreSQL search vector is maintained by
+a trigger and needs nothing here.
+
+XLSX support requires the optional ``openpyxl`` package.
+"""
+
+import csv
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+from django.apps import apps
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import FileField, Q
+from django.db.models.functions import Upper
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from carriacces.cache import bump_model_version
+from carriacces.counts import invalidate_total_count
+from carriacces.forms import find_taken_values
+
+DEFAULT_BATCH_SIZE = 1000
+
+CatalogSpec = namedtuple(
+    "CatalogSpec",
+    ["model", "form", "key", "case_insensitive_key", "unique_fields"],
+    defaults=(False, ()),
+)
+
+CATALOGS = {
+    "productos": CatalogSpec(
+        "productos.Producto",
+        "productos.forms.ProductoForm",
+        key="nombre",
+        case_insensitive_key=True,
+    ),
+    "proveedores": CatalogSpec(
+        "proveedores.Proveedor",
+        "proveedores.forms.ProveedorForm",
+        key="nombre",
+        case_insensitive_key=True,
+    ),
+    "trabajadores": CatalogSpec(
+        "trabajadores.Trabajador",
+        "trabajadores.forms.TrabajadorForm",
+        key="codigo_empleado",
+        unique_fields=("correo", "cedula"),
+    ),
+}
+
+# Outcome of an import; errors is a list of (line, message)
+ImportResult = namedtuple("ImportResult", ["created", "updated", "errors"])
+
+
+def _cell(value):
+    return "" if value is None else str(value).strip()
+
+
+@contextmanager
+def open_rows(path, file_format=None, delimiter=","):
+    """
+    Open a CSV or XLSX file for streaming.
+
+    Yields:
+        Tuple ``(header, rows)``: the column names, lowercased, and an
+        iterator of ``(line_number, values)``
+
+    Raises:
+        ValueError: If the format is not supported
+        ImportError: For XLSX files when openpyxl is not installed
+    """
+    file_format = file_format or Path(path).suffix.lower().lstrip(".")
+
+    if file_format == "csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            header = [_cell(name).lower() for name in next(reader, [])]
+            yield header, ((reader.line_num, row) for row in reader)
+
+    elif file_format == "xlsx":
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError("XLSX import requires openpyxl: pip install openpyxl")
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [_cell(name).lower() for name in next(rows, ())]
+            yield header, enumerate(rows, start=2)
+        finally:
+            workbook.close()
+
+    else:
+        raise ValueError(f"Unsupported file format: {file_format!r}")
+
+
+class RowCleaner:
+    """
+    Validate plain rows with the rules of a ModelForm.
+
+    One unbound form is built up front; for every row its fields' ``clean()``
+    and the form's ``clean_<field>`` hooks run against ``form.cleaned_data``.
+    File fields are not importable and are skipped.
+    """
+
+    def __init__(self, form_class, columns):
+        self.form = form_class()
+        self.model = self.form._meta.model
+        file_fields = {
+            field.name
+            for field in self.model._meta.fields
+            if isinstance(field, FileField)
+        }
+        self.fields = [
+            name
+            for name in self.form.fields
+            if name in columns and name not in file_fields
+        ]
+        self.missing = [
+            name
+            for name, field in self.form.fields.items()
+            if field.required and name not in columns
+        ]
+        self.excluded = [
+            field.name
+            for field in self.model._meta.fields
+            if field.name not in self.fields
+        ]
+
+    def clean(self, values):
+        """
+        Return ``(instance, errors)`` for a row given as ``{column: text}``.
+
+        ``instance`` is an unsaved model instance holding the cleaned values,
+        or None when ``errors`` (``{field: [messages]}``) is not empty.
+        """
+        form = self.form
+        form.cleaned_data = {}
+        errors = {}
+        for name in self.fields:
+            hook = getattr(form, f"clean_{name}", None)
+            try:
+                form.cleaned_data[name] = form.fields[name].clean(values.get(name, ""))
+                if hook is not None:
+                    form.cleaned_data[name] = hook()
+            except ValidationError as error:
+                form.cleaned_data.pop(name, None)
+                errors[name] = error.messages
+        if errors:
+            return None, errors
+
+        instance = self.model(**form.cleaned_data)
+        try:
+            instance.clean_fields(exclude=self.excluded)
+            instance.clean()
+        except ValidationError as error:
+            if hasattr(error, "error_dict"):
+                return None, error.message_dict
+            return None, {NON_FIELD_ERRORS: error.messages}
+        return instance, {}
+
+
+class CatalogImporter:
+    """
+    Import rows into one catalog, upserting on its natural key.
+
+    Args:
+        spec: Entry of ``CATALOGS``
+        header: Column names of the file
+        batch_size: Rows validated and written together
+        dry_run: Validate and match rows without writing anything
+    """
+
+    def __init__(self, spec, header, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+        self.spec = spec
+        self.model = apps.get_model(spec.model)
+        self.header = header
+        self.cleaner = RowCleaner(import_string(spec.form), set(header))
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.update_fields = list(self.cleaner.fields)
+        if any(field.name == "updated_at" for field in self.model._meta.fields):
+            self.update_fields.append("updated_at")
+        self.unique_messages = getattr(self.cleaner.form, "unique_error_messages", {})
+        # Natural key / unique value -> first line that used it
+        self.seen = {}
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+
+    @property
+    def missing_columns(self):
+        return self.cleaner.missing
+
+    def run(self, rows):
+        """Import ``rows`` (``(line, values)`` pairs) and return an ImportResult."""
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            self.import_batch(batch)
+
+        if (self.created or self.updated) and not self.dry_run:
+            invalidate_total_count(self.model)
+            bump_model_version(self.model)
+        return ImportResult(self.created, self.updated, self.errors)
+
+    def key_of(self, value):
+        if self.spec.case_insensitive_key:
+            return value.upper()
+        return value
+
+    def add_errors(self, line, errors):
+        for field, messages in errors.items():
+            for message in messages:
+                self.errors.append((line, f"{field}: {message}"))
+
+    def import_batch(self, batch):
+        valid = []
+        for line, values in batch:
+            values = dict(zip(self.header, map(_cell, values)))
+            if not any(values.values()):
+                continue
+            instance, errors = self.cleaner.clean(values)
+            if errors:
+                self.add_errors(line, errors)
+            elif self.check_repeated(line, instance):
+                valid.append((line, instance))
+
+        existing = self.fetch_existing(
+            [getattr(instance, self.spec.key) for _, instance in valid]
+        )
+        matched = [
+            (
+                line,
+                instance,
+                existing.get(self.key_of(getattr(instance, self.spec.key))),
+            )
+            for line, instance in valid
+        ]
+        matched = self.check_unique_fields(matched)
+
+        new = [instance for _, instance, match in matched if match is None]
+        changed = []
+        now = timezone.now()
+        for _, instance, match in matched:
+            if match is not None:
+                for field in self.cleaner.fields:
+                    setattr(match, field, getattr(instance, field))
+                if "updated_at" in self.update_fields:
+                    match.updated_at = now
+                changed.append(match)
+
+        if self.dry_run:
+            self.created += len(new)
+            self.updated += len(changed)
+        else:
+            self.write(matched, new, changed)
+
+    def check_repeated(self, line, instance):
+        """Reject a row repeating a key or unique value of an earlier row."""
+        errors = {}
+        for field in (self.spec.key, *self.spec.unique_fields):
+            value = getattr(instance, field)
+            if field == self.spec.key:
+                value = self.key_of(value)
+            first = self.seen.setdefault((field, value), line)
+            if first != line:
+                errors[field] = [f"Valor repetido en el archivo (línea {first})."]
+        if errors:
+            self.add_errors(line, errors)
+            return False
+        return True
+
+    def fetch_existing(self, keys):
+        """Return ``{key: instance}`` for the stored objects matching ``keys``."""
+        if not keys:
+            return {}
+        key = self.spec.key
+        queryset = self.model._default_manager.all()
+        if self.spec.case_insensitive_key:
+            # Upper() on both sides matches the functional unique index
+            queryset = queryset.annotate(_key=Upper(key)).filter(
+                Q(_key__in={value.upper() for value in keys})
+                | Q(**{f"{key}__in": keys})
+            )
+        else:
+            queryset = queryset.filter(**{f"{key}__in": keys})
+        return {self.key_of(getattr(obj, key)): obj for obj in queryset}
+
+    def check_unique_fields(self, matched):
+        """Drop the rows whose other unique values belong to another object."""
+        fields = self.spec.unique_fields
+        if not fields or not matched:
+            return matched
+
+        owners = {
+            (field, getattr(match, field)): match.pk
+            for _, _, match in matched
+            if match is not None
+            for field in fields
+        }
+        taken = find_taken_values(
+            self.model._default_manager.exclude(
+                pk__in=[match.pk for _, _, match in matched if match is not None]
+            ),
+            {
+                field: [getattr(instance, field) for _, instance, _ in matched]
+                for field in fields
+            },
+        )
+
+        accepted = []
+        for line, instance, match in matched:
+            errors = {}
+            for field in fields:
+                value = getattr(instance, field)
+                owner = owners.get((field, value))
+                if value in taken.get(field, ()) or (
+                    owner is not None and (match is None or owner != match.pk)
+                ):
+                    errors[field] = [self.unique_message(field)]
+            if errors:
+                self.add_errors(line, errors)
+            else:
+                accepted.append((line, instance, match))
+        return accepted
+
+    def unique_message(self, field):
+        if field in self.unique_messages:
+            return self.unique_messages[field]
+        model_field = self.model._meta.get_field(field)
+        return model_field.error_messages["unique"] % {
+            "model_name": self.model._meta.verbose_name,
+            "field_label": model_field.verbose_name,
+        }
+
+    def write(self, matched, new, changed):
+        try:
+            with transaction.atomic():
+                self.model._default_manager.bulk_create(new, batch_size=self.batch_size)
+                self.model._default_manager.bulk_update(
+                    changed, self.update_fields, batch_size=self.batch_size
+                )
+        except IntegrityError:
+            # A concurrent write or an unforeseen conflict: retry one by one
+            self.write_rows(matched)
+            return
+        self.created += len(new)
+        self.updated += len(changed)
+
+    def write_rows(self, matched):
+        for line, instance, match in matched:
+            try:
+                with transaction.atomic():
+                    if match is None:
+                        # bulk_create may have assigned a pk before rolling back
+                        instance.pk = None
+                        instance.save(force_insert=True)
+                    else:
+                        match.save(update_fields=self.update_fields)
+            except IntegrityError as error:
+                self.errors.append((line, str(error)))
+                continue
+            if match is None:
+                self.created += 1
+            else:
+                self.updated += 1
@@ -0,0 +1,140 @@
+"""
+Cached total counts for CarriAcces list pages.
+
+Totals are cached per model and invalidated by ``post_save``/``post_delete``
+signals registered in each app. The list paginator reuses the cached total,
+so an unfiltered list page runs no ``COUNT(*)`` on a cache hit. The planner
+estimate enabled by ``COUNT_ESTIMATE_THRESHOLD`` only feeds the totals shown
+to users; the paginator always works on the exact count, so page numbers
+never drift from the real rows.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections, router, transaction
+from carriacces.routers import replica_cache_timeout
+
+COUNT_CACHE_PREFIX = "carriacces:count"
+
+
+def count_cache_key(model):
+    """Return the cache key holding the total rows of ``model``."""
+    return f"{COUNT_CACHE_PREFIX}:{model._meta.label_lower}"
+
+
+def estimated_count(model):
+    """
+    Return PostgreSQL's planner estimate (``pg_class.reltuples``) for a table.
+
+    Returns:
+        The estimated number of rows, or None when the backend is not
+        PostgreSQL or the table has never been analyzed
+    """
+    connection = connections[router.db_for_read(model)]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if not row or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def count_cache_timeout():
+    return replica_cache_timeout(getattr(settings, "COUNT_CACHE_TIMEOUT", 300))
+
+
+def get_total_count(model):
+    """Return the exact number of ``model`` rows, cached until the next write."""
+    key = count_cache_key(model)
+    total = cache.get(key)
+    if total is None:
+        total = model._default_manager.count()
+        cache.set(key, total, count_cache_timeout())
+    return total
+
+
+async def aget_total_count(model):
+    """Async version of ``get_total_count``, for the async list views."""
+    key = count_cache_key(model)
+    total = await cache.aget(key)
+    if total is None:
+        total = await model._default_manager.acount()
+        await cache.aset(key, total, count_cache_timeout())
+    return total
+
+
+def get_display_count(model, total=None):
+    """
+    Return the total of ``model`` rows shown to users.
+
+    When ``COUNT_ESTIMATE_THRESHOLD`` is set and the planner estimate reaches
+    it, the estimate is returned; otherwise the exact total. Never use it to
+    paginate.
+
+    Args:
+        model: Model whose rows are counted
+        total: Exact total, when the caller already has it
+    """
+    threshold = getattr(settings, "COUNT_ESTIMATE_THRESHOLD", None)
+    if threshold is not None:
+        estimate = estimated_count(model)
+        if estimate is not None and estimate >= threshold:
+            return estimate
+    return total if total is not None else get_total_count(model)
+
+
+async def aget_display_count(model, total=None):
+    """Async version of ``get_display_count``, for the async list views."""
+    threshold = getattr(settings, "COUNT_ESTIMATE_THRESHOLD", None)
+    if threshold is not None:
+        estimate = await sync_to_async(estimated_count)(model)
+        if estimate is not None and estimate >= threshold:
+            return estimate
+    return total if total is not None else await aget_total_count(model)
+
+
+def invalidate_total_count(model):
+    """Drop the cached total of ``model``; called from the app signals."""
+    key = count_cache_key(model)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that accepts an already known total instead of counting."""
+
+    def __init__(self, object_list, per_page, total=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if total is not None:
+            # Sobrescribe el cached_property para evitar el COUNT(*)
+            self.count = total
+
+
+class CachedCountMixin:
+    """
+    Mixin para ListView que comparte un total cacheado entre el paginador y
+    el contexto de la plantilla.
+    """
+
+    paginator_class = CachedCountPaginator
+
+    def get_total_count(self):
+        """Total exacto de registros del modelo, sin filtros."""
+        return get_total_count(self.model)
+
+    def get_display_count(self):
+        """Total que se muestra en la página; puede ser una estimación."""
+        return get_display_count(self.model)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        # Solo se reutiliza el total cuando el listado no está filtrado
+        if "total" not in kwargs and not queryset.query.has_filters():
+            kwargs["total"] = self.get_total_count()
+        return super().get_paginator(queryset, per_page, **kwargs)
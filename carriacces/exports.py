@@ -0,0 +1,166 @@
+"""
+Streaming CSV/JSON exports of the CarriAcces catalogs.
+
+The rows are read with ``queryset.iterator(chunk_size=...)`` (a server-side
+cursor on PostgreSQL) and written to a ``StreamingHttpResponse`` as they
+arrive, so memory stays constant whatever the size of the table.
+
+``?format=json`` switches from CSV to a JSON array, and ``?gzip=1``
+compresses the stream on the fly and downloads it as ``.gz``.
+
+Served through ``carriacces.asgi`` the body is an async generator over
+``aiterator(chunk_size=...)``: Django would buffer a sync generator whole
+(``sync_to_async(list)``) before sending it to an ASGI server.
+"""
+
+import csv
+import zlib
+
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.text import compress_sequence
+from django.views import View
+
+EXPORT_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_rows(header, rows):
+    """Yield the CSV lines of ``header`` followed by ``rows``."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def json_rows(header, rows):
+    """Yield a JSON array with one object per row, one object per chunk."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    separator = "[\n"
+    for row in rows:
+        yield separator + encoder.encode(dict(zip(header, row)))
+        separator = ",\n"
+    yield "[]\n" if separator == "[\n" else "\n]\n"
+
+
+async def acsv_rows(header, rows):
+    """Async version of ``csv_rows`` over an async iterable of rows."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    async for row in rows:
+        yield writer.writerow(row)
+
+
+async def ajson_rows(header, rows):
+    """Async version of ``json_rows`` over an async iterable of rows."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    separator = "[\n"
+    async for row in rows:
+        yield separator + encoder.encode(dict(zip(header, row)))
+        separator = ",\n"
+    yield "[]\n" if separator == "[\n" else "\n]\n"
+
+
+async def acompress_sequence(sequence):
+    """
+    Async version of ``django.utils.text.compress_sequence``.
+
+    Each chunk is flushed so the client receives it right away.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    async for chunk in sequence:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+class ExportView(View):
+    """
+    Vista base que exporta todas las filas de ``model`` en CSV o JSON.
+
+    ``export_fields`` admite campos y propiedades del modelo (por ejemplo
+    ``precio_con_iva``). Solo se leen de la base de datos los campos
+    exportados y los de ``load_fields``, así que las propiedades deben
+    depender de ellos.
+    """
+
+    model = None
+    export_fields = ()
+    load_fields = ()
+    filename = None
+    chunk_size = EXPORT_CHUNK_SIZE
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # La respuesta se genera después de que la vista retorna, fuera de
+        # la transacción por petición; no tiene sentido abrir una
+        return transaction.non_atomic_requests(super().as_view(**initkwargs))
+
+    def get_queryset(self):
+        concrete = {field.name for field in self.model._meta.concrete_fields}
+        return self.model._default_manager.order_by("pk").only(
+            *[field for field in self.export_fields if field in concrete],
+            *self.load_fields,
+        )
+
+    def get_rows(self):
+        for obj in self.get_queryset().iterator(chunk_size=self.chunk_size):
+            yield [getattr(obj, field) for field in self.export_fields]
+
+    async def aget_rows(self):
+        async for obj in self.get_queryset().aiterator(chunk_size=self.chunk_size):
+            yield [getattr(obj, field) for field in self.export_fields]
+
+    def get_content(self, request, export_format):
+        """Chunks (bytes) of the export; async when served through ASGI."""
+        if isinstance(request, ASGIRequest):
+            writer = acsv_rows if export_format == "csv" else ajson_rows
+
+            async def content():
+                async for chunk in writer(self.export_fields, self.aget_rows()):
+                    yield chunk.encode("utf-8")
+
+            return content()
+
+        writer = csv_rows if export_format == "csv" else json_rows
+        return (
+            chunk.encode("utf-8")
+            for chunk in writer(self.export_fields, self.get_rows())
+        )
+
+    def get_filename(self, export_format):
+        name = self.filename or self.model._meta.verbose_name_plural.lower()
+        return f"{name}-{timezone.localdate():%Y%m%d}.{export_format}"
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get("format", "csv")
+        if export_format not in CONTENT_TYPES:
+            return HttpResponseBadRequest("Formato de exportación no soportado.")
+
+        content = self.get_content(request, export_format)
+        filename = self.get_filename(export_format)
+        content_type = CONTENT_TYPES[export_format]
+        if request.GET.get("gzip") in ("1", "true"):
+            if isinstance(request, ASGIRequest):
+                content = acompress_sequence(content)
+            else:
+                content = compress_sequence(content)
+            filename += ".gz"
+            content_type = "application/gzip"
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,240 @@
+"""
+Faceted filtering for the CarriAcces list views.
+
+A facet is a URL parameter with a fixed set of options, each one a ``Q``
+condition (``?iva=15``, ``?imagen=con``...). The counts shown next to every
+option come from a single ``aggregate()`` with one ``Count(filter=...)`` per
+option, instead of one query per facet.
+
+Counts are disjunctive: the count of an option applies the selections of
+the *other* facets but not its own, so switching to a sibling option shows
+how many rows it would return. They are cached per filter combination under
+the model version of ``carriacces.cache``, so any write invalidates them.
+"""
+
+import hashlib
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils.http import urlencode
+from carriacces.cache import aget_model_versions, get_model_versions
+from carriacces.routers import replica_cache_timeout
+
+FACET_CACHE_PREFIX = "carriacces:facets"
+
+Facet = namedtuple("Facet", ["param", "label", "options"])
+FacetOption = namedtuple("FacetOption", ["value", "label", "condition"])
+
+# Parameters that select a page, not a set of rows
+PAGINATION_PARAMS = ("page", "cursor")
+
+
+def selected_options(facets, params):
+    """
+    Return ``{param: FacetOption}`` for the facets selected in ``params``.
+
+    Unknown parameters and values are ignored.
+    """
+    selected = {}
+    for facet in facets:
+        value = params.get(facet.param)
+        for option in facet.options:
+            if option.value == value:
+                selected[facet.param] = option
+    return selected
+
+
+def facet_filter(selected, exclude=None):
+    """Combine the conditions of the selected options, except ``exclude``."""
+    condition = Q()
+    for param, option in selected.items():
+        if param != exclude:
+            condition &= option.condition
+    return condition
+
+
+def facet_aggregates(facets, selected):
+    """Build the ``Count(filter=...)`` of every option, keyed by alias."""
+    aggregates = {}
+    for facet in facets:
+        others = facet_filter(selected, exclude=facet.param)
+        for index, option in enumerate(facet.options):
+            aggregates[f"{facet.param}_{index}"] = Count(
+                "pk", filter=others & option.condition
+            )
+    return aggregates
+
+
+def _counts_by_facet(facets, row):
+    return {
+        facet.param: {
+            option.value: row[f"{facet.param}_{index}"]
+            for index, option in enumerate(facet.options)
+        }
+        for facet in facets
+    }
+
+
+def facet_counts(queryset, facets, selected):
+    """
+    Count the rows of ``queryset`` for every facet option in one query.
+
+    Args:
+        queryset: Rows before applying the facet filters
+        facets: Facets to count
+        selected: Result of ``selected_options``
+
+    Returns:
+        ``{param: {value: count}}``
+    """
+    row = queryset.aggregate(**facet_aggregates(facets, selected))
+    return _counts_by_facet(facets, row)
+
+
+async def afacet_counts(queryset, facets, selected):
+    """Async version of ``facet_counts``."""
+    row = await queryset.aaggregate(**facet_aggregates(facets, selected))
+    return _counts_by_facet(facets, row)
+
+
+def facet_cache_key(model, version, params):
+    """Return the cache key of the facet counts for a filter combination."""
+    digest = hashlib.md5(urlencode(sorted(params.items())).encode()).hexdigest()
+    return f"{FACET_CACHE_PREFIX}:{model._meta.label_lower}:{version}:{digest}"
+
+
+def facet_url(query, param, value):
+    """
+    Return the query string of ``query`` with ``param`` set to ``value``.
+
+    The page/cursor position is dropped, since the rows change; a ``value``
+    of None removes ``param``.
+    """
+    params = query.copy()
+    for name in PAGINATION_PARAMS:
+        params.pop(name, None)
+    if value is None:
+        params.pop(param, None)
+    else:
+        params[param] = value
+    return f"?{params.urlencode()}" if params else "?"
+
+
+class FacetMixin:
+    """
+    Mixin para ListView que filtra por facetas y muestra sus conteos.
+
+    ``facets`` define las facetas; ``facet_cache_params`` lista los demás
+    parámetros de la URL que cambian las filas contadas (búsqueda, rangos),
+    para incluirlos en la clave de caché.
+    """
+
+    facets = ()
+    facet_cache_params = ()
+    facet_cache_timeout = None
+
+    def get_facets(self):
+        return self.facets
+
+    def get_selected_facets(self):
+        """Opciones elegidas en la URL, por parámetro."""
+        return selected_options(self.get_facets(), self.request.GET)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Los conteos se calculan sobre las filas previas a las facetas
+        self.facet_queryset = queryset
+        return queryset.filter(facet_filter(self.get_selected_facets()))
+
+    def get_facet_cache_key(self, version):
+        params = {
+            name: self.request.GET[name]
+            for name in self.facet_cache_params
+            if self.request.GET.get(name)
+        }
+        params.update(
+            (param, option.value)
+            for param, option in self.get_selected_facets().items()
+        )
+        return facet_cache_key(self.model, version, params)
+
+    def get_facet_cache_timeout(self):
+        if self.facet_cache_timeout is not None:
+            return replica_cache_timeout(self.facet_cache_timeout)
+        return replica_cache_timeout(getattr(settings, "FACET_CACHE_TIMEOUT", 300))
+
+    def get_facet_counts(self):
+        """Conteos por opción, desde la caché o con una sola consulta."""
+        if getattr(self, "facet_counts", None) is None:
+            (version,) = get_model_versions(self.model)
+            key = self.get_facet_cache_key(version)
+            self.facet_counts = cache.get(key)
+            if self.facet_counts is None:
+                if not hasattr(self, "facet_queryset"):
+                    self.get_queryset()
+                self.facet_counts = facet_counts(
+                    self.facet_queryset,
+                    self.get_facets(),
+                    self.get_selected_facets(),
+                )
+                cache.set(key, self.facet_counts, self.get_facet_cache_timeout())
+        return self.facet_counts
+
+    async def aget_facet_counts(self):
+        """Versión asíncrona de ``get_facet_counts``."""
+        if getattr(self, "facet_counts", None) is None:
+            (version,) = await aget_model_versions(self.model)
+            key = self.get_facet_cache_key(version)
+            self.facet_counts = await cache.aget(key)
+            if self.facet_counts is None:
+                if not hasattr(self, "facet_queryset"):
+                    self.get_queryset()
+                self.facet_counts = await afacet_counts(
+                    self.facet_queryset,
+                    self.get_facets(),
+                    self.get_selected_facets(),
+                )
+                await cache.aset(key, self.facet_counts, self.get_facet_cache_timeout())
+        return self.facet_counts
+
+    def get_facet_url(self, param, value):
+        """URL del listado con ``param`` cambiado (o quitado si es None)."""
+        return facet_url(self.request.GET, param, value)
+
+    def get_facet_context(self):
+        """Facetas listas para la plantilla, con conteo y URL por opción."""
+        counts = self.get_facet_counts()
+        selected = self.get_selected_facets()
+        context = []
+        for facet in self.get_facets():
+            current = selected.get(facet.param)
+            options = [
+                {
+                    "value": option.value,
+                    "label": option.label,
+                    "count": counts[facet.param][option.value],
+                    "selected": option is current,
+                    "url": self.get_facet_url(
+                        facet.param, None if option is current else option.value
+                    ),
+                }
+                for option in facet.options
+            ]
+            context.append(
+                {
+                    "param": facet.param,
+                    "label": facet.label,
+                    "options": options,
+                    "clear_url": self.get_facet_url(facet.param, None)
+                    if current
+                    else None,
+                }
+            )
+        return context
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["facets"] = self.get_facet_context()
+        return context
@@ -0,0 +1,168 @@
+"""
+Shared form fields for CarriAcces.
+"""
+
+from django import forms
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from PIL import Image
+from carriacces.utils import validate_uploaded_image
+
+
+def find_taken_values(queryset, candidates):
+    """
+    Return which candidate values already exist, using a single query.
+
+    The check for every field is combined into one ``OR`` of ``IN`` lookups,
+    so it serves one form (one value per field) as well as a bulk import
+    (every value of a batch).
+
+    Args:
+        queryset: Rows to check against, e.g. excluding the edited instance
+        candidates: Mapping of field name -> iterable of values
+
+    Returns:
+        Mapping of field name -> set of the candidate values already stored
+    """
+    candidates = {field: set(values) for field, values in candidates.items()}
+    candidates = {field: values for field, values in candidates.items() if values}
+    if not candidates:
+        return {}
+
+    condition = Q()
+    for field, values in candidates.items():
+        condition |= Q(**{f"{field}__in": values})
+
+    taken = {field: set() for field in candidates}
+    fields = list(candidates)
+    for row in queryset.filter(condition).order_by().values_list(*fields):
+        for field, value in zip(fields, row):
+            if value in candidates[field]:
+                taken[field].add(value)
+    return {field: values for field, values in taken.items() if values}
+
+
+class ImageUploadField(forms.FileField):
+    """
+    Campo de imagen que valida la subida en una sola pasada.
+
+    Reemplaza a ``forms.ImageField``, que decodifica y verifica la imagen
+    completa; aquí solo se leen los bytes mágicos y la cabecera mediante
+    ``validate_uploaded_image``. El formato detectado queda en
+    ``archivo.image_info`` para que el modelo lo guarde sin reabrirlo.
+    """
+
+    def to_python(self, data):
+        f = super().to_python(data)
+        if f is None:
+            return None
+        try:
+            validate_uploaded_image(f)
+        except ValidationError as error:
+            raise ValidationError(error.messages, code="invalid_image") from error
+        # Igual que forms.ImageField: el tipo MIME proviene del contenido real
+        f.content_type = Image.MIME.get(f.image_info.format)
+        return f
+
+
+class UniqueConstraintFormMixin:
+    """
+    Mixin de ModelForm para restricciones únicas sobre expresiones, como
+    ``UniqueConstraint(Upper("nombre"))``.
+
+    Django informa esas violaciones como errores generales del formulario;
+    el mixin las asocia al campo indicado en ``constraint_fields``. La
+    validación solo hace una consulta por índice: si otra petición guarda el
+    mismo valor antes que esta, la base de datos rechaza la fila y ``save``
+    convierte el ``IntegrityError`` en el mismo error de campo.
+    """
+
+    # Nombre de la restricción -> campo al que se asigna el error
+    constraint_fields = {}
+
+    def _get_constraints(self):
+        return [
+            constraint
+            for constraint in self._meta.model._meta.constraints
+            if constraint.name in self.constraint_fields
+        ]
+
+    def _post_clean(self):
+        super()._post_clean()
+        errors = self._errors.get(NON_FIELD_ERRORS)
+        if not errors:
+            return
+        fields = {
+            constraint.violation_error_code: self.constraint_fields[constraint.name]
+            for constraint in self._get_constraints()
+        }
+        remaining = []
+        for error in errors.as_data():
+            if error.code in fields:
+                self.add_error(fields[error.code], error)
+            else:
+                remaining.append(error)
+        if remaining:
+            self._errors[NON_FIELD_ERRORS] = self.error_class(
+                remaining, error_class="nonfield", renderer=self.renderer
+            )
+        else:
+            del self._errors[NON_FIELD_ERRORS]
+
+    def save(self, commit=True):
+        """
+        Guarda el objeto; si viola una restricción única lanza
+        ``ValidationError`` tras registrar el error en el campo.
+        """
+        if not commit:
+            return super().save(commit=False)
+        try:
+            with transaction.atomic():
+                return super().save(commit=True)
+        except IntegrityError as error:
+            for constraint in self._get_constraints():
+                if constraint.name in str(error):
+                    message = constraint.get_violation_error_message()
+                    self.add_error(self.constraint_fields[constraint.name], message)
+                    raise ValidationError(
+                        message, code=constraint.violation_error_code
+                    ) from error
+            raise
+
+
+class BatchedUniqueFormMixin:
+    """
+    Mixin de ModelForm que valida todos los campos únicos en una consulta.
+
+    Sin él, Django consulta cada campo ``unique`` en ``validate_unique`` y
+    cada ``UniqueConstraint`` otra vez en ``validate_constraints``. Aquí esos
+    campos se excluyen de la validación del modelo y ``validate_unique`` los
+    comprueba juntos con ``find_taken_values``.
+    """
+
+    # Campo único -> mensaje de error cuando el valor ya existe
+    unique_error_messages = {}
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        exclude.update(self.unique_error_messages)
+        return exclude
+
+    def validate_unique(self):
+        # El resto de restricciones de unicidad, si las hay, sigue en Django
+        super().validate_unique()
+        candidates = {
+            field: [getattr(self.instance, field)]
+            for field in self.unique_error_messages
+            if field not in self.errors and getattr(self.instance, field)
+        }
+        queryset = self._meta.model._default_manager.all()
+        if self.instance.pk is not None:
+            queryset = queryset.exclude(pk=self.instance.pk)
+
+        for field in find_taken_values(queryset, candidates):
+            self.add_error(
+                field,
+                ValidationError(self.unique_error_messages[field], code="unique"),
+            )
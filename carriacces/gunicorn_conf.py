@@ -0,0 +1,91 @@
+"""
+Gunicorn configuration for serving CarriAcces in production.
+
+Usage::
+
+    gunicorn -c python:carriacces.gunicorn_conf
+
+Every value can be overridden from the environment:
+
+- ``GUNICORN_BIND``: address to listen on (default ``0.0.0.0:8000``)
+- ``WEB_CONCURRENCY``: worker processes (default ``2 * CPUs + 1``)
+- ``GUNICORN_THREADS``: threads per worker (default 4)
+- ``GUNICORN_ASGI``: ``true`` serves ``carriacces.asgi`` with uvicorn workers
+  (requires ``pip install uvicorn-worker``)
+- ``GUNICORN_PRELOAD``: import the application once in the master before
+  forking (default ``true``)
+
+Reloads: ``kill -HUP <master>`` gracefully replaces the workers, letting
+in-flight requests finish within ``graceful_timeout``. With preload enabled
+the master already holds the imported code, so a code deploy needs
+``kill -USR2`` (start a new master) followed by ``kill -QUIT`` on the old
+one; set ``GUNICORN_PRELOAD=false`` to pick up new code on HUP instead.
+
+Each thread can hold one database connection (``CONN_MAX_AGE``), so the
+PostgreSQL connection budget is ``workers * threads`` per container; with
+``DB_POOL=psycopg`` it is ``workers * DB_POOL_MAX_SIZE`` instead, and with
+``DB_POOL=pgbouncer`` PgBouncer caps it for all containers. Every worker
+opens its connections (or fills its pool) before taking requests, see
+``carriacces.health.warm_up_connections``.
+"""
+
+import os
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() == "true"
+
+
+def _cpu_count():
+    """CPUs available to this process, honoring container CPU affinity."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+workers = int(os.environ.get("WEB_CONCURRENCY", 2 * _cpu_count() + 1))
+
+if _env_bool("GUNICORN_ASGI", False):
+    wsgi_app = "carriacces.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "carriacces.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+
+# Timeouts (seconds)
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth; the jitter keeps them
+# from restarting all at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+
+# Heartbeat files on tmpfs: a slow overlay filesystem can make the master
+# think workers are hung
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """Do not share connections opened while preloading with the workers."""
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    """Open the database connections before the worker accepts requests."""
+    from carriacces.health import warm_up_connections
+
+    warm_up_connections()
@@ -0,0 +1,137 @@
+"""
+Startup and health probes for the database connections.
+
+- ``liveness`` (``/healthz/``) answers without touching the database: the
+  process is up and serving requests.
+- ``readiness`` (``/readyz/``) runs ``SELECT 1`` on every configured
+  database and answers 503 while a required one is unreachable, so a load
+  balancer or ``docker compose`` keeps traffic away until it is. The read
+  replica is optional (reads fall back to the primary, see
+  ``carriacces.routers``): while it is down the status is ``degraded`` but
+  the answer stays 200.
+- ``warm_up_connections`` opens the connections (or fills the psycopg pool,
+  see ``DB_POOL`` in settings) when a gunicorn worker starts, so the first
+  requests of a burst do not pay for the connection setup.
+
+Both views are excluded from ``ATOMIC_REQUESTS`` should it be turned on: the
+transaction would connect before the readiness check could catch the error,
+and the liveness probe must not connect at all.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+from carriacces.routers import REPLICA_DATABASE
+
+logger = logging.getLogger(__name__)
+
+
+def check_database(alias):
+    """Run a trivial query on ``alias``; return None or the error message."""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except DatabaseError as error:
+        return str(error).strip() or error.__class__.__name__
+    return None
+
+
+def required_databases():
+    """Aliases the site cannot serve without; the replica is optional."""
+    return [alias for alias in connections if alias != REPLICA_DATABASE]
+
+
+def check_databases(aliases=None):
+    """Return ``{alias: error message}`` of the databases not answering."""
+    if aliases is None:
+        aliases = list(connections)
+    return {
+        alias: error
+        for alias in aliases
+        if (error := check_database(alias)) is not None
+    }
+
+
+def wait_for_databases(timeout=None, interval=1.0):
+    """
+    Retry ``check_databases`` until the required databases answer.
+
+    Args:
+        timeout: Seconds to keep trying, ``DB_STARTUP_TIMEOUT`` by default
+        interval: Seconds between attempts
+
+    Returns:
+        The failing ``{alias: error}`` of the last attempt, empty on success
+    """
+    if timeout is None:
+        timeout = getattr(settings, "DB_STARTUP_TIMEOUT", 30)
+    deadline = time.monotonic() + timeout
+    while True:
+        failing = check_databases(required_databases())
+        if not failing or time.monotonic() + interval > deadline:
+            return failing
+        time.sleep(interval)
+
+
+def warm_up_connections(timeout=None):
+    """
+    Open the database connections of this process before serving requests.
+
+    With the psycopg pool, shared by the threads of the process, the pool is
+    opened and filled up to ``min_size``. Persistent connections belong to
+    the thread that opens them, so without a pool a connection is only
+    opened and closed once, to fail early and load the driver; each request
+    thread then keeps its own for ``CONN_MAX_AGE``. Failures are logged, not
+    raised: the worker still starts and ``/readyz/`` reports the problem.
+    """
+    if timeout is None:
+        timeout = getattr(settings, "DB_STARTUP_TIMEOUT", 30)
+    for alias in connections:
+        connection = connections[alias]
+        try:
+            pool = getattr(connection, "pool", None)
+            if pool is not None:
+                pool.open(wait=True, timeout=timeout)
+            else:
+                connection.ensure_connection()
+                connection.close()
+        except Exception:
+            logger.warning(
+                "Could not open the %r database at startup", alias, exc_info=True
+            )
+
+
+@transaction.non_atomic_requests
+@never_cache
+@require_safe
+def liveness(request):
+    """Sonda de vida: el proceso responde, sin consultar la base de datos."""
+    return JsonResponse({"status": "ok"})
+
+
+@transaction.non_atomic_requests
+@never_cache
+@require_safe
+def readiness(request):
+    """Sonda de disponibilidad: 503 si una base de datos requerida no responde."""
+    failing = check_databases()
+    for alias, error in failing.items():
+        logger.warning("Readiness check failed for the %r database: %s", alias, error)
+    # Los mensajes de error (host, usuario...) solo van al log
+    databases = {
+        alias: "unavailable" if alias in failing else "ok" for alias in connections
+    }
+    if set(failing) & set(required_databases()):
+        status = "unavailable"
+    else:
+        status = "degraded" if failing else "ok"
+    return JsonResponse(
+        {"status": status, "databases": databases},
+        status=503 if status == "unavailable" else 200,
+    )
@@ -0,0 +1,163 @@
+"""
+Derivative image (thumbnail) generation for CarriAcces uploads.
+
+Thumbnails are stored next to the original in the same storage, named
+``<nombre>.<ancho>w.<ext>`` (e.g. ``productos/led_interior.320w.webp``). They
+are generated once, when a model is saved with a new image, and their names
+are kept on the model (``<campo>_miniaturas``), so rendering a ``srcset``
+never touches the storage.
+"""
+
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THUMBNAIL_WIDTHS = (160, 320, 640)
+
+
+def thumbnail_widths():
+    """Return the configured thumbnail widths, smallest first."""
+    return sorted(getattr(settings, "THUMBNAIL_WIDTHS", DEFAULT_THUMBNAIL_WIDTHS))
+
+
+def thumbnail_format():
+    """
+    Return the Pillow format used for thumbnails.
+
+    WebP by default, falling back to JPEG when Pillow lacks WebP support.
+    """
+    fmt = getattr(settings, "THUMBNAIL_FORMAT", "WEBP").upper()
+    if fmt == "WEBP" and not features.check("webp"):
+        return "JPEG"
+    return fmt
+
+
+def thumbnail_name(name, width, fmt=None):
+    """
+    Build the storage name of a thumbnail.
+
+    Args:
+        name: Storage name of the original image
+        width: Target width in pixels
+        fmt: Pillow format; defaults to ``thumbnail_format()``
+
+    Returns:
+        Storage name such as ``productos/foto.320w.webp``
+    """
+    fmt = fmt or thumbnail_format()
+    extension = "jpg" if fmt == "JPEG" else fmt.lower()
+    stem = os.path.splitext(name)[0]
+    return f"{stem}.{width}w.{extension}"
+
+
+def generate_thumbnails(field_file, widths=None):
+    """
+    Generate the thumbnails of an image field.
+
+    The original is decoded once and downscaled progressively from the
+    largest to the smallest width. Widths not smaller than the original are
+    skipped: the original itself is the largest candidate of the srcset.
+
+    Args:
+        field_file: ``FieldFile`` of an ``ImageField``, already in storage
+        widths: Widths to generate; defaults to ``THUMBNAIL_WIDTHS``
+
+    Returns:
+        Dict mapping width to thumbnail storage name, for the thumbnails
+        actually generated; empty if the original cannot be decoded
+    """
+    if not field_file:
+        return {}
+
+    storage = field_file.storage
+    fmt = thumbnail_format()
+    # Thumbnails keep the original's name plus a width suffix, even when the
+    # storage renames uploads by content hash
+    save = getattr(storage, "save_derivative", storage.save)
+    names = {}
+    try:
+        with storage.open(field_file.name, "rb") as source, Image.open(source) as img:
+            image = ImageOps.exif_transpose(img)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            if fmt == "JPEG" and image.mode == "RGBA":
+                image = image.convert("RGB")
+
+            for width in sorted(widths or thumbnail_widths(), reverse=True):
+                # Never upscale
+                if width >= image.width:
+                    continue
+                height = round(image.height * width / image.width)
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+                name = thumbnail_name(field_file.name, width, fmt)
+                # Content-hash names: the same upload has the same thumbnails
+                if not storage.exists(name):
+                    buffer = BytesIO()
+                    image.save(buffer, fmt, quality=80, optimize=True)
+                    save(name, ContentFile(buffer.getvalue()))
+                names[width] = name
+    except (OSError, ValueError):
+        logger.warning("No se pudieron generar miniaturas de %s", field_file.name)
+        return {}
+
+    return names
+
+
+def record_thumbnails(instance, field_name="imagen"):
+    """
+    Generate the thumbnails of a new image and store their names on the model.
+
+    Meant for ``pre_save``: a pending upload is stored first (as
+    ``FileField.pre_save`` would right after) so the thumbnails are named
+    after its final storage name. ``<field>_miniaturas`` gets
+    ``{"<width>": "<name>"}``, empty without image, when the image cannot be
+    decoded or with ``THUMBNAIL_ON_UPLOAD`` off.
+
+    Args:
+        instance: Model instance about to be saved with a new image
+        field_name: Name of the ``ImageField``
+    """
+    field_file = getattr(instance, field_name)
+    thumbnails = {}
+    if field_file and getattr(settings, "THUMBNAIL_ON_UPLOAD", True):
+        if not field_file._committed:
+            field_file.save(field_file.name, field_file.file, save=False)
+        thumbnails = generate_thumbnails(field_file)
+    setattr(
+        instance,
+        f"{field_name}_miniaturas",
+        {str(width): name for width, name in sorted(thumbnails.items())},
+    )
+
+
+def image_srcset(field_file):
+    """
+    Return the ``srcset`` attribute value for an image field.
+
+    Built from the thumbnail names stored on the model (``<field>_miniaturas``)
+    plus the original at its recorded width (``<field>_ancho``), without any
+    storage access. Returns an empty string when there are no thumbnails, so
+    templates fall back to ``src``.
+    """
+    if not field_file:
+        return ""
+    instance, field_name = field_file.instance, field_file.field.name
+    thumbnails = getattr(instance, f"{field_name}_miniaturas", None) or {}
+    if not thumbnails:
+        return ""
+
+    storage = field_file.storage
+    candidates = [
+        f"{storage.url(name)} {width}w"
+        for width, name in sorted(thumbnails.items(), key=lambda item: int(item[0]))
+    ]
+    width = getattr(instance, f"{field_name}_ancho", None)
+    if width:
+        candidates.append(f"{field_file.url} {width}w")
+    return ", ".join(candidates)
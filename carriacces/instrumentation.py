@@ -0,0 +1,241 @@
+"""
+Per-view query and latency instrumentation for CarriAcces.
+
+``InstrumentationMiddleware`` measures every request and files it under the
+resolved view name (``productos:list``...):
+
+- number of SQL queries and time spent in them, recorded by an execute
+  wrapper installed on every database connection;
+- template render time, from ``process_template_response`` to the end of
+  ``TemplateResponse.render()``;
+- total latency of the middleware chain below it.
+
+The measurements are sent back in a ``Server-Timing`` header (visible in
+the browser's network panel) and accumulated in an in-process histogram,
+served as JSON by ``metrics_view``. Each worker process keeps its own
+histogram, and streamed responses are measured until the view returns.
+
+Templates may evaluate lazy querysets, so SQL and template time overlap.
+"""
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, JsonResponse
+
+# Upper bounds of the histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+UNRESOLVED_VIEW = "<unresolved>"
+
+_current_metrics = ContextVar("carriacces_request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Measurements of a single request."""
+
+    __slots__ = ("latency", "queries", "sql_time", "template_time", "view_name")
+
+    def __init__(self):
+        self.view_name = UNRESOLVED_VIEW
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.latency = 0.0
+
+    def server_timing(self):
+        """Return the ``Server-Timing`` header value, durations in ms."""
+        return ", ".join(
+            [
+                f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"',
+                f"tpl;dur={self.template_time * 1000:.1f}",
+                f"total;dur={self.latency * 1000:.1f}",
+            ]
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting queries run while a request is measured."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.sql_time += perf_counter() - start
+
+
+def install_query_recorder(connection, **kwargs):
+    """Add ``record_query`` to the execute wrappers of ``connection``."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# New connections get the wrapper as they are created, in any thread
+connection_created.connect(install_query_recorder)
+
+
+def _histogram(bounds, counts):
+    labels = [f"<={bound}" for bound in bounds] + ["+Inf"]
+    return dict(zip(labels, counts))
+
+
+class ViewStats:
+    """Histogramas y totales acumulados de una vista."""
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.latency_ms = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.query_buckets = [0] * (len(QUERY_BUCKETS) + 1)
+
+    def add(self, metrics):
+        latency_ms = metrics.latency * 1000
+        self.requests += 1
+        self.queries += metrics.queries
+        self.max_queries = max(self.max_queries, metrics.queries)
+        self.sql_ms += metrics.sql_time * 1000
+        self.template_ms += metrics.template_time * 1000
+        self.latency_ms += latency_ms
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.query_buckets[bisect_left(QUERY_BUCKETS, metrics.queries)] += 1
+
+    def as_dict(self):
+        requests = self.requests or 1
+        return {
+            "requests": self.requests,
+            "queries": {
+                "mean": round(self.queries / requests, 2),
+                "max": self.max_queries,
+                "histogram": _histogram(QUERY_BUCKETS, self.query_buckets),
+            },
+            "sql_ms": {"mean": round(self.sql_ms / requests, 2)},
+            "template_ms": {"mean": round(self.template_ms / requests, 2)},
+            "latency_ms": {
+                "mean": round(self.latency_ms / requests, 2),
+                "histogram": _histogram(LATENCY_BUCKETS_MS, self.latency_buckets),
+            },
+        }
+
+
+class MetricsRegistry:
+    """Estadísticas por vista del proceso actual."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._views = {}
+
+    def record(self, metrics):
+        with self._lock:
+            stats = self._views.get(metrics.view_name)
+            if stats is None:
+                stats = self._views[metrics.view_name] = ViewStats()
+            stats.add(metrics)
+
+    def snapshot(self):
+        """Return ``{view_name: stats}`` as plain data."""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
+
+
+class InstrumentationMiddleware:
+    """
+    Middleware que mide consultas, plantillas y latencia de cada petición.
+
+    Las medidas quedan en ``response.request_metrics``, en la cabecera
+    ``Server-Timing`` (si ``SERVER_TIMING`` está activo) y en ``registry``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        # Las conexiones abiertas antes de cargar el middleware no pasaron
+        # por connection_created
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        # sync_to_async copia el contexto, así que las consultas del ORM
+        # asíncrono también se atribuyen a esta petición
+        token = _current_metrics.set(metrics)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    def process_template_response(self, request, response):
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            start = perf_counter()
+
+            def rendered(response):
+                metrics.template_time += perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, metrics, start):
+        metrics.latency = perf_counter() - start
+        if request.resolver_match is not None:
+            metrics.view_name = request.resolver_match.view_name
+        registry.record(metrics)
+        response.request_metrics = metrics
+        if getattr(settings, "SERVER_TIMING", False):
+            response["Server-Timing"] = metrics.server_timing()
+        return response
+
+
+def metrics_view(request):
+    """
+    Devuelve en JSON las estadísticas por vista de este proceso.
+
+    Solo disponible con DEBUG o para usuarios del staff.
+    """
+    user = getattr(request, "user", None)
+    if not (settings.DEBUG or (user is not None and user.is_staff)):
+        raise Http404
+    return JsonResponse(
+        {"views": registry.snapshot()},
+        json_dumps_params={"indent": 2, "sort_keys": True},
+    )
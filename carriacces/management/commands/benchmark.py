@@ -0,0 +1,177 @@
+"""
+Management command to load-test the catalog views and save a JSON report.
+"""
+
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from carriacces.benchmark.runner import (
+    CATALOGS,
+    BenchmarkError,
+    build_report,
+    compare_reports,
+    load_report,
+    run_client,
+    run_http,
+    write_report,
+)
+from carriacces.benchmark.seed import seed_catalogs
+from carriacces.benchmark.templates import run_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed thousands of productos, proveedores and trabajadores into a "
+        "throwaway test database and measure the list, create, update and "
+        "delete views: latency percentiles, queries per request and RSS."
+    )
+
+    def add_arguments(self, parser):
+        for catalog in CATALOGS:
+            parser.add_argument(
+                f"--{catalog}",
+                type=float,
+                default=5,
+                help=f"Thousands of {catalog} to seed (default: 5)",
+            )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=50,
+            help="Recorded requests per scenario (default: 50)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the row generator"
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the test database between runs, seeding only missing rows",
+        )
+        parser.add_argument(
+            "--url",
+            help=(
+                "Benchmark the list views of a running server instead "
+                "(e.g. http://localhost:8000); nothing is seeded"
+            ),
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Concurrent requests with --url (default: 4)",
+        )
+        parser.add_argument(
+            "--templates",
+            action="store_true",
+            help=(
+                "Measure the per-card render cost of the list grids under each "
+                "template profile instead (--iterations renders per profile); "
+                "needs no database"
+            ),
+        )
+        parser.add_argument(
+            "--seed-only",
+            action="store_true",
+            help="Seed the configured database (not a test one) and exit",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument(
+            "--compare", metavar="REPORT", help="Earlier JSON report to compare with"
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--iterations and --concurrency must be positive")
+        sizes = {catalog: int(options[catalog] * 1000) for catalog in CATALOGS}
+        previous = None
+        if options["compare"]:
+            try:
+                previous = load_report(options["compare"])
+            except (OSError, ValueError) as error:
+                raise CommandError(error)
+
+        if options["seed_only"]:
+            created = seed_catalogs(sizes, seed=options["seed"])
+            self.stdout.write(self.style.SUCCESS(f"Seeded rows: {created}"))
+            return
+
+        try:
+            if options["templates"]:
+                report = build_report({}, "templates", options["iterations"], None)
+                report["templates"] = run_templates(rounds=options["iterations"])
+            elif options["url"]:
+                scenarios = run_http(
+                    options["url"],
+                    iterations=options["iterations"],
+                    concurrency=options["concurrency"],
+                )
+                report = build_report(scenarios, "http", options["iterations"], None)
+            else:
+                report = self.run_in_test_database(sizes, options)
+        except BenchmarkError as error:
+            raise CommandError(error)
+
+        self.print_report(report)
+        if options["output"]:
+            write_report(report, options["output"])
+            self.stdout.write(f"Report written to {options['output']}")
+        if previous is not None:
+            self.print_comparison(previous, report)
+
+    def run_in_test_database(self, sizes, options):
+        creation = connection.creation
+        old_name = connection.settings_dict["NAME"]
+        creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"], serialize=False
+        )
+        try:
+            start = perf_counter()
+            seed_catalogs(sizes, seed=options["seed"])
+            seed_seconds = round(perf_counter() - start, 2)
+            scenarios = run_client(iterations=options["iterations"])
+            # Measured while the test database still holds the rows
+            return build_report(
+                scenarios, "client", options["iterations"], sizes, seed_seconds
+            )
+        finally:
+            creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+    def print_report(self, report):
+        if report["scenarios"]:
+            self.stdout.write(
+                f"{'scenario':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}"
+            )
+        for scenario, summary in sorted(report["scenarios"].items()):
+            latency = summary["latency_ms"]
+            self.stdout.write(
+                f"{scenario:<22}{latency['p50']:>9.1f}{latency['p95']:>9.1f}"
+                f"{latency['p99']:>9.1f}{summary['queries']['mean']:>9.1f}"
+            )
+        if "templates" in report:
+            self.stdout.write(
+                f"{'grid:profile':<26}{'cold us/card':>14}{'warm us/card':>14}"
+            )
+            for name, summary in report["templates"].items():
+                self.stdout.write(
+                    f"{name:<26}{summary['cold_us']:>14.1f}{summary['warm_us']:>14.1f}"
+                )
+        rss = report["rss_mb"]
+        self.stdout.write(f"RSS: {rss['current']} MB (peak {rss['peak']} MB)")
+
+    def print_comparison(self, previous, report):
+        self.stdout.write(
+            f"Compared with {previous['meta'].get('commit') or 'previous run'}:"
+        )
+        for scenario, old, new, change, old_q, new_q in compare_reports(
+            previous, report
+        ):
+            style = self.style.ERROR if change > 10 else self.style.SUCCESS
+            self.stdout.write(
+                style(
+                    f"{scenario:<22} p95 {old:.1f} -> {new:.1f} ms ({change:+.1f}%), "
+                    f"queries {old_q} -> {new_q}"
+                )
+            )
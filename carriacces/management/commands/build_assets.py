@@ -0,0 +1,61 @@
+"""
+Management command to vendor CDN assets and build the CSS bundle.
+"""
+
+from urllib.error import URLError
+
+from django.core.management.base import BaseCommand, CommandError
+
+from carriacces.assets import (
+    CSS_BUNDLE_OUTPUT,
+    OPTIONAL_CSS,
+    build_css_bundle,
+    static_source_dir,
+    vendor_assets,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Download the CDN assets into static/vendor/ and build the minified "
+        "CSS bundle; run before collectstatic"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="Do not download anything; only rebuild the bundle",
+        )
+
+    def handle(self, *args, **options):
+        root = static_source_dir()
+
+        if not options["offline"]:
+            try:
+                written = vendor_assets(root)
+            except URLError as error:
+                raise CommandError(f"Could not download vendor assets: {error}")
+            for name in written:
+                self.stdout.write(f"Vendored {name}")
+
+        for name in OPTIONAL_CSS:
+            if not (root / name).exists():
+                self.stderr.write(
+                    self.style.WARNING(
+                        f"{name} is not vendored and is left out of the bundle; "
+                        "run build_assets with network access to add it"
+                    )
+                )
+
+        try:
+            original, bundled = build_css_bundle(root)
+        except FileNotFoundError as error:
+            raise CommandError(
+                f"Missing stylesheet {error.filename}; run without --offline"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built {CSS_BUNDLE_OUTPUT}: {original} -> {bundled} bytes"
+            )
+        )
@@ -0,0 +1,106 @@
+"""
+Management command to delete orphaned media blobs.
+"""
+
+import os
+import re
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import FileField
+from django.utils import timezone
+
+from carriacces.storage import ContentHashMixin
+
+# productos/<hash>.320w.webp -> productos/<hash>
+THUMBNAIL_RE = re.compile(r"^(?P<stem>.+)\.\d+w\.[a-z]+$")
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete media files no longer referenced by any model using the "
+        "content-hash storage (including their thumbnails). The seed images "
+        "listed in MEDIA_SEED_FILES are always kept"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the files that would be deleted",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=3600,
+            help="Keep files younger than this many seconds (uploads in flight)",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=options["min_age"])
+        deleted = 0
+        freed = 0
+        seeds = set(settings.MEDIA_SEED_FILES)
+
+        for storage, directory, referenced in self.referenced_files():
+            stems = {os.path.splitext(name)[0] for name in referenced}
+            _, files = storage.listdir(directory)
+
+            for filename in files:
+                name = os.path.join(directory, filename)
+                if name in referenced or name in seeds:
+                    continue
+                match = THUMBNAIL_RE.match(name)
+                if match and match.group("stem") in stems:
+                    continue
+                if storage.get_modified_time(name) > cutoff:
+                    continue
+
+                size = storage.size(name)
+                if options["dry_run"]:
+                    self.stdout.write(f"Would delete {name} ({size} bytes)")
+                else:
+                    storage.delete(name)
+                    self.stdout.write(f"Deleted {name} ({size} bytes)")
+                deleted += 1
+                freed += size
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {deleted} orphaned files ({freed} bytes).")
+        )
+
+    def referenced_files(self):
+        """
+        Yield ``(storage, directory, referenced_names)`` per upload directory.
+
+        Only fields backed by a ``ContentHashMixin`` storage with a string
+        ``upload_to`` are considered, so other storages are never touched.
+        """
+        directories = {}
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if not isinstance(field, FileField):
+                    continue
+                if not isinstance(field.storage, ContentHashMixin):
+                    continue
+                if not isinstance(field.upload_to, str):
+                    continue
+                directory = field.upload_to.strip("/")
+                key = (id(field.storage), directory)
+                storage, _, referenced = directories.setdefault(
+                    key, (field.storage, directory, set())
+                )
+                referenced.update(
+                    name
+                    for name in model._default_manager.values_list(
+                        field.name, flat=True
+                    )
+                    if name
+                )
+
+        for storage, directory, referenced in directories.values():
+            if storage.exists(directory):
+                yield storage, directory, referenced
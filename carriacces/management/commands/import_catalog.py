@@ -0,0 +1,78 @@
+"""
+Management command to bulk import productos, proveedores or trabajadores.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from carriacces.catalog_import import (
+    CATALOGS,
+    DEFAULT_BATCH_SIZE,
+    CatalogImporter,
+    open_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a CSV or XLSX file into a catalog, creating new rows and "
+        "updating the ones matching its natural key (nombre or "
+        "codigo_empleado). Columns are the model field names."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("catalog", choices=sorted(CATALOGS))
+        parser.add_argument("path", help="CSV or XLSX file to import")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "xlsx"],
+            help="File format (default: guessed from the extension)",
+        )
+        parser.add_argument(
+            "--delimiter", default=",", help="CSV field delimiter (default: ,)"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Rows validated and written together (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the file and report what would change without writing",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive number")
+
+        try:
+            with open_rows(
+                options["path"], options["format"], options["delimiter"]
+            ) as (header, rows):
+                importer = CatalogImporter(
+                    CATALOGS[options["catalog"]],
+                    header,
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                )
+                if importer.missing_columns:
+                    raise CommandError(
+                        "Missing required columns: "
+                        + ", ".join(importer.missing_columns)
+                    )
+                result = importer.run(rows)
+        except (OSError, ValueError, ImportError) as error:
+            raise CommandError(error)
+
+        for line, message in result.errors:
+            self.stderr.write(f"Line {line}: {message}")
+
+        prefix = "Would import" if options["dry_run"] else "Imported"
+        summary = (
+            f"{prefix} {result.created + result.updated} rows "
+            f"({result.created} created, {result.updated} updated), "
+            f"{len(result.errors)} errors"
+        )
+        style = self.style.WARNING if result.errors else self.style.SUCCESS
+        self.stdout.write(style(summary))
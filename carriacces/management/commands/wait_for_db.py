@@ -0,0 +1,34 @@
+"""
+Management command to wait until the databases accept connections.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from carriacces.health import wait_for_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Wait until every configured database answers a query, e.g. before "
+        "running migrations in a container that starts along with PostgreSQL"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            help="Seconds to keep trying (default: DB_STARTUP_TIMEOUT)",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds between attempts (default: 1)",
+        )
+
+    def handle(self, *args, **options):
+        failing = wait_for_databases(options["timeout"], options["interval"])
+        if failing:
+            details = "; ".join(f"{alias}: {error}" for alias, error in failing.items())
+            raise CommandError(f"Databases not available: {details}")
+        self.stdout.write(self.style.SUCCESS("Databases available"))
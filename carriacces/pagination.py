@@ -0,0 +1,174 @@
+"""
+Keyset (seek) pagination for CarriAcces list views.
+
+Instead of ``OFFSET (N-1) * page_size`` plus a ``COUNT(*)``, each page is
+fetched with a ``WHERE (a, b, pk) > (...)`` condition on the view ordering,
+so deep pages cost the same as the first one.
+"""
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.http import Http404
+
+CURSOR_PARAM = "cursor"
+CURSOR_SALT = "carriacces.pagination.cursor"
+
+
+def encode_cursor(values, direction):
+    """
+    Build an opaque, signed token for a keyset position.
+
+    Args:
+        values: Values of the ordering fields for the boundary row
+        direction: "n" to continue forward, "p" to go backwards
+
+    Returns:
+        URL-safe string to use in ``?cursor=``
+    """
+    return signing.dumps(
+        {"v": list(values), "d": direction}, salt=CURSOR_SALT, compress=True
+    )
+
+
+def decode_cursor(token):
+    """
+    Decode a token produced by ``encode_cursor``.
+
+    Raises:
+        Http404: If the token is tampered with or malformed
+    """
+    try:
+        data = signing.loads(token, salt=CURSOR_SALT)
+        values, direction = data["v"], data["d"]
+    except (signing.BadSignature, KeyError, TypeError):
+        raise Http404("Cursor de paginación inválido.")
+    if direction not in ("n", "p") or not isinstance(values, list):
+        raise Http404("Cursor de paginación inválido.")
+    return values, direction
+
+
+def keyset_filter(fields, values, reverse=False):
+    """
+    Build the row-value comparison ``(f1, f2, ...) > (v1, v2, ...)`` as a Q.
+
+    Expanded as ``f1 > v1 OR (f1 = v1 AND f2 > v2) OR ...`` so it works on
+    every backend and can use the leading column of the index.
+    """
+    lookup = "lt" if reverse else "gt"
+    condition = Q()
+    for index, field in enumerate(fields):
+        branch = Q(**{f"{field}__{lookup}": values[index]})
+        for previous in range(index):
+            branch &= Q(**{fields[previous]: values[previous]})
+        condition |= branch
+    return condition
+
+
+class KeysetPage:
+    """Página compatible con las plantillas de paginación por cursor."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, fields, has_next, has_previous):
+        self.object_list = object_list
+        self.fields = fields
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def _boundary(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return encode_cursor(self._boundary(self.object_list[-1]), "n")
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return encode_cursor(self._boundary(self.object_list[0]), "p")
+
+
+class KeysetPaginationMixin:
+    """
+    Mixin para ListView que agrega el modo de paginación por cursor.
+
+    El modo es opcional: se activa globalmente con ``PAGINATION_MODE =
+    "keyset"`` o por petición cuando llega el parámetro ``?cursor=``. En
+    cualquier otro caso se mantiene la paginación por número de página.
+    """
+
+    keyset_ordering = ("pk",)
+
+    def use_keyset_pagination(self):
+        """Indica si la petición actual se pagina por cursor."""
+        if CURSOR_PARAM in self.request.GET:
+            return True
+        return getattr(settings, "PAGINATION_MODE", "offset") == "keyset"
+
+    def get_ordering(self):
+        if self.use_keyset_pagination():
+            return list(self.keyset_ordering)
+        return super().get_ordering()
+
+    def get_keyset_queryset(self, queryset, page_size):
+        """
+        Apply the ``?cursor=`` position and limit to ``queryset``.
+
+        Returns:
+            Tuple ``(queryset, token, direction)``; the queryset fetches one
+            extra row to know whether there is another page
+        """
+        fields = list(self.keyset_ordering)
+        token = self.request.GET.get(CURSOR_PARAM)
+        direction = "n"
+        if token:
+            values, direction = decode_cursor(token)
+            if len(values) != len(fields):
+                raise Http404("Cursor de paginación inválido.")
+            queryset = queryset.filter(
+                keyset_filter(fields, values, reverse=direction == "p")
+            )
+
+        if direction == "p":
+            queryset = queryset.order_by(*[f"-{field}" for field in fields])
+
+        return queryset[: page_size + 1], token, direction
+
+    def build_keyset_page(self, rows, page_size, token, direction):
+        """Build the ``paginate_queryset`` result from the fetched rows."""
+        fields = list(self.keyset_ordering)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if direction == "p":
+            rows.reverse()
+            page = KeysetPage(rows, fields, has_next=True, has_previous=has_more)
+        else:
+            page = KeysetPage(rows, fields, has_next=has_more, has_previous=bool(token))
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        queryset, token, direction = self.get_keyset_queryset(queryset, page_size)
+        return self.build_keyset_page(list(queryset), page_size, token, direction)
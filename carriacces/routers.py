@@ -0,0 +1,166 @@
+"""
+Read-replica routing for the CarriAcces list and detail views.
+
+Views with ``read_replica = True`` (``ReplicaReadMixin``: the catalog lists
+and the empresa page) send their queries to the ``replica`` database, and
+every other read and all writes go to ``default``:
+
+- ``ReplicaRoutingMiddleware`` picks the database once per request, before
+  the view runs, and keeps it until the response is rendered, since
+  templates evaluate lazy querysets. The choice lives in a context variable,
+  so it follows the request into ``sync_to_async`` threads;
+- ``ReplicaRouter`` reads that choice in ``db_for_read`` and always answers
+  ``default`` in ``db_for_write``, even for objects loaded from the replica;
+- read-your-writes: a POST (or any non-safe request) sets a cookie valid
+  for ``REPLICA_STICKY_SECONDS``, and while it is present the same browser
+  reads from ``default``, so it sees its own changes despite replication
+  lag;
+- without a ``replica`` entry in ``DATABASES``, or while it cannot be
+  reached, every read goes to ``default``. A failed connection is retried
+  after ``REPLICA_RETRY_SECONDS``, not on every request.
+
+Other browsers may read rows up to the replication lag old, after the
+write already bumped the model version. The shared caches (pages, counts,
+facets, card fragments, the empresa) filled during those requests expire
+after ``REPLICA_CACHE_TIMEOUT`` seconds (``replica_cache_timeout``), so a
+lagging row is not kept until the next write.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DATABASE = "replica"
+STICKY_COOKIE = "carriacces_primary"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+_read_database = ContextVar("carriacces_read_database", default=None)
+
+# monotonic() time until which this process reads from "default" only
+_replica_down_until = {"time": 0.0}
+
+
+def replica_configured():
+    return REPLICA_DATABASE in connections.settings
+
+
+def replica_available():
+    """Return whether the replica is configured and accepts connections."""
+    if not replica_configured() or time.monotonic() < _replica_down_until["time"]:
+        return False
+    try:
+        connections[REPLICA_DATABASE].ensure_connection()
+    except DatabaseError:
+        retry = getattr(settings, "REPLICA_RETRY_SECONDS", 30)
+        _replica_down_until["time"] = time.monotonic() + retry
+        logger.warning(
+            "Replica database unavailable, reading from the primary for %ss",
+            retry,
+            exc_info=True,
+        )
+        return False
+    return True
+
+
+def reading_from_replica():
+    return _read_database.get() == REPLICA_DATABASE
+
+
+def replica_cache_timeout(timeout):
+    """
+    Cap a cache ``timeout`` while the current request reads from the replica.
+
+    Entries written outside those requests keep ``timeout`` (None: forever).
+    """
+    if not reading_from_replica():
+        return timeout
+    limit = getattr(settings, "REPLICA_CACHE_TIMEOUT", 30)
+    return limit if timeout is None else min(timeout, limit)
+
+
+class ReplicaRouter:
+    """Router que envía a la réplica las lecturas de las vistas marcadas."""
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplica guardan las mismas filas
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DATABASE}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """Mixin para vistas de solo lectura que pueden leer de la réplica."""
+
+    read_replica = True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware que dirige a la réplica las lecturas de las vistas marcadas.
+
+    Debe ir después de ``InstrumentationMiddleware`` para que las consultas
+    a la réplica también se cuenten.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _read_database.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = _read_database.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        return self.finish(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        if (
+            getattr(view_class, "read_replica", False)
+            and request.method in SAFE_METHODS
+            and STICKY_COOKIE not in request.COOKIES
+            and replica_available()
+        ):
+            # Se restablece en __call__, después de renderizar la respuesta
+            _read_database.set(REPLICA_DATABASE)
+
+    def finish(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=getattr(settings, "REPLICA_STICKY_SECONDS", 5),
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
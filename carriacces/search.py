@@ -0,0 +1,121 @@
+"""
+Full-text search for the CarriAcces list views.
+
+On PostgreSQL each searchable model keeps a ``search_vector`` column with
+``nombre`` (weight A) and ``descripcion`` (weight B) under the ``spanish``
+text search configuration, so "neumáticos" also matches "neumático". A
+trigger installed by the app migrations refreshes it on every insert or
+update, including ``bulk_create``/``bulk_update``, and a GIN index serves the
+``@@`` match. Results are ordered by ``ts_rank``.
+
+Rows the full-text query misses (typos, partial words) are still found by
+trigram word similarity on ``nombre``, served by a ``gin_trgm_ops`` index,
+and are listed after the full-text matches.
+
+Other backends (SQLite in development) have neither feature; there the
+search degrades to case-insensitive ``icontains`` on the same fields.
+"""
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connections, router
+from django.db.models import F, Q
+
+SEARCH_PARAM = "q"
+SEARCH_CONFIG = "spanish"
+# Upper bound for the query string; longer input is truncated
+MAX_QUERY_LENGTH = 100
+
+
+def uses_postgres_search(model):
+    """Return True when ``model`` lives in a PostgreSQL database."""
+    return connections[router.db_for_read(model)].vendor == "postgresql"
+
+
+def ranked_search(queryset, query, field="nombre"):
+    """
+    Full-text search with a trigram fallback, in a single query.
+
+    Rows matching the ``websearch_to_tsquery`` query (quoted phrases, ``or``
+    and ``-excluded`` terms) come first, by ``ts_rank``; rows that only
+    resemble it by trigram word similarity on ``field`` (typos, partial
+    words) follow, by similarity. Both conditions are served by their GIN
+    index, combined with a bitmap OR.
+    """
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+    return (
+        queryset.filter(
+            Q(search_vector=search_query)
+            | Q(**{f"{field}__trigram_word_similar": query})
+        )
+        .annotate(
+            rank=SearchRank(F("search_vector"), search_query),
+            similarity=TrigramWordSimilarity(query, field),
+        )
+        .order_by("-rank", "-similarity", "pk")
+    )
+
+
+def contains_search(queryset, query, fields):
+    """Keep the rows where every word of ``query`` appears in some field."""
+    for word in query.split():
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f"{field}__icontains": word})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def search_queryset(queryset, query, fields=("nombre", "descripcion")):
+    """
+    Search ``queryset`` with the best strategy the database supports.
+
+    Args:
+        queryset: Queryset of a model with a ``search_vector`` field
+        query: User input from ``?q=``
+        fields: Fields searched by the ``icontains`` fallback
+
+    Returns:
+        The filtered queryset, ordered by relevance on PostgreSQL
+    """
+    if uses_postgres_search(queryset.model):
+        return ranked_search(queryset, query, field=fields[0])
+    return contains_search(queryset, query, fields)
+
+
+class SearchMixin:
+    """
+    Mixin para ListView que filtra el listado con ``?q=``.
+
+    Mientras hay una búsqueda, los resultados se ordenan por relevancia, por
+    lo que se usa la paginación por número de página aunque el modo por
+    cursor esté activo.
+    """
+
+    search_fields = ("nombre", "descripcion")
+
+    def get_search_query(self):
+        """Devuelve el texto buscado, o una cadena vacía."""
+        query = self.request.GET.get(SEARCH_PARAM, "")
+        return " ".join(query.split())[:MAX_QUERY_LENGTH]
+
+    def use_keyset_pagination(self):
+        if self.get_search_query():
+            return False
+        return super().use_keyset_pagination()
+
+    def get_queryset(self):
+        # El vector no se muestra; no hace falta traerlo en el listado
+        queryset = super().get_queryset().defer("search_vector")
+        query = self.get_search_query()
+        if query:
+            queryset = search_queryset(queryset, query, self.search_fields)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["search_query"] = self.get_search_query()
+        return context
@@ -8,6 +8,7 @@ Aplicación web Django con CRUD completo para gestión de tienda automotriz.
 import os
 from pathlib import Path
 from django.contrib.messages import constants as messages
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -24,12 +25,10 @@ SECRET_KEY = os.environ.get(
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.environ.get("DEBUG", "True").lower() == "true"
 
-ALLOWED_HOSTS = [
-    "localhost",
-    "127.0.0.1",
-    "0.0.0.0",  # Para Docker
-    "host.docker.internal",  # Para acceso desde host
-]
+# Lista separada por comas; por defecto los nombres locales y los de Docker
+ALLOWED_HOSTS = os.environ.get(
+    "ALLOWED_HOSTS", "localhost,127.0.0.1,0.0.0.0,host.docker.internal"
+).split(",")
 
 
 # Application definition
@@ -41,7 +40,9 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",  # Búsqueda de texto completo y trigramas
     # Apps locales
+    "carriacces",  # Template tags compartidos
     "trabajadores",
     "empresa",
     "productos",
@@ -50,6 +51,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",  # Archivos estáticos
+    # Consultas, tiempo de plantillas y latencia por vista (Server-Timing)
+    "carriacces.instrumentation.InstrumentationMiddleware",
+    # Lecturas de listados y detalle desde la réplica, si está configurada
+    "carriacces.routers.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -60,17 +66,40 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "carriacces.urls"
 
+# Template profile. "development" is Django's cached loader, reset by the
+# autoreloader when a template changes. "production" (default without DEBUG)
+# also binds every constant {% include %} to the compiled template once per
+# process (carriacces/template_loaders.py). Compare both with
+# "manage.py benchmark --templates".
+TEMPLATE_PROFILE = os.environ.get(
+    "TEMPLATE_PROFILE", "development" if DEBUG else "production"
+)
+TEMPLATE_CACHED_LOADERS = {
+    "development": "django.template.loaders.cached.Loader",
+    "production": "carriacces.template_loaders.CachedLoader",
+}
+TEMPLATE_LOADERS = [
+    (
+        TEMPLATE_CACHED_LOADERS[TEMPLATE_PROFILE],
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    )
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            "loaders": TEMPLATE_LOADERS,
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "empresa.context_processors.empresa",
             ],
         },
     },
@@ -90,11 +119,117 @@ DATABASES = {
         "PASSWORD": "practic35",
         "HOST": "db" if os.environ.get("DOCKER_ENVIRONMENT") else "localhost",
         "PORT": "5432",
-        "CONN_MAX_AGE": 60,  # Connection pooling
-        "ATOMIC_REQUESTS": True,  # Transacciones automáticas
+        "CONN_MAX_AGE": int(os.environ.get("CONN_MAX_AGE", 60)),
+        # Una conexión persistente (o tomada del pool) se prueba antes de
+        # reutilizarla; si el servidor la cerró se abre otra en lugar de fallar
+        "CONN_HEALTH_CHECKS": True,
+        # Sin ATOMIC_REQUESTS: solo las vistas que escriben abren una
+        # transacción (carriacces.views.AtomicViewMixin); las lecturas no
+    }
+}
+
+# Connection pooling (DB_POOL), see "Conexiones a la Base de Datos" in README:
+# - "persistent" (default): each worker thread keeps its own connection for
+#   CONN_MAX_AGE seconds
+# - "psycopg": psycopg 3 pool per worker process, filled at startup
+#   (psycopg_pool, in requirements.txt); Django requires CONN_MAX_AGE = 0
+# - "pgbouncer": the pgbouncer service of docker-compose.yml in transaction
+#   mode, shared by every worker; server-side cursors cannot be used there
+DB_POOL = os.environ.get("DB_POOL", "persistent")
+
+if DB_POOL == "psycopg":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            # Seconds a request waits for a free connection before failing
+            "timeout": int(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        },
+    }
+elif DB_POOL == "pgbouncer":
+    DATABASES["default"].update(
+        HOST=os.environ.get("PGBOUNCER_HOST", "pgbouncer"),
+        PORT=os.environ.get("PGBOUNCER_PORT", "6432"),
+        DISABLE_SERVER_SIDE_CURSORS=True,
+    )
+elif DB_POOL != "persistent":
+    raise ImproperlyConfigured(
+        f"DB_POOL must be 'persistent', 'psycopg' or 'pgbouncer', not {DB_POOL!r}"
+    )
+
+# Read replica (optional). The list and detail views read from it, see
+# carriacces/routers.py. settings_test drops it: a second connection does
+# not see the rows of the open test transaction
+if os.environ.get("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.environ["DB_REPLICA_HOST"],
+        "PORT": os.environ.get("DB_REPLICA_PORT", "5432"),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["carriacces.routers.ReplicaRouter"]
+
+# Seconds a browser keeps reading from "default" after a POST, so it sees
+# its own writes before the replica catches up
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+
+# Seconds the shared caches keep what a replica read filled them with, in
+# case the replica lagged behind the write that bumped the model version
+REPLICA_CACHE_TIMEOUT = int(os.environ.get("REPLICA_CACHE_TIMEOUT", 30))
+
+# Seconds a process reads only from "default" after failing to connect to
+# the replica
+REPLICA_RETRY_SECONDS = int(os.environ.get("REPLICA_RETRY_SECONDS", 30))
+
+# Seconds "manage.py wait_for_db" and the gunicorn workers wait for the
+# database at startup
+DB_STARTUP_TIMEOUT = int(os.environ.get("DB_STARTUP_TIMEOUT", 30))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND: "locmem" (por defecto), "file", "redis" (requiere el paquete
+# redis) o "dummy". Los tests usan "dummy" (ver carriacces/settings_test.py).
+
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "carriacces-cache",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_URL", "redis://localhost:6379/1"),
+    },
+    "dummy": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    },
+}
+
+CACHES = {
+    "default": {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        "KEY_PREFIX": "carriacces",
+        "TIMEOUT": 300,
     }
 }
 
+# Seconds a full page (HomeView, EmpresaDetailView) is kept; entries are also
+# dropped as soon as a model version is bumped
+PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Seconds the empresa shown in every page (footer, "Nosotros") is cached;
+# the singleton checks before creating one never use this cache
+EMPRESA_CACHE_TIMEOUT = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -136,15 +271,93 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / "staticfiles"  # Para collectstatic
 
+# Assets are vendored and bundled by "manage.py build_assets" (see
+# carriacces/assets.py). Outside DEBUG, collectstatic stores them with hashed
+# names plus .gz/.br variants, and WhiteNoise serves the hashed files with
+# "Cache-Control: max-age=315360000, immutable".
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    # Uploaded images (carriacces.storage): named by content hash
+    "media": {
+        "BACKEND": "carriacces.storage.ContentHashStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
+# In development WhiteNoise serves straight from STATICFILES_DIRS
+WHITENOISE_USE_FINDERS = DEBUG
+WHITENOISE_AUTOREFRESH = DEBUG
+
 # Media files (User uploads)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Imágenes de ejemplo que leen las migraciones de datos desde MEDIA_ROOT;
+# gc_media nunca las elimina aunque ninguna fila las referencie
+MEDIA_SEED_FILES = [
+    "productos/led_interior.jpg",
+    "productos/llantas_deportivas.jpg",
+    "productos/sistema_audio.jpg",
+    "productos/sistema_audio.png",
+    "trabajadores/empleado_1.jpg",
+    "trabajadores/empleada_2.jpg",
+    "trabajadores/empleado_3.jpg",
+    "trabajadores/empleada_4.jpg",
+]
+# Serve MEDIA_ROOT from Django itself (DEBUG, or a container without a
+# separate web server for uploads)
+SERVE_MEDIA = os.environ.get("SERVE_MEDIA", str(DEBUG)).lower() == "true"
+
+# Async list/detail views (carriacces/async_views.py); enabled by default when
+# gunicorn serves carriacces.asgi (GUNICORN_ASGI=true)
+ASYNC_VIEWS = (
+    os.environ.get("ASYNC_VIEWS", os.environ.get("GUNICORN_ASGI", "false")).lower()
+    == "true"
+)
+
+# List pagination: "offset" (?page=N) or "keyset" (?cursor=<token>)
+PAGINATION_MODE = os.environ.get("PAGINATION_MODE", "offset")
+
+# Cached list totals: seconds to keep a total, and optional row threshold from
+# which PostgreSQL's pg_class.reltuples estimate replaces COUNT(*) in the totals
+# shown to users (pagination always uses the exact count)
+COUNT_CACHE_TIMEOUT = 300
+COUNT_ESTIMATE_THRESHOLD = (
+    int(os.environ["COUNT_ESTIMATE_THRESHOLD"])
+    if os.environ.get("COUNT_ESTIMATE_THRESHOLD")
+    else None
+)
+
+# Seconds the facet counts of a filter combination are kept (carriacces.facets);
+# writes invalidate them earlier through the model version
+FACET_CACHE_TIMEOUT = 300
+
+# Per-view instrumentation (carriacces.instrumentation): send the SQL, template
+# and total times of every response in a Server-Timing header. Off by default
+# without DEBUG, since any client can read it. The histogram endpoint
+# /metricas/ is available with DEBUG or to staff users
+SERVER_TIMING = os.environ.get("SERVER_TIMING", str(DEBUG)).lower() == "true"
 
 # File upload security
-FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
+# Uploads above FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to a temporary file and
+# validated/hashed from disk in chunks instead of being held in memory
+MAX_IMAGE_UPLOAD_SIZE = 5 * 1024 * 1024  # 5MB
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(2.5 * 1024 * 1024)  # 2.5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 FILE_UPLOAD_PERMISSIONS = 0o644
 
+# Responsive thumbnails generated next to each uploaded image (see
+# carriacces/images.py); WebP falls back to JPEG if Pillow lacks support
+THUMBNAIL_WIDTHS = [160, 320, 640]
+THUMBNAIL_FORMAT = "WEBP"
+THUMBNAIL_ON_UPLOAD = True
+
 # Allowed file types for uploads
 ALLOWED_IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".webp"]
 ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/png", "image/webp"]
@@ -0,0 +1,41 @@
+"""
+Settings for a fast test run.
+
+    python manage.py test --settings=carriacces.settings_test --parallel
+
+On top of the regular settings, the cache is a no-op so that no state is
+shared between test cases, static files are served without the WhiteNoise
+manifest (no ``collectstatic`` needed), uploads are kept in memory instead of
+``MEDIA_ROOT`` and passwords are hashed with MD5, which is insecure but
+orders of magnitude faster than PBKDF2. ``TEST_DATABASE=sqlite`` swaps
+PostgreSQL for an in-memory SQLite database (the PostgreSQL-only tests are
+skipped) when no server is at hand.
+"""
+
+import os
+
+from carriacces.settings import *
+from carriacces.settings import CACHE_BACKENDS, DATABASES, STORAGES
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+CACHES = {"default": CACHE_BACKENDS["dummy"]}
+
+STORAGES = {
+    **STORAGES,
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    # The seed migrations save their images through the default storage
+    "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    "media": {"BACKEND": "carriacces.storage.InMemoryContentHashStorage"},
+}
+
+# Every read goes to "default" (carriacces.routers falls back to it)
+DATABASES = {"default": DATABASES["default"]}
+
+if os.environ.get("TEST_DATABASE") == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ":memory:",
+        }
+    }
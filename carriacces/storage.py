@@ -0,0 +1,102 @@
+"""
+Content-addressed media storage for CarriAcces uploads.
+
+Uploaded files are named after the SHA-256 of their content, so uploading
+the same image twice reuses the existing blob instead of creating
+``foto_AbC123.jpg`` copies. Since a name always maps to the same bytes, the
+URLs are immutable and can be cached by browsers indefinitely. Orphaned
+blobs are removed with ``python manage.py gc_media``.
+
+The backend is the ``"media"`` entry of ``STORAGES``: files under
+``MEDIA_ROOT`` by default, kept in memory by the test settings.
+"""
+
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage, InMemoryStorage, storages
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import LazyObject, empty
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(content):
+    """Return the SHA-256 hex digest of a Django ``File``, read in chunks."""
+    digest = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentHashMixin:
+    """
+    Storage mixin that names files by content hash and deduplicates.
+
+    The directory from ``upload_to`` and the lowercased extension are kept:
+    ``productos/llanta.JPG`` is stored as ``productos/<sha256>.jpg``.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        hashed_name = os.path.join(directory, content_hash(content) + extension)
+
+        if self.exists(hashed_name):
+            return hashed_name
+
+        saved_name = super().save(hashed_name, content, max_length)
+        if saved_name != hashed_name:
+            # Another request stored the same content concurrently: keep a
+            # single blob
+            self.delete(saved_name)
+        return hashed_name
+
+    def save_derivative(self, name, content, max_length=None):
+        """Save a derived file (e.g. a thumbnail) under the exact given name."""
+        return super().save(name, content, max_length)
+
+
+@deconstructible
+class ContentHashStorage(ContentHashMixin, FileSystemStorage):
+    """``FileSystemStorage`` under ``MEDIA_ROOT`` named by content hash."""
+
+
+@deconstructible
+class InMemoryContentHashStorage(ContentHashMixin, InMemoryStorage):
+    """
+    ``InMemoryStorage`` named by content hash, for the test settings.
+
+    Nothing touches the disk, so uploads are faster and parallel test
+    processes cannot see each other's files.
+    """
+
+
+class MediaStorage(LazyObject):
+    """The ``"media"`` entry of ``STORAGES``, resolved on first use."""
+
+    def _setup(self):
+        self._wrapped = storages["media"]
+
+
+def content_hash_storage():
+    """Storage callable for the ``ImageField`` of every app."""
+    return media_storage
+
+
+media_storage = MediaStorage()
+
+
+@receiver(setting_changed)
+def reset_media_storage(*, setting, **kwargs):
+    """Pick up a new media backend when a test overrides ``STORAGES``."""
+    if setting == "STORAGES":
+        media_storage._wrapped = empty
@@ -0,0 +1,65 @@
+"""
+Template loader of the production template profile.
+
+``CachedLoader`` is Django's cached loader plus one step: when a template
+is compiled, every ``{% include %}`` with a constant name (the cards of the
+list grids, pagination, facets...) is bound to the compiled template it
+includes. The include then renders it directly instead of resolving the
+name, building the relative path and looking it up in the loader cache on
+every render. Both the binding and the compiled templates live as long as
+the loader cache: once per process, or until the autoreloader resets it.
+
+Includes with a variable name, or naming a template that does not exist,
+are left alone and behave as usual at render time.
+"""
+
+from django.template import TemplateDoesNotExist
+from django.template.loader_tags import IncludeNode, construct_relative_path
+from django.template.loaders import cached
+
+
+class BoundInclude:
+    """Stand-in for the template name of an include, resolved at load time."""
+
+    def __init__(self, template, token):
+        self.template = template
+        self.token = token
+
+    def resolve(self, context):
+        return self.template
+
+    def __str__(self):
+        return self.token
+
+
+def constant_template_name(node):
+    """Return the literal template name of an include, or None."""
+    expression = node.template
+    if expression.filters or not isinstance(expression.var, str):
+        return None
+    return construct_relative_path(node.origin.template_name, expression.var)
+
+
+class CachedLoader(cached.Loader):
+    """Cached loader that binds constant includes once per compiled template."""
+
+    def get_template(self, template_name, skip=None):
+        template = super().get_template(template_name, skip)
+        if not getattr(template, "includes_bound", False):
+            # Marked first: a template including itself must not recurse
+            template.includes_bound = True
+            self.bind_includes(template)
+        return template
+
+    def bind_includes(self, template):
+        for node in template.nodelist.get_nodes_by_type(IncludeNode):
+            if isinstance(node.template, BoundInclude):
+                continue
+            name = constant_template_name(node)
+            if name is None:
+                continue
+            try:
+                included = self.get_template(name)
+            except TemplateDoesNotExist:
+                continue
+            node.template = BoundInclude(included, node.template.token)
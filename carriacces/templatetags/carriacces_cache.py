@@ -0,0 +1,25 @@
+from django import template
+from carriacces.cache import get_model_versions
+from carriacces.routers import replica_cache_timeout
+
+register = template.Library()
+
+
+@register.simple_tag
+def model_version(label):
+    """
+    Versión actual de un modelo, para usar como clave de ``{% cache %}``.
+
+    Uso: ``{% model_version "productos.Producto" as card_version %}``
+    """
+    return get_model_versions(label)[0]
+
+
+@register.simple_tag
+def fragment_timeout(timeout):
+    """
+    Tiempo de ``{% cache %}``, acortado si la petición lee de la réplica.
+
+    Uso: ``{% fragment_timeout 3600 as card_timeout %}``
+    """
+    return replica_cache_timeout(timeout)
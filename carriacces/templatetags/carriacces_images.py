@@ -0,0 +1,17 @@
+from django import template
+from carriacces.images import image_srcset as build_srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_srcset(field_file):
+    """
+    Valor de ``srcset`` con las miniaturas guardadas de una imagen subida.
+
+    No accede al almacenamiento: usa los nombres y anchos registrados en el
+    modelo al subir la imagen.
+
+    Uso: ``<img src="{{ obj.imagen.url }}" srcset="{% image_srcset obj.imagen %}">``
+    """
+    return build_srcset(field_file)
@@ -0,0 +1,1346 @@
+"""
+Test cases for the shared CarriAcces infrastructure (storage, commands).
+"""
+
+import importlib.util
+import os
+import random
+import runpy
+import shutil
+import tempfile
+from pathlib import Path
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.files.uploadedfile import (
+    SimpleUploadedFile,
+    TemporaryUploadedFile,
+)
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, connections, router
+from django.db.models import QuerySet
+from django.contrib.auth import get_user_model
+from django.template import Context, Engine, TemplateDoesNotExist
+from django.template.loader_tags import IncludeNode
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from carriacces import assets
+from carriacces.benchmark.runner import compare_reports, run_client, summarize
+from carriacces.benchmark.seed import FACTORIES, seed_catalogs, seeded_queryset
+from carriacces.benchmark.templates import PROFILES, run_templates
+from carriacces.cache import VERSION_PREFIX
+from carriacces.forms import find_taken_values
+from carriacces.health import wait_for_databases, warm_up_connections
+from carriacces.images import thumbnail_name
+from carriacces.instrumentation import registry
+from carriacces.routers import (
+    REPLICA_DATABASE,
+    STICKY_COOKIE,
+    _replica_down_until,
+)
+from carriacces.search import search_queryset
+from carriacces.storage import media_storage
+from carriacces.template_loaders import BoundInclude
+from carriacces.testing import QueryBudgetMixin, png_bytes
+from carriacces.utils import (
+    read_image_info,
+    sniff_image_format,
+    validate_uploaded_image,
+)
+from productos.forms import ProductoForm
+from empresa.models import Empresa
+from productos.models import Producto
+from proveedores.models import Proveedor
+from trabajadores.models import Trabajador
+
+
+FILESYSTEM_MEDIA_STORAGE = {"BACKEND": "carriacces.storage.ContentHashStorage"}
+
+
+class MediaRootTestCase(TestCase):
+    """
+    Base test case that points the media storage to a temporary folder.
+
+    The files are written to disk even under the in-memory storage of the
+    test settings, since some tests inspect the folder.
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            STORAGES={**settings.STORAGES, "media": FILESYSTEM_MEDIA_STORAGE},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def crear_producto(self, nombre, contenido):
+        return Producto.objects.create(
+            nombre=nombre,
+            descripcion="Producto de prueba para el almacenamiento de medios",
+            precio=Decimal("10.00"),
+            imagen=SimpleUploadedFile(
+                f"{nombre}.PNG", contenido, content_type="image/png"
+            ),
+        )
+
+
+@override_settings(THUMBNAIL_ON_UPLOAD=False)
+class ContentHashStorageTest(MediaRootTestCase):
+    """Test content-addressed naming and deduplication."""
+
+    def test_identical_uploads_share_one_blob(self):
+        """Test that the same bytes uploaded twice are stored once."""
+        contenido = png_bytes()
+        primero = self.crear_producto("Primero", contenido)
+        segundo = self.crear_producto("Segundo", contenido)
+
+        self.assertEqual(primero.imagen.name, segundo.imagen.name)
+        self.assertEqual(
+            os.listdir(os.path.join(self.media_root, "productos")),
+            [os.path.basename(primero.imagen.name)],
+        )
+
+    def test_name_is_hash_with_lowercase_extension(self):
+        """Test that the stored name is the SHA-256 plus the extension."""
+        producto = self.crear_producto("Hash", png_bytes())
+
+        directory, filename = os.path.split(producto.imagen.name)
+        stem, extension = os.path.splitext(filename)
+        self.assertEqual(directory, "productos")
+        self.assertEqual(len(stem), 64)
+        self.assertEqual(extension, ".png")
+
+    def test_save_derivative_keeps_exact_name(self):
+        """Test that derived files are not renamed by content."""
+        name = media_storage.save_derivative("productos/x.160w.webp", ContentFile(b"x"))
+
+        self.assertEqual(name, "productos/x.160w.webp")
+
+
+@override_settings(
+    THUMBNAIL_ON_UPLOAD=False,
+    STORAGES={
+        **settings.STORAGES,
+        "media": {"BACKEND": "carriacces.storage.InMemoryContentHashStorage"},
+    },
+)
+class InMemoryContentHashStorageTest(TestCase):
+    """Test the in-memory media backend of the test settings."""
+
+    def test_uploads_are_hashed_and_kept_off_disk(self):
+        """Test that fields switch backend and deduplicate in memory."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        contenido = png_bytes("purple")
+
+        with self.settings(MEDIA_ROOT=media_root):
+            nombres = [
+                Producto.objects.create(
+                    nombre=nombre,
+                    descripcion="Producto de prueba para el almacenamiento en memoria",
+                    precio=Decimal("10.00"),
+                    imagen=SimpleUploadedFile(f"{nombre}.png", contenido),
+                ).imagen.name
+                for nombre in ("Memoria Uno", "Memoria Dos")
+            ]
+
+        self.assertEqual(nombres[0], nombres[1])
+        self.assertTrue(media_storage.exists(nombres[0]))
+        self.assertEqual(os.listdir(media_root), [])
+
+
+class GcMediaCommandTest(MediaRootTestCase):
+    """Test the gc_media management command."""
+
+    def test_deletes_orphans_and_keeps_referenced_blobs(self):
+        """Test that only unreferenced files are removed."""
+        producto = self.crear_producto("Vigente", png_bytes("blue"))
+        huerfano = self.crear_producto("Huerfano", png_bytes("green"))
+        huerfano_name = huerfano.imagen.name
+        huerfano.delete()
+
+        call_command("gc_media", "--min-age=0", stdout=StringIO())
+
+        self.assertTrue(media_storage.exists(producto.imagen.name))
+        self.assertTrue(media_storage.exists(thumbnail_name(producto.imagen.name, 160)))
+        self.assertFalse(media_storage.exists(huerfano_name))
+        self.assertFalse(media_storage.exists(thumbnail_name(huerfano_name, 160)))
+
+    def test_keeps_the_seed_images(self):
+        """Test that the images read by the seed migrations are never deleted."""
+        semilla = media_storage.save_derivative(
+            "trabajadores/empleado_1.jpg", ContentFile(png_bytes("red", fmt="JPEG"))
+        )
+        self.crear_producto("Vigente", png_bytes("blue"))
+
+        call_command("gc_media", "--min-age=0", stdout=StringIO())
+
+        self.assertIn(semilla, settings.MEDIA_SEED_FILES)
+        self.assertTrue(media_storage.exists(semilla))
+
+    def test_dry_run_deletes_nothing(self):
+        """Test that --dry-run only reports orphaned files."""
+        huerfano = self.crear_producto("Huerfano", png_bytes("green"))
+        name = huerfano.imagen.name
+        huerfano.delete()
+        out = StringIO()
+
+        call_command("gc_media", "--min-age=0", "--dry-run", stdout=out)
+
+        self.assertTrue(media_storage.exists(name))
+        self.assertIn(f"Would delete {name}", out.getvalue())
+
+
+class ImageIngestTest(MediaRootTestCase):
+    """Test the single-pass image validation pipeline."""
+
+    def test_sniff_image_format(self):
+        """Test that formats are detected from the magic bytes."""
+        self.assertEqual(sniff_image_format(png_bytes(fmt="JPEG")), "JPEG")
+        self.assertEqual(sniff_image_format(png_bytes(fmt="PNG")), "PNG")
+        self.assertEqual(sniff_image_format(png_bytes(fmt="WEBP")), "WEBP")
+        self.assertIsNone(sniff_image_format(b"%PDF-1.7 fake"))
+
+    def test_read_image_info_is_cached_on_the_upload(self):
+        """Test that the file is read only once per upload."""
+        upload = SimpleUploadedFile("a.png", png_bytes(size=(30, 20)), "image/png")
+
+        info = read_image_info(upload)
+        with mock.patch("carriacces.utils.Image.open") as image_open:
+            self.assertEqual(read_image_info(upload), info)
+        image_open.assert_not_called()
+        self.assertEqual((info.format, info.width, info.height), ("PNG", 30, 20))
+        self.assertEqual(upload.tell(), 0)
+
+    def test_read_image_info_from_temporary_file(self):
+        """Test that large uploads are read from their temporary file."""
+        upload = TemporaryUploadedFile("grande.jpg", "image/jpeg", 0, None)
+        self.addCleanup(upload.close)
+        upload.write(png_bytes(size=(64, 48), fmt="JPEG"))
+        upload.seek(0)
+
+        info = read_image_info(upload)
+
+        self.assertEqual((info.format, info.width, info.height), ("JPEG", 64, 48))
+
+    def test_rejects_content_not_matching_extension(self):
+        """Test that a non-image renamed to .png is rejected."""
+        upload = SimpleUploadedFile("falsa.png", b"%PDF-1.7 fake", "image/png")
+
+        with self.assertRaises(ValidationError):
+            validate_uploaded_image(upload)
+
+    def test_form_validates_without_decoding_pixels(self):
+        """Test that the form never runs a full Image.verify()."""
+        data = {
+            "nombre": "Tapete De Goma",
+            "descripcion": "Tapete de goma para todo tipo de vehículo",
+            "precio": "25.00",
+            "iva": 15,
+        }
+        upload = SimpleUploadedFile("tapete.png", png_bytes(), "image/png")
+
+        with mock.patch.object(Image.Image, "verify") as verify:
+            form = ProductoForm(data=data, files={"imagen": upload})
+            self.assertTrue(form.is_valid(), form.errors)
+        verify.assert_not_called()
+
+    @override_settings(THUMBNAIL_ON_UPLOAD=False)
+    def test_metadata_recorded_on_save(self):
+        """Test that width, height and format are stored on the model."""
+        producto = self.crear_producto("Metadatos", png_bytes(size=(400, 200)))
+        producto.refresh_from_db()
+
+        self.assertEqual(producto.imagen_ancho, 400)
+        self.assertEqual(producto.imagen_alto, 200)
+        self.assertEqual(producto.imagen_formato, "PNG")
+
+        # Saving without a new image must not read the file again
+        with mock.patch("carriacces.utils.read_image_info") as read_info:
+            producto.precio = Decimal("12.00")
+            producto.save()
+        read_info.assert_not_called()
+        self.assertEqual(producto.imagen_ancho, 400)
+
+    @override_settings(THUMBNAIL_ON_UPLOAD=False)
+    def test_metadata_recorded_by_fieldfile_save(self):
+        """Test that files committed before the model save get metadata."""
+        producto = Producto.objects.create(
+            nombre="Guardado Directo",
+            descripcion="Producto de prueba para FieldFile.save",
+            precio=Decimal("10.00"),
+        )
+
+        producto.imagen.save("directo.png", ContentFile(png_bytes(size=(120, 90))))
+        producto.refresh_from_db()
+
+        self.assertEqual(
+            (producto.imagen_ancho, producto.imagen_alto, producto.imagen_formato),
+            (120, 90, "PNG"),
+        )
+
+        nuevo = Producto(
+            nombre="Guardado Nuevo",
+            descripcion="Producto de prueba para FieldFile.save",
+            precio=Decimal("10.00"),
+        )
+        nuevo.imagen.save(
+            "nuevo.jpg", ContentFile(png_bytes(size=(64, 48), fmt="JPEG"))
+        )
+
+        self.assertEqual(
+            (nuevo.imagen_ancho, nuevo.imagen_alto, nuevo.imagen_formato),
+            (64, 48, "JPEG"),
+        )
+
+
+FAKE_FONTS_CSS = """/* cyrillic */
+@font-face {
+  font-family: 'Plus Jakarta Sans';
+  src: url(https://fonts.gstatic.com/s/pjs/v8/cyr.woff2) format('woff2');
+}
+/* latin */
+@font-face {
+  font-family: 'Plus Jakarta Sans';
+  src: url(https://fonts.gstatic.com/s/pjs/v8/latin.woff2) format('woff2');
+}
+"""
+
+FAKE_ICONS_CSS = """@font-face {
+  font-family: "bootstrap-icons";
+  src: url("./fonts/bootstrap-icons.woff2?abc") format("woff2");
+}
+.bi-car-front-fill::before { content: "\\f7d1"; }
+"""
+
+
+def fake_fetch(url, user_agent=None):
+    """Return canned CDN responses for the asset build tests."""
+    if url == assets.GOOGLE_FONTS_URL:
+        return FAKE_FONTS_CSS.encode()
+    if url.endswith("bootstrap-icons.css"):
+        return FAKE_ICONS_CSS.encode()
+    if url.endswith(".css"):
+        return b".btn { color: red; }\n/*# sourceMappingURL=bootstrap.min.css.map */"
+    if url.endswith(".js"):
+        return b"!function(){}();\n//# sourceMappingURL=bootstrap.bundle.min.js.map"
+    return b"font-bytes"
+
+
+class BuildAssetsTest(TestCase):
+    """Test vendoring, bundling and minification of static assets."""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        (self.root / "css").mkdir()
+        (self.root / "css/carriacces.css").write_text(
+            "/* tema */\n.hero {\n    background: url('../images/fondo.png');\n}\n"
+        )
+        (self.root / "css/layout.css").write_text(".page-header  h1 { margin : 0; }\n")
+
+    def test_minify_css(self):
+        """Test that comments and whitespace go but strings and selectors stay."""
+        css = '/* x */\na :hover , b > c {\n  content: "a ; b";\n  margin: 0 auto;\n}\n'
+
+        self.assertEqual(
+            assets.minify_css(css), 'a :hover,b>c{content:"a ; b";margin:0 auto}\n'
+        )
+
+    def test_rebase_urls(self):
+        """Test that relative urls are rewritten for the bundle location."""
+        css = 'src: url("./fonts/bi.woff2?abc"), url(data:image/png;base64,AA)'
+
+        rebased = assets.rebase_urls(
+            css, "vendor/bootstrap-icons/bootstrap-icons.css", "dist/bundle.css"
+        )
+
+        self.assertIn('url("../vendor/bootstrap-icons/fonts/bi.woff2?abc")', rebased)
+        self.assertIn("url(data:image/png;base64,AA)", rebased)
+
+    def test_vendor_assets_downloads_once(self):
+        """Test that missing assets are downloaded and existing ones kept."""
+        written = assets.vendor_assets(self.root, fetch=fake_fetch)
+
+        self.assertIn("vendor/bootstrap/js/bootstrap.bundle.min.js", written)
+        js = (self.root / "vendor/bootstrap/js/bootstrap.bundle.min.js").read_text()
+        self.assertNotIn("sourceMappingURL", js)
+
+        fonts = (self.root / assets.FONTS_CSS).read_text()
+        self.assertIn("url(plus-jakarta-sans/latin.woff2)", fonts)
+        self.assertNotIn("cyr.woff2", fonts)
+        self.assertTrue((self.root / assets.FONTS_DIR / "latin.woff2").exists())
+        self.assertFalse((self.root / assets.FONTS_DIR / "cyr.woff2").exists())
+
+        self.assertEqual(assets.vendor_assets(self.root, fetch=fake_fetch), [])
+
+    def test_build_css_bundle(self):
+        """Test that the bundle concatenates and minifies every stylesheet."""
+        assets.vendor_assets(self.root, fetch=fake_fetch)
+
+        original, bundled = assets.build_css_bundle(self.root)
+
+        bundle = (self.root / assets.CSS_BUNDLE_OUTPUT).read_text()
+        self.assertLess(bundled, original)
+        self.assertIn('url("../vendor/fonts/plus-jakarta-sans/latin.woff2")', bundle)
+        self.assertIn('url("../images/fondo.png")', bundle)
+        self.assertIn(".page-header h1{margin :0}", bundle)
+        self.assertLess(bundle.index(".btn{"), bundle.index(".hero{"))
+
+    def test_bundle_skips_missing_optional_font(self):
+        """Test that the offline build works without the downloaded font."""
+        assets.vendor_assets(self.root, fetch=fake_fetch)
+        (self.root / assets.FONTS_CSS).unlink()
+
+        assets.build_css_bundle(self.root)
+
+        bundle = (self.root / assets.CSS_BUNDLE_OUTPUT).read_text()
+        self.assertNotIn("plus-jakarta-sans", bundle)
+        self.assertIn(".hero{", bundle)
+
+    def test_committed_bundle_is_up_to_date(self):
+        """Test that static/dist matches a rebuild from the committed files."""
+        source = assets.static_source_dir()
+        shutil.copytree(source, self.root, dirs_exist_ok=True)
+
+        assets.build_css_bundle(self.root)
+
+        self.assertEqual(
+            (self.root / assets.CSS_BUNDLE_OUTPUT).read_text(),
+            (source / assets.CSS_BUNDLE_OUTPUT).read_text(),
+        )
+
+    def test_committed_assets_have_manifest_entries(self):
+        """Test that base.html's assets exist for the manifest storage."""
+        static_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, static_root, ignore_errors=True)
+        storages = {
+            **settings.STORAGES,
+            "staticfiles": {
+                "BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+            },
+        }
+
+        with override_settings(STATIC_ROOT=static_root, STORAGES=storages):
+            call_command("collectstatic", "--noinput", verbosity=0)
+            with self.settings(DEBUG=False):
+                response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "dist/carriacces.min.")
+        self.assertContains(response, "vendor/bootstrap/js/bootstrap.bundle.min.")
+
+    def test_collectstatic_hashes_and_precompresses(self):
+        """Test that the bundle survives ManifestStaticFilesStorage."""
+        assets.vendor_assets(self.root, fetch=fake_fetch)
+        assets.build_css_bundle(self.root)
+        (self.root / "images").mkdir()
+        (self.root / "images/fondo.png").write_bytes(png_bytes())
+        static_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, static_root, ignore_errors=True)
+        storages = {
+            **settings.STORAGES,
+            "staticfiles": {
+                "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"
+            },
+        }
+
+        with override_settings(
+            STATICFILES_DIRS=[self.root],
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            STATIC_ROOT=static_root,
+            STORAGES=storages,
+        ):
+            call_command("collectstatic", "--noinput", verbosity=0)
+
+        hashed = list((static_root / "dist").glob("carriacces.min.*.css"))
+        self.assertEqual(len(hashed), 1)
+        self.assertTrue(Path(f"{hashed[0]}.gz").exists())
+        self.assertTrue(Path(f"{hashed[0]}.br").exists())
+
+
+class SearchQuerysetTest(TestCase):
+    """Test the strategy chosen by search_queryset on each backend."""
+
+    def test_postgres_search_ranks_full_text_and_trigram_matches(self):
+        """Test the PostgreSQL query shape without a PostgreSQL server."""
+        with mock.patch("carriacces.search.uses_postgres_search", return_value=True):
+            queryset = search_queryset(Producto.objects.all(), "aceite motor")
+
+        self.assertEqual(set(queryset.query.annotations), {"rank", "similarity"})
+        self.assertEqual(queryset.query.order_by, ("-rank", "-similarity", "pk"))
+
+    def test_other_backends_use_icontains(self):
+        """Test the fallback used by SQLite."""
+        queryset = search_queryset(Producto.objects.all(), "aceite motor")
+
+        sql = str(queryset.query).lower()
+        self.assertIn("like", sql)
+        self.assertEqual(queryset.query.annotations, {})
+
+
+class FindTakenValuesTest(TestCase):
+    """Test the batched lookup of values that already exist."""
+
+    def setUp(self):
+        """Create productos with known names."""
+        Producto.objects.all().delete()
+        for nombre in ("Aceite", "Filtro", "Llanta"):
+            Producto.objects.create(
+                nombre=nombre, descripcion="Producto de prueba", precio=Decimal("1.00")
+            )
+
+    def test_returns_only_stored_values_per_field(self):
+        """Test a batch of candidates resolved with one query."""
+        with self.assertNumQueries(1):
+            taken = find_taken_values(
+                Producto.objects.all(),
+                {"nombre": ["Aceite", "Bujía", "Llanta"], "descripcion": ["Otra"]},
+            )
+
+        self.assertEqual(taken, {"nombre": {"Aceite", "Llanta"}})
+
+    def test_empty_candidates_skip_the_query(self):
+        """Test that nothing is queried when there is nothing to check."""
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                find_taken_values(Producto.objects.all(), {"nombre": []}), {}
+            )
+
+
+class ImportCatalogCommandTest(TestCase):
+    """Test the import_catalog bulk import command."""
+
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        Producto.objects.all().delete()
+        Trabajador.objects.all().delete()
+
+    def write_csv(self, name, content):
+        path = self.dir / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def run_import(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_catalog", *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_creates_updates_and_reports_row_errors(self):
+        """Test the upsert on nombre and the per-row error report."""
+        Producto.objects.create(
+            nombre="Filtro De Aire",
+            descripcion="Filtro original",
+            precio=Decimal("9.00"),
+        )
+        path = self.write_csv(
+            "productos.csv",
+            "nombre,descripcion,precio,iva\n"
+            "aceite castrol,Aceite sintético para motor,25.50,15\n"
+            "FILTRO DE AIRE,Filtro para motor diésel,12,0\n"
+            "Aceite Castrol,Repetido dentro del archivo,10,15\n"
+            "Malo,Descripción suficiente,-1,15\n",
+        )
+
+        stdout, stderr = self.run_import("productos", path)
+
+        self.assertIn("(1 created, 1 updated), 2 errors", stdout)
+        self.assertIn("Line 4: nombre: Valor repetido en el archivo (línea 2).", stderr)
+        self.assertIn("Line 5: precio: El precio debe ser mayor a 0.", stderr)
+        aceite = Producto.objects.get(nombre="Aceite Castrol")  # clean_nombre: title()
+        self.assertEqual(aceite.iva, 15)
+        filtro = Producto.objects.get(nombre="Filtro De Aire")
+        self.assertEqual(filtro.precio, Decimal("12.00"))
+        self.assertEqual(filtro.iva, 0)
+
+    def test_writes_in_batches(self):
+        """Test that the queries grow with the batches, not with the rows."""
+        rows = "".join(
+            f"Producto {i:03d},Producto importado de prueba,{i + 1}.00,15\n"
+            for i in range(60)
+        )
+        path = self.write_csv("muchos.csv", "nombre,descripcion,precio,iva\n" + rows)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.run_import("productos", path, "--batch-size", "20")
+
+        self.assertEqual(Producto.objects.count(), 60)
+        # Por lote: búsqueda de existentes e inserción (más los savepoints)
+        self.assertLess(len(queries), 20)
+
+    def test_trabajadores_upsert_checks_other_unique_fields(self):
+        """Test codigo_empleado upserts and correo/cedula conflicts."""
+        Trabajador.objects.create(
+            nombre="Ana",
+            apellido="Mora",
+            correo="ana@test.com",
+            cedula="0912345678",
+            codigo_empleado="TST001",
+        )
+        Trabajador.objects.create(
+            nombre="Bea",
+            apellido="Ruiz",
+            correo="bea@test.com",
+            cedula="0922222222",
+            codigo_empleado="TST009",
+        )
+        path = self.write_csv(
+            "trabajadores.csv",
+            "nombre,apellido,correo,cedula,codigo_empleado\n"
+            "Ana,Mora Vera,ana@test.com,0912345678,tst001\n"
+            "Luis,Vera,BEA@test.com,0987654321,TST002\n"
+            "Eva,Paz,eva@test.com,0911111111,TST003\n",
+        )
+
+        stdout, stderr = self.run_import("trabajadores", path)
+
+        self.assertIn("(1 created, 1 updated), 1 errors", stdout)
+        self.assertIn(
+            "Line 3: correo: Ya existe un trabajador con este correo electrónico.",
+            stderr,
+        )
+        self.assertEqual(
+            Trabajador.objects.get(codigo_empleado="TST001").apellido, "Mora Vera"
+        )
+        self.assertTrue(Trabajador.objects.filter(codigo_empleado="TST003").exists())
+
+    def test_dry_run_writes_nothing(self):
+        """Test that --dry-run only reports."""
+        path = self.write_csv(
+            "productos.csv",
+            "nombre,descripcion,precio,iva\nAceite,Aceite sintético para motor,25,15\n",
+        )
+
+        stdout, _ = self.run_import("productos", path, "--dry-run")
+
+        self.assertIn("Would import 1 rows (1 created, 0 updated)", stdout)
+        self.assertFalse(Producto.objects.exists())
+
+    def test_missing_required_column(self):
+        """Test that a file without a required column is rejected up front."""
+        path = self.write_csv("productos.csv", "nombre,precio\nAceite,25\n")
+
+        with self.assertRaisesMessage(CommandError, "descripcion, iva"):
+            self.run_import("productos", path)
+
+    @skipUnless(importlib.util.find_spec("openpyxl"), "openpyxl is not installed")
+    def test_imports_xlsx(self):
+        """Test reading the optional XLSX format."""
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        workbook.active.append(["Nombre", "Descripcion", "Precio", "IVA"])
+        workbook.active.append(["Bujía", "Bujía de iridio para motor", 7.5, 15])
+        path = self.dir / "productos.xlsx"
+        workbook.save(path)
+
+        stdout, _ = self.run_import("productos", str(path))
+
+        self.assertIn("(1 created, 0 updated), 0 errors", stdout)
+        self.assertEqual(Producto.objects.get().precio, Decimal("7.50"))
+
+
+class InstrumentationMiddlewareTest(TestCase):
+    """Test the per-view query and latency instrumentation."""
+
+    def setUp(self):
+        registry.reset()
+
+    @override_settings(SERVER_TIMING=True)
+    def test_response_carries_server_timing(self):
+        """Test the Server-Timing header reports queries and durations."""
+        response = self.client.get(reverse("productos:list"))
+
+        metrics = response.request_metrics
+        self.assertEqual(metrics.view_name, "productos:list")
+        self.assertGreater(metrics.queries, 0)
+        self.assertIn(f'desc="{metrics.queries} queries"', response["Server-Timing"])
+        self.assertRegex(
+            response["Server-Timing"],
+            r"^db;dur=[\d.]+;desc=\"\d+ queries\", tpl;dur=[\d.]+, total;dur=[\d.]+$",
+        )
+        self.assertGreater(metrics.template_time, 0)
+
+    def test_queries_outside_requests_are_not_counted(self):
+        """Test that the execute wrapper only counts during a request."""
+        response = self.client.get(reverse("trabajadores:list"))
+        before = response.request_metrics.queries
+
+        list(Trabajador.objects.all())
+
+        self.assertEqual(response.request_metrics.queries, before)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_can_be_disabled(self):
+        """Test that SERVER_TIMING=False drops the header but keeps stats."""
+        response = self.client.get(reverse("home"))
+
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertEqual(registry.snapshot()["home"]["requests"], 1)
+
+    def test_server_timing_is_off_when_unset(self):
+        """Test that the header is not sent without a SERVER_TIMING setting."""
+        with self.settings():
+            del settings.SERVER_TIMING
+            response = self.client.get(reverse("home"))
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    @override_settings(DEBUG=True)
+    def test_metrics_endpoint_reports_histograms(self):
+        """Test the JSON histogram of the views requested so far."""
+        self.client.get(reverse("productos:list"))
+        self.client.get(reverse("productos:list"))
+        self.client.get("/no-existe/")
+
+        views = self.client.get(reverse("metrics")).json()["views"]
+
+        stats = views["productos:list"]
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(sum(stats["latency_ms"]["histogram"].values()), 2)
+        self.assertEqual(sum(stats["queries"]["histogram"].values()), 2)
+        self.assertIn("<unresolved>", views)
+
+    def test_metrics_endpoint_requires_staff_outside_debug(self):
+        """Test that anonymous users get a 404 and staff users the stats."""
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+
+        staff = get_user_model().objects.create_user(
+            "admin", password="clave-segura", is_staff=True
+        )
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+
+def load_settings(**environ):
+    """Execute carriacces.settings with ``environ`` and return its globals."""
+    names = (
+        "DB_POOL",
+        "DB_POOL_MIN_SIZE",
+        "DB_POOL_MAX_SIZE",
+        "PGBOUNCER_HOST",
+        "DEBUG",
+        "ALLOWED_HOSTS",
+        "TEMPLATE_PROFILE",
+        "SERVE_MEDIA",
+        "SERVER_TIMING",
+    )
+    clean = {name: value for name, value in os.environ.items() if name not in names}
+    with mock.patch.dict(os.environ, {**clean, **environ}, clear=True):
+        return runpy.run_module("carriacces.settings")
+
+
+class DatabasePoolSettingsTest(TestCase):
+    """Test the DB_POOL connection profiles of the settings."""
+
+    def test_persistent_connections_are_health_checked(self):
+        """Test the default profile keeps connections and checks them."""
+        database = load_settings()["DATABASES"]["default"]
+
+        self.assertEqual(database["CONN_MAX_AGE"], 60)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertNotIn("OPTIONS", database)
+
+    def test_psycopg_profile_configures_native_pool(self):
+        """Test the psycopg profile enables the pool without persistence."""
+        database = load_settings(
+            DB_POOL="psycopg", DB_POOL_MIN_SIZE="4", DB_POOL_MAX_SIZE="8"
+        )["DATABASES"]["default"]
+
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertEqual(
+            database["OPTIONS"]["pool"], {"min_size": 4, "max_size": 8, "timeout": 10}
+        )
+
+    def test_pgbouncer_profile_targets_pgbouncer(self):
+        """Test the pgbouncer profile connects through the compose service."""
+        database = load_settings(DB_POOL="pgbouncer")["DATABASES"]["default"]
+
+        self.assertEqual((database["HOST"], database["PORT"]), ("pgbouncer", "6432"))
+        self.assertTrue(database["DISABLE_SERVER_SIDE_CURSORS"])
+
+    def test_unknown_profile_is_rejected(self):
+        """Test that a typo in DB_POOL fails at startup."""
+        with self.assertRaises(ImproperlyConfigured):
+            load_settings(DB_POOL="pgbouncr")
+
+
+class ProductionSettingsTest(TestCase):
+    """Test the settings of the container (DEBUG off) profile."""
+
+    def test_debug_off_serves_manifest_static_files(self):
+        """Test DEBUG=False selects the hashed, precompressed static files."""
+        loaded = load_settings(DEBUG="False", ALLOWED_HOSTS="carriacces.example")
+
+        self.assertEqual(
+            loaded["STORAGES"]["staticfiles"]["BACKEND"],
+            "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        )
+        self.assertFalse(loaded["WHITENOISE_USE_FINDERS"])
+        self.assertFalse(loaded["WHITENOISE_AUTOREFRESH"])
+        self.assertEqual(loaded["TEMPLATE_PROFILE"], "production")
+        self.assertEqual(loaded["ALLOWED_HOSTS"], ["carriacces.example"])
+        self.assertFalse(loaded["SERVE_MEDIA"])
+        self.assertFalse(loaded["SERVER_TIMING"])
+
+    def test_debug_on_keeps_plain_static_files(self):
+        """Test the development default skips the manifest."""
+        loaded = load_settings(DEBUG="True")
+
+        self.assertEqual(
+            loaded["STORAGES"]["staticfiles"]["BACKEND"],
+            "django.contrib.staticfiles.storage.StaticFilesStorage",
+        )
+        self.assertEqual(loaded["TEMPLATE_PROFILE"], "development")
+        self.assertTrue(loaded["SERVE_MEDIA"])
+        self.assertTrue(loaded["SERVER_TIMING"])
+
+
+class HealthProbeTest(TestCase):
+    """Test the liveness and readiness probes and the startup helpers."""
+
+    def test_liveness_does_not_query(self):
+        """Test /healthz/ answers without touching the database."""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("healthz"))
+
+        self.assertEqual(response.json(), {"status": "ok"})
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_readiness_checks_every_database(self):
+        """Test /readyz/ reports each configured database."""
+        response = self.client.get(reverse("readyz"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), {"status": "ok", "databases": {"default": "ok"}}
+        )
+
+    def test_readiness_fails_when_database_is_down(self):
+        """Test /readyz/ answers 503 without leaking the error message."""
+        error = OperationalError('connection to server at "db" failed')
+        with (
+            mock.patch.object(connection, "cursor", side_effect=error),
+            self.assertLogs("carriacces.health", "WARNING"),
+        ):
+            response = self.client.get(reverse("readyz"))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response.json(),
+            {"status": "unavailable", "databases": {"default": "unavailable"}},
+        )
+
+    def test_readiness_reports_replica_outage_as_degraded(self):
+        """Test a down replica does not take the site out of rotation."""
+        replica = connections.settings["default"]
+        with (
+            mock.patch.dict(connections.settings, {REPLICA_DATABASE: replica}),
+            mock.patch(
+                "carriacces.health.check_database",
+                side_effect=lambda alias: "down" if alias == REPLICA_DATABASE else None,
+            ),
+            self.assertLogs("carriacces.health", "WARNING"),
+        ):
+            response = self.client.get(reverse("readyz"))
+            failing = wait_for_databases(timeout=0)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "status": "degraded",
+                "databases": {"default": "ok", REPLICA_DATABASE: "unavailable"},
+            },
+        )
+        self.assertEqual(failing, {})
+
+    def test_warm_up_fills_the_pool(self):
+        """Test that a pooled connection waits for the pool at startup."""
+        pool = mock.Mock()
+        wrapper = connections["default"]
+        with mock.patch.object(type(wrapper), "pool", pool, create=True):
+            warm_up_connections(timeout=5)
+
+        pool.open.assert_called_once_with(wait=True, timeout=5)
+
+    def test_warm_up_logs_failures(self):
+        """Test that an unreachable database does not stop the worker."""
+        with (
+            mock.patch.object(
+                connection, "ensure_connection", side_effect=OperationalError
+            ),
+            self.assertLogs("carriacces.health", "WARNING") as logs,
+        ):
+            warm_up_connections()
+
+        self.assertIn("'default'", logs.output[0])
+
+    @mock.patch("carriacces.health.time.sleep")
+    def test_wait_for_db_retries_until_available(self, sleep):
+        """Test the command retries while the database is starting."""
+        out = StringIO()
+        with mock.patch(
+            "carriacces.health.check_databases",
+            side_effect=[{"default": "starting up"}, {"default": "starting up"}, {}],
+        ):
+            call_command("wait_for_db", "--timeout", "10", stdout=out)
+
+        self.assertEqual(sleep.call_count, 2)
+        self.assertIn("Databases available", out.getvalue())
+
+    @mock.patch("carriacces.health.time.sleep")
+    def test_wait_for_db_gives_up_after_timeout(self, sleep):
+        """Test the command fails once the timeout is spent."""
+        with (
+            mock.patch(
+                "carriacces.health.check_databases",
+                return_value={"default": "refused"},
+            ),
+            self.assertRaisesMessage(CommandError, "default: refused"),
+        ):
+            call_command("wait_for_db", "--timeout", "0")
+
+        sleep.assert_not_called()
+
+
+# Queries per page with a cold cache. They must not grow with the number of
+# rows; raise a budget only for a deliberate change
+QUERY_BUDGETS = {
+    "productos:list": 5,
+    "proveedores:list": 5,
+    "trabajadores:list": 4,
+    "empresa:detail": 2,
+}
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Test the query budget of the main pages, to catch N+1 regressions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Fill every catalog with more rows than a page shows."""
+        Producto.objects.bulk_create(
+            Producto(
+                nombre=f"Producto {i:02d}",
+                descripcion="Presupuesto",
+                precio=Decimal("10.00"),
+                iva=15,
+            )
+            for i in range(40)
+        )
+        Proveedor.objects.bulk_create(
+            Proveedor(
+                nombre=f"Proveedor {i:02d}",
+                descripcion="Presupuesto",
+                telefono="0991234567",
+                pais="Ecuador" if i % 2 else "Perú",
+                correo=f"proveedor{i}@test.com",
+                direccion="Av. Amazonas 123",
+            )
+            for i in range(40)
+        )
+        Trabajador.objects.bulk_create(
+            Trabajador(
+                nombre="Ana",
+                apellido="Mora",
+                correo=f"presupuesto{i}@test.com",
+                cedula=f"17{i:08d}",
+                codigo_empleado=f"QB{i:03d}",
+            )
+            for i in range(40)
+        )
+        Empresa.objects.all().delete()
+        Empresa.objects.create(
+            nombre="CarriAcces",
+            direccion="Guayaquil",
+            mision="Misión",
+            vision="Visión",
+            anio_fundacion=2020,
+            ruc="0912345678001",
+        )
+
+    def test_list_and_detail_pages_stay_within_budget(self):
+        """Test every budgeted page, including a filtered and a deep page."""
+        for view_name, budget in QUERY_BUDGETS.items():
+            with self.subTest(view_name=view_name):
+                self.assertQueryBudget(view_name, budget)
+
+        self.assertQueryBudget("productos:list", 5, data={"iva": "15", "page": 2})
+        self.assertQueryBudget("proveedores:list", 5, data={"pais": "Perú"})
+
+
+class TransactionScopeTest(TestCase):
+    """Test that only the views that write open a transaction."""
+
+    def assertSavepoints(self, queries, expected):
+        savepoints = [q for q in queries if q["sql"].startswith("SAVEPOINT")]
+        self.assertEqual(bool(savepoints), expected)
+
+    def test_read_views_stay_out_of_atomic_requests(self):
+        """Test list and detail pages skip ATOMIC_REQUESTS if turned on."""
+        with mock.patch.dict(connection.settings_dict, ATOMIC_REQUESTS=True):
+            for view_name in (*QUERY_BUDGETS, "home"):
+                with (
+                    self.subTest(view_name=view_name),
+                    CaptureQueriesContext(connection) as queries,
+                ):
+                    self.client.get(reverse(view_name))
+                self.assertSavepoints(queries.captured_queries, False)
+
+    def test_form_pages_do_not_open_a_transaction(self):
+        """Test that GET of a form page runs outside a transaction."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("productos:create"))
+
+        self.assertSavepoints(queries.captured_queries, False)
+
+    def test_failed_write_is_rolled_back(self):
+        """Test a view failing after saving leaves no row behind."""
+        data = {
+            "nombre": "Producto Revertido",
+            "descripcion": "No debe quedar guardado",
+            "precio": "10.00",
+            "iva": "15",
+        }
+        with (
+            mock.patch("productos.views.messages.success", side_effect=RuntimeError),
+            self.assertRaises(RuntimeError),
+        ):
+            self.client.post(reverse("productos:create"), data)
+
+        self.assertFalse(Producto.objects.filter(nombre=data["nombre"]).exists())
+
+    def test_writes_run_in_a_transaction(self):
+        """Test that create, update and delete each open a transaction."""
+        producto = Producto.objects.create(
+            nombre="Producto Atómico",
+            descripcion="Transacción",
+            precio=Decimal("10.00"),
+            iva=15,
+        )
+        data = {
+            "nombre": "Producto Atómico",
+            "descripcion": "Actualizado",
+            "precio": "12.00",
+            "iva": "15",
+        }
+        requests = (
+            ("productos:create", (), {**data, "nombre": "Producto Nuevo"}),
+            ("productos:update", (producto.pk,), data),
+            ("productos:delete", (producto.pk,), {}),
+        )
+        for view_name, args, payload in requests:
+            with (
+                self.subTest(view_name=view_name),
+                CaptureQueriesContext(connection) as queries,
+            ):
+                response = self.client.post(reverse(view_name, args=args), payload)
+                self.assertEqual(response.status_code, 302)
+            self.assertSavepoints(queries.captured_queries, True)
+
+
+class ReplicaRoutingTest(TestCase):
+    """Test the read-replica router, with a second SQLite file as replica."""
+
+    @classmethod
+    def setUpClass(cls):
+        # The alias only exists while the class runs, so it is added here and
+        # not in ``databases``, which the test runner reads beforehand
+        cls.databases = {"default", REPLICA_DATABASE}
+        cls.replica_dir = tempfile.mkdtemp()
+        replica = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.path.join(cls.replica_dir, "replica.sqlite3"),
+        }
+        connections.settings[REPLICA_DATABASE] = connections.configure_settings(
+            {"default": connections.settings["default"], REPLICA_DATABASE: replica}
+        )[REPLICA_DATABASE]
+        with connections[REPLICA_DATABASE].schema_editor() as editor:
+            for model in (Producto, Proveedor, Trabajador, Empresa):
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA_DATABASE].close()
+        del connections[REPLICA_DATABASE]
+        del connections.settings[REPLICA_DATABASE]
+        shutil.rmtree(cls.replica_dir, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        for model, factory, _ in FACTORIES.values():
+            for using, start in (("default", 0), (REPLICA_DATABASE, 100)):
+                model.objects.using(using).bulk_create(
+                    factory(start + index, rng) for index in range(3)
+                )
+        Empresa.objects.using(REPLICA_DATABASE).bulk_create(
+            [
+                Empresa(
+                    nombre="CarriAcces Réplica",
+                    direccion="Quito",
+                    mision="Misión",
+                    vision="Visión",
+                    anio_fundacion=2020,
+                    ruc="1712345678001",
+                )
+            ]
+        )
+
+    def databases_read(self, view_name, context_name="object_list"):
+        response = self.client.get(reverse(view_name))
+        self.assertEqual(response.status_code, 200)
+        objects = response.context[context_name]
+        if not isinstance(objects, list | QuerySet):
+            objects = [objects]
+        return {obj._state.db for obj in objects}
+
+    def test_list_and_detail_views_read_from_replica(self):
+        """Test the catalog lists and the empresa page use the replica."""
+        for catalog in FACTORIES:
+            with self.subTest(catalog=catalog):
+                self.assertEqual(
+                    self.databases_read(f"{catalog}:list"), {REPLICA_DATABASE}
+                )
+        self.assertEqual(
+            self.databases_read("empresa:detail", "empresa"), {REPLICA_DATABASE}
+        )
+
+    def test_other_views_read_from_primary(self):
+        """Test that form pages load their object from the primary."""
+        producto = Producto.objects.first()
+
+        response = self.client.get(reverse("productos:update", args=[producto.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["object"]._state.db, "default")
+
+    def test_post_sticks_reads_to_primary(self):
+        """Test read-your-writes for the sticky window after a POST."""
+        data = {
+            "nombre": "Producto Recién Creado",
+            "descripcion": "Debe verse aunque la réplica no lo tenga",
+            "precio": "10.00",
+            "iva": "15",
+        }
+        response = self.client.post(reverse("productos:create"), data)
+
+        self.assertEqual(response.status_code, 302)
+        cookie = response.cookies[STICKY_COOKIE]
+        self.assertEqual(cookie["max-age"], settings.REPLICA_STICKY_SECONDS)
+        response = self.client.get(reverse("productos:list"), {"q": data["nombre"]})
+        self.assertEqual(
+            [producto.nombre for producto in response.context["object_list"]],
+            [data["nombre"]],
+        )
+
+        # Once the cookie expires the browser reads from the replica again
+        del self.client.cookies[STICKY_COOKIE]
+        self.assertEqual(self.databases_read("productos:list"), {REPLICA_DATABASE})
+
+    def test_writes_go_to_primary(self):
+        """Test that objects loaded from the replica are saved on the primary."""
+        producto = Producto.objects.using(REPLICA_DATABASE).first()
+
+        self.assertEqual(router.db_for_write(Producto, instance=producto), "default")
+        self.assertEqual(router.db_for_read(Producto), "default")
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_replica_reads_are_cached_briefly(self):
+        """Test caches filled from the replica expire after a short timeout."""
+
+        def data_timeouts(calls):
+            # Version tokens carry no data and never expire
+            return {
+                call.args[2]
+                for call in calls
+                if not call.args[0].startswith(VERSION_PREFIX)
+            }
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.client.get(reverse("productos:list"))
+            replica_timeouts = data_timeouts(cache_set.call_args_list)
+            cache_set.reset_mock()
+            cache.clear()
+            self.client.cookies[STICKY_COOKIE] = "1"
+            self.client.get(reverse("productos:list"))
+            primary_timeouts = data_timeouts(cache_set.call_args_list)
+
+        self.assertEqual(replica_timeouts, {settings.REPLICA_CACHE_TIMEOUT})
+        self.assertIn(3600, primary_timeouts)
+        self.assertIn(settings.COUNT_CACHE_TIMEOUT, primary_timeouts)
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        """Test reads use the primary while the replica cannot be reached."""
+        self.addCleanup(_replica_down_until.update, time=0.0)
+        with (
+            mock.patch.object(
+                connections[REPLICA_DATABASE],
+                "ensure_connection",
+                side_effect=OperationalError,
+            ) as ensure_connection,
+            self.assertLogs("carriacces.routers", "WARNING"),
+        ):
+            self.assertEqual(self.databases_read("productos:list"), {"default"})
+            self.assertEqual(self.databases_read("productos:list"), {"default"})
+
+        # The connection is not retried on every request
+        ensure_connection.assert_called_once()
+
+    def test_falls_back_to_primary_without_replica(self):
+        """Test that reads use the primary when no replica is configured."""
+        with mock.patch.dict(connections.settings):
+            del connections.settings[REPLICA_DATABASE]
+
+            self.assertEqual(self.databases_read("productos:list"), {"default"})
+
+
+class BenchmarkTest(TestCase):
+    """Test the benchmark row generator and the in-process runner."""
+
+    def test_seed_catalogs_only_adds_missing_rows(self):
+        """Test seeding twice keeps the requested number of valid rows."""
+        sizes = {"productos": 30, "proveedores": 20, "trabajadores": 20}
+        self.assertEqual(seed_catalogs(sizes), sizes)
+        self.assertEqual(
+            seed_catalogs({**sizes, "productos": 35}),
+            {"productos": 5, "proveedores": 0, "trabajadores": 0},
+        )
+        self.assertEqual(seeded_queryset("productos").count(), 35)
+
+        producto = seeded_queryset("productos").first()
+        form = ProductoForm(
+            data={
+                "nombre": producto.nombre + " Copia",
+                "descripcion": producto.descripcion,
+                "precio": producto.precio,
+                "iva": producto.iva,
+            }
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_run_client_measures_every_scenario(self):
+        """Test list/create/update/delete are measured and leave the tables as they were."""
+        seed_catalogs({"productos": 5, "proveedores": 5, "trabajadores": 5})
+        total = Producto.objects.count()
+
+        scenarios = run_client(iterations=2)
+
+        self.assertEqual(len(scenarios), 12)
+        for name, summary in scenarios.items():
+            with self.subTest(scenario=name):
+                self.assertEqual(summary["requests"], 2)
+                self.assertGreater(summary["queries"]["mean"], 0)
+                self.assertLessEqual(
+                    summary["latency_ms"]["p50"], summary["latency_ms"]["p99"]
+                )
+        self.assertEqual(seeded_queryset("productos").count(), 5)
+        self.assertEqual(Producto.objects.count(), total)
+
+    def test_compare_reports(self):
+        """Test the p95 change and queries of the shared scenarios."""
+        old = {"scenarios": {"productos:list": summarize([(0.010, 4), (0.020, 4)])}}
+        new = {
+            "scenarios": {
+                "productos:list": summarize([(0.011, 5), (0.022, 5)]),
+                "proveedores:list": summarize([(0.010, 3)]),
+            }
+        }
+
+        [(scenario, old_p95, new_p95, change, old_q, new_q)] = compare_reports(old, new)
+
+        self.assertEqual(scenario, "productos:list")
+        self.assertAlmostEqual(new_p95 / old_p95, 1.1, places=2)
+        self.assertEqual(change, 10.0)
+        self.assertEqual((old_q, new_q), (4, 5))
+
+
+def locmem_engine(loader, templates):
+    """Return an engine loading ``templates`` through ``loader``."""
+    return Engine(
+        loaders=[(loader, [("django.template.loaders.locmem.Loader", templates)])]
+    )
+
+
+class CachedLoaderTest(TestCase):
+    """Test the loader of the production template profile."""
+
+    LOADER = "carriacces.template_loaders.CachedLoader"
+    TEMPLATES = {
+        "list.html": (
+            "{% for item in items %}{% include 'card.html' %}{% endfor %}"
+            "{% include card_name %}"
+        ),
+        "card.html": "[{{ item }}]",
+        "other.html": "<{{ items|length }}>",
+        "broken.html": "{% include 'missing.html' %}",
+        "tree.html": (
+            "{% if n %}{{ n }}{% with n=n|add:-1 %}{% include 'tree.html' %}"
+            "{% endwith %}{% endif %}"
+        ),
+    }
+
+    def test_constant_includes_are_bound_once(self):
+        """Test that only includes with a literal name are bound."""
+        engine = locmem_engine(self.LOADER, self.TEMPLATES)
+        template = engine.get_template("list.html")
+
+        constant, variable = template.nodelist.get_nodes_by_type(IncludeNode)
+        self.assertIsInstance(constant.template, BoundInclude)
+        self.assertIs(constant.template.template, engine.get_template("card.html"))
+        self.assertNotIsInstance(variable.template, BoundInclude)
+        self.assertIs(engine.get_template("list.html"), template)
+
+    def test_output_matches_django_cached_loader(self):
+        """Test that bound and dynamic includes render as before."""
+        context = {"items": [1, 2], "card_name": "other.html"}
+        outputs = [
+            locmem_engine(loader, self.TEMPLATES)
+            .get_template("list.html")
+            .render(Context(context))
+            for loader in ("django.template.loaders.cached.Loader", self.LOADER)
+        ]
+
+        self.assertEqual(outputs, ["[1][2]<2>", "[1][2]<2>"])
+
+    def test_missing_include_still_fails_at_render_time(self):
+        """Test that an include of a missing template is left unbound."""
+        template = locmem_engine(self.LOADER, self.TEMPLATES).get_template(
+            "broken.html"
+        )
+
+        with self.assertRaises(TemplateDoesNotExist):
+            template.render(Context())
+
+    def test_self_include_does_not_recurse(self):
+        """Test that a template including itself is bound without looping."""
+        template = locmem_engine(self.LOADER, self.TEMPLATES).get_template("tree.html")
+
+        self.assertEqual(template.render(Context({"n": 3})), "321")
+
+    def test_template_benchmark_reports_every_profile(self):
+        """Test the per-card render cost of the real card templates."""
+        results = run_templates(catalogs=("productos",), cards=2, rounds=2)
+
+        self.assertEqual(set(results), {f"productos:{profile}" for profile in PROFILES})
+        for summary in results.values():
+            self.assertGreater(summary["cold_us"], 0)
+            self.assertGreater(summary["warm_us"], 0)
@@ -0,0 +1,56 @@
+"""
+Test helpers for CarriAcces.
+"""
+
+from functools import lru_cache
+from io import BytesIO
+
+from django.urls import reverse
+from PIL import Image
+
+
+@lru_cache(maxsize=32)
+def png_bytes(color="red", size=(400, 200), fmt="PNG"):
+    """
+    Return an in-memory image (PNG by default).
+
+    Encoding is the slow part and bytes are immutable, so every combination
+    is built once per test process and shared by the tests asking for it.
+    """
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting how many SQL queries a page runs.
+
+    The count comes from ``carriacces.instrumentation``, which attaches the
+    measurements of each request to the response. A budget that holds with
+    many rows catches N+1 regressions: a query per row breaks it at once.
+    """
+
+    def assertQueryBudget(self, view_name, budget, *args, data=None, **kwargs):
+        """
+        GET ``view_name`` and fail if it runs more than ``budget`` queries.
+
+        Args:
+            view_name: URL name, as in ``reverse()``
+            budget: Maximum number of queries allowed
+            args, kwargs: URL arguments for ``reverse()``
+            data: Query string parameters
+
+        Returns:
+            The response, for further assertions
+        """
+        response = self.client.get(reverse(view_name, args=args, kwargs=kwargs), data)
+        self.assertEqual(response.status_code, 200)
+        metrics = response.request_metrics
+        self.assertEqual(metrics.view_name, view_name)
+        self.assertLessEqual(
+            metrics.queries,
+            budget,
+            f"{view_name} ran {metrics.queries} queries, budget is {budget}",
+        )
+        return response
@@ -3,10 +3,14 @@ URL configuration for carriacces project.
 CarriAcces - Sistema de gestión para tienda de accesorios automotrices.
 """
 
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+from django.views.static import serve
+from .health import liveness, readiness
+from .instrumentation import metrics_view
 from .views import HomeView
 
 urlpatterns = [
@@ -14,6 +18,11 @@ urlpatterns = [
     path("", HomeView.as_view(), name="home"),
     # Administración
     path("admin/", admin.site.urls),
+    # Estadísticas de consultas y latencia por vista de este proceso
+    path("metricas/", metrics_view, name="metrics"),
+    # Sondas de vida y de disponibilidad (base de datos) para el orquestador
+    path("healthz/", liveness, name="healthz"),
+    path("readyz/", readiness, name="readyz"),
     # Apps principales
     path("nosotros/", include("empresa.urls")),
     path("trabajadores/", include("trabajadores.urls")),
@@ -21,10 +30,16 @@ urlpatterns = [
     path("proveedores/", include("proveedores.urls")),
 ]
 
-# Configuración para servir archivos media en desarrollo
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+# Archivos media servidos por Django en desarrollo o si SERVE_MEDIA está
+# activo (los estáticos los sirve WhiteNoise)
+if settings.SERVE_MEDIA:
+    urlpatterns += [
+        re_path(
+            rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.*)$",
+            serve,
+            {"document_root": settings.MEDIA_ROOT},
+        ),
+    ]
 
 # Manejadores de errores personalizados
 handler404 = "carriacces.views.handler404"
@@ -3,11 +3,93 @@ Utility functions for CarriAcces application.
 Security and validation utilities following OWASP best practices.
 """
 
+from collections import namedtuple
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from django.db import router
 import os
 from PIL import Image
 
+# Bytes read to identify an upload; enough for every signature below
+HEADER_SIZE = 4096
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+)
+
+ImageInfo = namedtuple("ImageInfo", ["format", "width", "height"])
+
+
+def _upload(image_file):
+    """Return the underlying upload of a ``FieldFile``, or the file itself."""
+    if getattr(image_file, "_committed", True) is False:
+        return image_file.file
+    return image_file
+
+
+def sniff_image_format(header):
+    """
+    Identify an image format from its first bytes.
+
+    Args:
+        header: Leading bytes of the file (see ``HEADER_SIZE``)
+
+    Returns:
+        Pillow format name ("JPEG", "PNG", "WEBP") or None if unknown
+    """
+    for signature, fmt in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return fmt
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+def read_image_info(image_file):
+    """
+    Read format and dimensions of an upload in a single pass.
+
+    The magic bytes are sniffed from the first ``HEADER_SIZE`` bytes and
+    Pillow only parses the header of that format; pixels are never decoded.
+    Uploads spooled to disk are read from their temporary file instead of
+    being loaded into memory. The result is cached on the upload, so the
+    form, the model and the ``pre_save`` signals share it.
+
+    Args:
+        image_file: Django ``UploadedFile`` or uncommitted ``FieldFile``
+
+    Returns:
+        ImageInfo, or None if the file is not a supported image
+    """
+    upload = _upload(image_file)
+    if hasattr(upload, "image_info"):
+        return upload.image_info
+
+    info = None
+    try:
+        if hasattr(upload, "temporary_file_path"):
+            source = open(upload.temporary_file_path(), "rb")
+        else:
+            upload.seek(0)
+            source = upload
+        try:
+            fmt = sniff_image_format(source.read(HEADER_SIZE))
+            if fmt is not None:
+                source.seek(0)
+                with Image.open(source, formats=[fmt]) as img:
+                    info = ImageInfo(img.format, img.width, img.height)
+        finally:
+            if source is upload:
+                upload.seek(0)
+            else:
+                source.close()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        info = None
+
+    upload.image_info = info
+    return info
+
 
 def validate_image_file(image_file):
     """
@@ -25,14 +107,18 @@ def validate_image_file(image_file):
     if not image_file:
         return True
 
+    # Files already in storage were validated when they were uploaded
+    if getattr(image_file, "_committed", False):
+        return True
+
     # Check file size - handle missing files gracefully
-    max_size = getattr(settings, "FILE_UPLOAD_MAX_MEMORY_SIZE", 5 * 1024 * 1024)
+    max_size = getattr(settings, "MAX_IMAGE_UPLOAD_SIZE", 5 * 1024 * 1024)
     try:
         file_size = image_file.size
     except (FileNotFoundError, OSError):
         # File doesn't exist on disk (existing reference), skip validation
         return True
-    
+
     if file_size > max_size:
         raise ValidationError(
             f"El archivo es demasiado grande. Tamaño máximo permitido: {max_size // (1024 * 1024)}MB"
@@ -54,30 +140,82 @@ def validate_image_file(image_file):
     allowed_types = getattr(
         settings, "ALLOWED_IMAGE_TYPES", ["image/jpeg", "image/png", "image/webp"]
     )
-    if (
-        hasattr(image_file, "content_type")
-        and image_file.content_type not in allowed_types
-    ):
+    content_type = getattr(_upload(image_file), "content_type", None)
+    if content_type is not None and content_type not in allowed_types:
         allowed_str = ", ".join(allowed_types)
         raise ValidationError(
             f"Tipo MIME no permitido. Tipos permitidos: {allowed_str}"
         )
 
-    # Additional security: Try to open image with PIL to verify it's a valid image
-    try:
-        # Reset file pointer to beginning
-        image_file.seek(0)
-        with Image.open(image_file) as img:
-            # Verify the image and check for potential security issues
-            img.verify()
-        # Reset file pointer again for Django to use
-        image_file.seek(0)
-    except Exception:
+    # Check the real content: magic bytes and image header
+    if read_image_info(image_file) is None:
         raise ValidationError("El archivo no es una imagen válida o está corrupto.")
 
     return True
 
 
+def image_changed(instance, field_name="imagen", update_fields=None):
+    """
+    Return whether saving ``instance`` stores a different image.
+
+    True for a pending upload, and for a file already in storage whose name
+    the database row does not have yet (``FieldFile.save(name, content)``,
+    scripts assigning a name). Only the latter costs a query, on the primary
+    database; saves with ``update_fields`` without the field are skipped.
+
+    Args:
+        instance: Model instance about to be saved
+        field_name: Name of the ``ImageField``
+        update_fields: ``update_fields`` of the save, if any
+    """
+    if update_fields is not None and field_name not in update_fields:
+        return False
+    field_file = getattr(instance, field_name)
+    if field_file and not field_file._committed:
+        return True
+    name = field_file.name or ""
+    if instance._state.adding:
+        return bool(name)
+    model = type(instance)
+    stored = (
+        model._base_manager.db_manager(router.db_for_write(model, instance=instance))
+        .filter(pk=instance.pk)
+        .values_list(field_name, flat=True)
+        .first()
+    )
+    return (stored or "") != name
+
+
+def record_image_metadata(instance, field_name="imagen"):
+    """
+    Store format and dimensions of a new image on the model instance.
+
+    Fills ``<field>_ancho``, ``<field>_alto`` and ``<field>_formato`` from the
+    cached ``read_image_info`` result of a pending upload, or from the header
+    of a file already in storage (``FieldFile.save(name, content)`` commits it
+    before the model is saved). Call it only when ``image_changed`` is true,
+    so editing other fields never reopens the file.
+
+    Args:
+        instance: Model instance about to be saved
+        field_name: Name of the ``ImageField``
+    """
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        info = None
+    elif field_file._committed:
+        try:
+            with field_file.open("rb"):
+                info = read_image_info(field_file)
+        except OSError:
+            info = None
+    else:
+        info = read_image_info(field_file)
+    setattr(instance, f"{field_name}_ancho", info.width if info else None)
+    setattr(instance, f"{field_name}_alto", info.height if info else None)
+    setattr(instance, f"{field_name}_formato", info.format if info else "")
+
+
 def sanitize_filename(filename):
     """
     Sanitize filename to prevent path traversal attacks.
@@ -119,7 +257,7 @@ def validate_uploaded_image(image_file):
     Raises:
         ValidationError: If validation fails
     """
-    if not image_file:
+    if not image_file or getattr(image_file, "_committed", False):
         return image_file
 
     # Validate the image file
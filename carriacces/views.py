@@ -1,11 +1,45 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.shortcuts import render
 from django.views.generic import TemplateView
+from .cache import VersionedCachePageMixin
 
 
-class HomeView(TemplateView):
+class ReadOnlyViewMixin:
+    """
+    Mixin para vistas de solo lectura (listados, detalle, página principal).
+
+    Las excluye de ``ATOMIC_REQUESTS`` aunque se vuelva a activar: un
+    BEGIN/COMMIT por cada lectura solo añade viajes a la base de datos y
+    mantiene abierta la instantánea mientras se arma la respuesta.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return transaction.non_atomic_requests(super().as_view(**initkwargs))
+
+
+class AtomicViewMixin:
+    """
+    Mixin para vistas que escriben (crear, editar, eliminar).
+
+    Las peticiones que no son de lectura (POST...) se ejecutan completas en
+    una transacción, como hacía ``ATOMIC_REQUESTS``: si la vista falla no
+    queda ningún cambio a medias. Los GET del formulario no abren ninguna.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class HomeView(ReadOnlyViewMixin, VersionedCachePageMixin, TemplateView):
     """Vista para la página principal estática."""
 
     template_name = "home.html"
+    cache_models = ("empresa.Empresa",)  # Pie de página con datos de la empresa
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -14,6 +48,31 @@ class HomeView(TemplateView):
         return context
 
 
+class UniqueConstraintViewMixin:
+    """
+    Mixin para CreateView/UpdateView con un ``UniqueConstraintFormMixin``.
+
+    Si el guardado choca con una restricción única (otra petición guardó el
+    mismo valor después de validar), vuelve a mostrar el formulario con el
+    error en lugar de responder con un error 500.
+    """
+
+    def get_form(self, form_class=None):
+        # Se conserva para volver a mostrarlo si el guardado falla
+        self.form = super().get_form(form_class)
+        return self.form
+
+    def post(self, request, *args, **kwargs):
+        # Se captura aquí y no en form_valid para envolver también el
+        # form_valid de la vista concreta (mensaje de éxito incluido)
+        try:
+            return super().post(request, *args, **kwargs)
+        except ValidationError:
+            if not self.form.errors:
+                raise
+            return self.form_invalid(self.form)
+
+
 def handler404(request, exception):
     """Manejador personalizado para error 404."""
     return render(request, "errors/404.html", status=404)
@@ -0,0 +1,12 @@
+from django.utils.functional import SimpleLazyObject
+from .models import Empresa
+
+
+def empresa(request):
+    """
+    Expone la empresa como ``empresa_info`` en todas las plantillas.
+
+    Es perezoso: solo se resuelve si la plantilla lo usa, y en ese caso se
+    lee de la cache del singleton en lugar de consultar la base de datos.
+    """
+    return {"empresa_info": SimpleLazyObject(Empresa.objects.get_empresa)}
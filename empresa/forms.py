@@ -2,6 +2,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 from datetime import datetime
 from .models import Empresa
+from carriacces.forms import ImageUploadField
 
 
 class EmpresaForm(forms.ModelForm):
@@ -18,6 +19,7 @@ class EmpresaForm(forms.ModelForm):
             "ruc",
             "imagen",
         ]
+        field_classes = {"imagen": ImageUploadField}
         widgets = {
             "nombre": forms.TextInput(
                 attrs={
@@ -173,38 +175,20 @@ class EmpresaForm(forms.ModelForm):
                 ):
                     raise ValidationError("Ya existe una empresa con este RUC.")
             else:
-                # Creando nuevo registro - verificar que no exista otra empresa
-                if Empresa.objects.exists():
+                # Creando nuevo registro - verificar que no exista otra empresa.
+                # Si no hay empresa tampoco puede haber otra con el mismo RUC.
+                if self.instance.other_empresa_exists():
                     raise ValidationError(
                         "Solo puede existir una empresa en el sistema."
                     )
-                if Empresa.objects.filter(ruc=ruc).exists():
-                    raise ValidationError("Ya existe una empresa con este RUC.")
         return ruc
 
-    def clean_imagen(self):
-        """Validación personalizada para la imagen."""
-        imagen = self.cleaned_data.get("imagen")
-        if imagen:
-            # Verificar tipo de archivo
-            allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
-            if imagen.content_type not in allowed_types:
-                raise ValidationError(
-                    "Solo se permiten imágenes en formato JPG, PNG o WebP."
-                )
-
-            # Verificar tamaño
-            if imagen.size > 5 * 1024 * 1024:  # 5MB
-                raise ValidationError("La imagen no puede ser mayor a 5MB.")
-
-        return imagen
-
     def clean(self):
         """Validación global del formulario."""
         cleaned_data = super().clean()
 
         # Verificar que solo exista una empresa (singleton)
-        if not self.instance.pk and Empresa.objects.exists():
+        if self.instance.other_empresa_exists():
             raise ValidationError("Solo puede existir una empresa en el sistema.")
 
         return cleaned_data
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:43
+
+import carriacces.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='empresa',
+            name='imagen',
+            field=models.ImageField(blank=True, help_text='Logo o imagen representativa de la empresa (opcional)', null=True, storage=carriacces.storage.content_hash_storage, upload_to='empresa/', verbose_name='Logo/Imagen'),
+        ),
+    ]
@@ -1,20 +1,71 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, router, transaction
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, RegexValidator
 from django.core.exceptions import ValidationError
+from carriacces.storage import content_hash_storage
+from carriacces.routers import replica_cache_timeout
+
+EMPRESA_CACHE_KEY = "carriacces:empresa:singleton"
+
+# Distingue "no está en cache" de "no existe empresa" (None cacheado)
+_MISSING = object()
 
 
 class EmpresaManager(models.Manager):
     """Manager personalizado para manejar la lógica singleton de Empresa."""
 
     def get_empresa(self):
-        """Obtiene la única instancia de empresa o None si no existe."""
-        return self.first()
+        """
+        Obtiene la única instancia de empresa o None si no existe, para mostrarla.
+
+        El resultado, incluido None, se guarda en cache ``EMPRESA_CACHE_TIMEOUT``
+        segundos o hasta que una señal post_save/post_delete lo invalida. No
+        sirve para decidir escrituras: una lectura que compite con un COMMIT
+        (o que viene de la réplica) puede volver a cachear un valor anterior.
+        """
+        empresa = cache.get(EMPRESA_CACHE_KEY, _MISSING)
+        if empresa is _MISSING:
+            empresa = self.order_by("pk").first()
+            cache.set(EMPRESA_CACHE_KEY, empresa, self.get_cache_timeout())
+        return empresa
+
+    async def aget_empresa(self):
+        """Versión asíncrona de ``get_empresa``, para las vistas async."""
+        empresa = await cache.aget(EMPRESA_CACHE_KEY, _MISSING)
+        if empresa is _MISSING:
+            empresa = await self.order_by("pk").afirst()
+            await cache.aset(EMPRESA_CACHE_KEY, empresa, self.get_cache_timeout())
+        return empresa
+
+    def get_cache_timeout(self):
+        return replica_cache_timeout(getattr(settings, "EMPRESA_CACHE_TIMEOUT", 300))
+
+    def get_empresa_for_update(self):
+        """Obtiene la empresa desde la base principal, sin pasar por la cache."""
+        return self.db_manager(router.db_for_write(self.model)).order_by("pk").first()
+
+    def has_empresa(self) -> bool:
+        """
+        Indica si ya existe la empresa, consultando siempre la base principal.
+
+        Es la verificación del singleton antes de crear, así que no usa la
+        cache de ``get_empresa``.
+        """
+        return self.db_manager(router.db_for_write(self.model)).exists()
+
+    def invalidate_empresa(self) -> None:
+        """Descarta la empresa cacheada; se llama desde las señales."""
+        cache.delete(EMPRESA_CACHE_KEY)
+        transaction.on_commit(lambda: cache.delete(EMPRESA_CACHE_KEY))
 
     def create_empresa(self, **kwargs):
         """Crea la empresa solo si no existe otra."""
-        if self.exists():
+        empresa = self.model(**kwargs)
+        if empresa.other_empresa_exists():
             raise ValidationError("Ya existe una empresa registrada en el sistema.")
-        return self.create(**kwargs)
+        empresa.save(force_insert=True, using=self.db)
+        return empresa
 
 
 class Empresa(models.Model):
@@ -59,17 +110,32 @@ class Empresa(models.Model):
 
     imagen = models.ImageField(
         upload_to="empresa/",
+        storage=content_hash_storage,
         blank=True,
         null=True,
         verbose_name="Logo/Imagen",
         help_text="Logo o imagen representativa de la empresa (opcional)",
     )
 
+    # Metadatos leídos una sola vez al subir la imagen (ver carriacces.utils)
+    imagen_ancho = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Ancho de la imagen"
+    )
+    imagen_alto = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Alto de la imagen"
+    )
+    imagen_formato = models.CharField(
+        max_length=10, blank=True, editable=False, verbose_name="Formato de la imagen"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     objects = EmpresaManager()
 
+    # Resultado de other_empresa_exists(), calculado una vez por instancia
+    _other_empresa = None
+
     class Meta:
         verbose_name = "Empresa"
         verbose_name_plural = "Empresas"
@@ -80,12 +146,25 @@ class Empresa(models.Model):
     def __str__(self) -> str:
         return self.nombre
 
+    def other_empresa_exists(self) -> bool:
+        """
+        Indica si crear esta empresa rompería el singleton.
+
+        Consulta la base principal una sola vez por instancia: la vista, el
+        formulario, ``clean`` y ``save`` validan la misma instancia.
+        """
+        if self.pk:
+            return False
+        if self._other_empresa is None:
+            self._other_empresa = Empresa.objects.has_empresa()
+        return self._other_empresa
+
     def clean(self) -> None:
         """Validación personalizada del modelo."""
         super().clean()
 
         # Validar que solo exista una empresa
-        if not self.pk and Empresa.objects.exists():
+        if self.other_empresa_exists():
             raise ValidationError("Solo puede existir una empresa en el sistema.")
 
         # Normalizar datos
@@ -108,8 +187,6 @@ class Empresa(models.Model):
             )
 
     def save(self, *args, **kwargs):
-        """Override save para garantizar singleton."""
-        if not self.pk and Empresa.objects.exists():
-            raise ValidationError("Solo puede existir una empresa en el sistema.")
+        """Override save para garantizar singleton (validado en ``clean``)."""
         self.full_clean()
         super().save(*args, **kwargs)
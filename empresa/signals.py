@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from carriacces.cache import bump_model_version
+from carriacces.utils import image_changed, record_image_metadata
+from .models import Empresa
+
+
+@receiver(post_save, sender=Empresa)
+@receiver(post_delete, sender=Empresa)
+def invalidar_cache_empresa(sender, **kwargs):
+    """Invalida la empresa cacheada y las páginas que la muestran."""
+    Empresa.objects.invalidate_empresa()
+    bump_model_version(sender)
+
+
+@receiver(pre_save, sender=Empresa)
+def registrar_metadatos_imagen(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """Guarda formato y dimensiones de una imagen nueva."""
+    if not raw and image_changed(instance, update_fields=update_fields):
+        record_image_metadata(instance)
@@ -3,13 +3,26 @@ Test cases for Empresa app using London School TDD approach.
 Focus on interaction testing and behavior verification.
 """
 
-from django.test import TestCase, Client
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 from datetime import datetime
 
+from carriacces.cache import page_cache_key
+
 from empresa.models import Empresa
 from empresa.forms import EmpresaForm
+from empresa.views import EmpresaAsyncDetailView
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
 
 
 class EmpresaModelTest(TestCase):
@@ -233,6 +246,87 @@ class EmpresaManagerTest(TestCase):
         self.assertIn("Ya existe una empresa registrada", str(context.exception))
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
+class EmpresaSingletonCacheTest(TestCase):
+    """Test the cached singleton accessor and its signal invalidation."""
+
+    def setUp(self):
+        """Start with an empty cache."""
+        cache.clear()
+        self.valid_data = {
+            "nombre": "CarriAcces S.A.",
+            "direccion": "Av. Principal 123, Quito, Ecuador",
+            "mision": "Proveer los mejores accesorios automotrices",
+            "vision": "Ser líderes en el mercado automotriz",
+            "anio_fundacion": 2010,
+            "ruc": "1234567890001",
+        }
+
+    def test_get_empresa_cached_after_first_call(self):
+        """Test that repeated lookups do not query the database."""
+        empresa = Empresa.objects.create(**self.valid_data)
+        Empresa.objects.get_empresa()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(Empresa.objects.get_empresa(), empresa)
+
+    def test_missing_empresa_is_cached_too(self):
+        """Test that the absence of an empresa is memoized as well."""
+        self.assertIsNone(Empresa.objects.get_empresa())
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(Empresa.objects.get_empresa())
+
+    @override_settings(EMPRESA_CACHE_TIMEOUT=120)
+    def test_cached_empresa_expires(self):
+        """Test that the cached empresa is stored with a finite timeout."""
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            Empresa.objects.get_empresa()
+
+        self.assertEqual(cache_set.call_args.args[2], 120)
+
+    def test_singleton_guards_ignore_a_stale_cache(self):
+        """Test that a cached None does not let a second empresa in."""
+        self.assertIsNone(Empresa.objects.get_empresa())
+        # Another process creates the empresa; this cache still holds None
+        Empresa.objects.bulk_create([Empresa(**self.valid_data)])
+        data = {**self.valid_data, "ruc": "9876543210001"}
+
+        self.assertIsNone(Empresa.objects.get_empresa())
+        self.assertTrue(Empresa.objects.has_empresa())
+        with self.assertRaises(ValidationError):
+            Empresa.objects.create_empresa(**data)
+        with self.assertRaises(ValidationError):
+            Empresa(**data).save()
+        self.assertFalse(EmpresaForm(data=data).is_valid())
+        response = self.client.get(reverse("empresa:create"))
+        self.assertRedirects(response, reverse("empresa:detail"))
+        self.assertEqual(Empresa.objects.count(), 1)
+
+    def test_cache_invalidated_on_save_and_delete(self):
+        """Test that post_save and post_delete refresh the singleton."""
+        self.assertIsNone(Empresa.objects.get_empresa())
+
+        empresa = Empresa.objects.create(**self.valid_data)
+        self.assertEqual(Empresa.objects.get_empresa(), empresa)
+
+        empresa.nombre = "Nuevo Nombre"
+        empresa.save()
+        self.assertEqual(Empresa.objects.get_empresa().nombre, "Nuevo Nombre")
+
+        empresa.delete()
+        self.assertIsNone(Empresa.objects.get_empresa())
+
+    def test_context_processor_exposes_empresa(self):
+        """Test that base templates receive the cached empresa."""
+        Empresa.objects.create(**self.valid_data)
+
+        response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.context["empresa_info"].ruc, "1234567890001")
+        self.assertContains(response, "RUC 1234567890001")
+
+
 class EmpresaFormTest(TestCase):
     """Test EmpresaForm validation and behavior."""
 
@@ -343,6 +437,16 @@ class EmpresaViewTest(TestCase):
         empresa = Empresa.objects.first()
         self.assertEqual(empresa.nombre, "Carriacces S.A.")
 
+    def test_create_post_checks_the_singleton_once(self):
+        """Test that view, form, clean and save share one existence query."""
+        with mock.patch.object(
+            Empresa.objects, "has_empresa", wraps=Empresa.objects.has_empresa
+        ) as has_empresa:
+            response = self.client.post(reverse("empresa:create"), data=self.valid_data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(has_empresa.call_count, 1)
+
     def test_empresa_create_view_post_invalid(self):
         """Test create view POST with invalid data."""
         data = self.valid_data.copy()
@@ -386,3 +490,109 @@ class EmpresaViewTest(TestCase):
         self.assertContains(response, "form")
         empresa.refresh_from_db()
         self.assertEqual(empresa.ruc, "1234567890001")  # Should not change
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class EmpresaPageCacheTest(TestCase):
+    """Test full-page caching of the detail view and its invalidation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create one empresa."""
+        cls.empresa = Empresa.objects.create(
+            nombre="CarriAcces S.A.",
+            direccion="Av. Principal 123, Quito, Ecuador",
+            mision="Proveer los mejores accesorios automotrices",
+            vision="Ser líderes en el mercado automotriz",
+            anio_fundacion=2010,
+            ruc="1234567890001",
+        )
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def test_detail_page_served_from_cache(self):
+        """Test that a second request does not query the empresa table."""
+        self.client.get(reverse("empresa:detail"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("empresa:detail"))
+
+        self.assertFalse(
+            any("empresa_empresa" in q["sql"] for q in queries.captured_queries)
+        )
+
+        self.assertContains(response, "CARRIACCES S.A.")
+
+    def test_unknown_query_params_share_the_cached_page(self):
+        """Test that junk query parameters do not create new cache entries."""
+        self.client.get(reverse("empresa:detail"))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("empresa:detail"), {"utm_source": "x" * 500})
+
+        self.assertFalse(
+            any("empresa_empresa" in q["sql"] for q in queries.captured_queries)
+        )
+
+    def test_page_cache_key_has_fixed_length(self):
+        """Test that the key does not grow with the URL."""
+        short = page_cache_key("/nosotros/", {}, ["v1"])
+        long = page_cache_key("/nosotros/" + "x" * 500, {"q": "y" * 500}, ["v1"])
+
+        self.assertEqual(len(short), len(long))
+        self.assertNotEqual(short, long)
+
+    def test_detail_page_invalidated_on_save(self):
+        """Test that saving the empresa bumps its version and the page."""
+        self.client.get(reverse("empresa:detail"))
+
+        self.empresa.nombre = "Nuevo Nombre"
+        self.empresa.save()
+        response = self.client.get(reverse("empresa:detail"))
+
+        self.assertContains(response, "NUEVO NOMBRE")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class EmpresaAsyncDetailViewTest(TestCase):
+    """Test the async variant of the empresa detail view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create one empresa."""
+        cls.empresa = Empresa.objects.create(
+            nombre="CarriAcces S.A.",
+            direccion="Av. Principal 123, Quito, Ecuador",
+            mision="Proveer los mejores accesorios automotrices",
+            vision="Ser líderes en el mercado automotriz",
+            anio_fundacion=2010,
+            ruc="1234567890001",
+        )
+
+    def setUp(self):
+        """Start with an empty cache and build the async view."""
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.view = EmpresaAsyncDetailView.as_view()
+
+    async def test_detail_uses_async_orm(self):
+        """Test that the view loads the empresa and renders it."""
+        response = await self.view(self.factory.get("/nosotros/"))
+        await sync_to_async(response.render)()
+
+        self.assertEqual(response.context_data["empresa"], self.empresa)
+        self.assertTrue(response.context_data["has_empresa"])
+        self.assertContains(response, "CARRIACCES S.A.")
+
+    def test_detail_page_served_from_cache(self):
+        """Test that the async dispatch reuses the versioned page cache."""
+        view = async_to_sync(self.view)
+        view(self.factory.get("/nosotros/")).render()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = view(self.factory.get("/nosotros/"))
+
+        self.assertEqual(len(queries.captured_queries), 0)
+        self.assertContains(response, "CARRIACCES S.A.")
@@ -1,10 +1,19 @@
+from django.conf import settings
 from django.urls import path
-from .views import EmpresaDetailView, EmpresaCreateView, EmpresaUpdateView
+from .views import (
+    EmpresaDetailView,
+    EmpresaAsyncDetailView,
+    EmpresaCreateView,
+    EmpresaUpdateView,
+)
 
 app_name = "empresa"
 
+# Variante asíncrona cuando se sirve con ASGI (ver carriacces.async_views)
+detail_view = EmpresaAsyncDetailView if settings.ASYNC_VIEWS else EmpresaDetailView
+
 urlpatterns = [
-    path("", EmpresaDetailView.as_view(), name="detail"),
+    path("", detail_view.as_view(), name="detail"),
     path("agregar/", EmpresaCreateView.as_view(), name="create"),
     path("editar/", EmpresaUpdateView.as_view(), name="update"),
 ]
@@ -3,16 +3,23 @@ from django.urls import reverse_lazy
 from django.contrib import messages
 from django.shortcuts import redirect
 from django.http import Http404
+from carriacces.async_views import AsyncViewMixin
+from carriacces.cache import VersionedCachePageMixin
+from carriacces.routers import ReplicaReadMixin
+from carriacces.views import AtomicViewMixin, ReadOnlyViewMixin
 from .models import Empresa
 from .forms import EmpresaForm
 
 
-class EmpresaDetailView(DetailView):
+class EmpresaDetailView(
+    ReadOnlyViewMixin, ReplicaReadMixin, VersionedCachePageMixin, DetailView
+):
     """Vista para mostrar la información de la empresa (singleton)."""
 
     model = Empresa
     template_name = "empresa/detail.html"
     context_object_name = "empresa"
+    cache_models = ("empresa.Empresa",)
 
     def get_object(self, queryset=None):
         """Obtiene la única instancia de empresa o None."""
@@ -25,7 +32,16 @@ class EmpresaDetailView(DetailView):
         return context
 
 
-class EmpresaCreateView(CreateView):
+class EmpresaAsyncDetailView(AsyncViewMixin, EmpresaDetailView):
+    """Variante asíncrona del detalle, usada al servir con ASGI."""
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await Empresa.objects.aget_empresa()
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
+
+
+class EmpresaCreateView(AtomicViewMixin, CreateView):
     """Vista para crear la información de la empresa."""
 
     model = Empresa
@@ -35,11 +51,19 @@ class EmpresaCreateView(CreateView):
 
     def dispatch(self, request, *args, **kwargs):
         """Verificar que no exista ya una empresa."""
-        if Empresa.objects.exists():
+        # El formulario y el modelo reutilizan esta verificación (una sola
+        # consulta por petición)
+        self.empresa = Empresa()
+        if self.empresa.other_empresa_exists():
             messages.warning(request, "Ya existe información de la empresa registrada.")
             return redirect("empresa:detail")
         return super().dispatch(request, *args, **kwargs)
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["instance"] = self.empresa
+        return kwargs
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["title"] = "AGREGAR INFORMACIÓN DE LA EMPRESA"
@@ -59,7 +83,7 @@ class EmpresaCreateView(CreateView):
         return super().form_invalid(form)
 
 
-class EmpresaUpdateView(UpdateView):
+class EmpresaUpdateView(AtomicViewMixin, UpdateView):
     """Vista para editar la información de la empresa."""
 
     model = Empresa
@@ -69,7 +93,7 @@ class EmpresaUpdateView(UpdateView):
 
     def get_object(self, queryset=None):
         """Obtiene la única instancia de empresa."""
-        empresa = Empresa.objects.get_empresa()
+        empresa = Empresa.objects.get_empresa_for_update()
         if not empresa:
             raise Http404("No existe información de la empresa.")
         return empresa
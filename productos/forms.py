@@ -2,14 +2,19 @@ from django import forms
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 from .models import Producto
+from carriacces.forms import ImageUploadField, UniqueConstraintFormMixin
 
 
-class ProductoForm(forms.ModelForm):
+class ProductoForm(UniqueConstraintFormMixin, forms.ModelForm):
     """Formulario para crear y editar productos."""
 
+    # El nombre duplicado lo detecta la restricción única del modelo
+    constraint_fields = {"producto_nombre_unico": "nombre"}
+
     class Meta:
         model = Producto
         fields = ["nombre", "descripcion", "precio", "iva", "imagen"]
+        field_classes = {"imagen": ImageUploadField}
         widgets = {
             "nombre": forms.TextInput(
                 attrs={
@@ -108,48 +113,3 @@ class ProductoForm(forms.ModelForm):
             if iva not in [0, 15]:
                 raise ValidationError("El IVA debe ser 0% o 15%.")
         return iva
-
-    def clean_imagen(self):
-        """Validación personalizada para la imagen."""
-        imagen = self.cleaned_data.get("imagen")
-        if imagen:
-            # Verificar tipo de archivo
-            allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
-            if imagen.content_type not in allowed_types:
-                raise ValidationError(
-                    "Solo se permiten imágenes en formato JPG, PNG o WebP."
-                )
-
-            # Verificar tamaño
-            if imagen.size > 5 * 1024 * 1024:  # 5MB
-                raise ValidationError("La imagen no puede ser mayor a 5MB.")
-
-        return imagen
-
-    def clean(self):
-        """Validación global del formulario."""
-        cleaned_data = super().clean()
-
-        # Validaciones adicionales si es necesario
-        nombre = cleaned_data.get("nombre")
-        precio = cleaned_data.get("precio")
-
-        if nombre and precio:
-            # Verificar duplicados de nombre (opcional, según reglas de negocio)
-            if self.instance.pk:
-                # Editando registro existente
-                existing = Producto.objects.filter(nombre__iexact=nombre).exclude(
-                    pk=self.instance.pk
-                )
-                if existing.exists():
-                    raise ValidationError(
-                        {"nombre": "Ya existe un producto con este nombre."}
-                    )
-            else:
-                # Creando nuevo registro
-                if Producto.objects.filter(nombre__iexact=nombre).exists():
-                    raise ValidationError(
-                        {"nombre": "Ya existe un producto con este nombre."}
-                    )
-
-        return cleaned_data
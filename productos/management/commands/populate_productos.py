@@ -5,8 +5,9 @@ import os
 import urllib.request
 from decimal import Decimal
 from django.core.management.base import BaseCommand
-from django.core.files import File
+from django.core.files.base import ContentFile
 from django.conf import settings
+from carriacces.catalog_import import CATALOGS, CatalogImporter
 from productos.models import Producto
 
 
@@ -63,50 +64,54 @@ class Command(BaseCommand):
             }
         ]
 
-        # Create media directory if it doesn't exist
-        media_productos_dir = os.path.join(settings.MEDIA_ROOT, 'productos')
-        os.makedirs(media_productos_dir, exist_ok=True)
-
         self.stdout.write(self.style.SUCCESS('Creating mock products...'))
 
+        # Images are attached after the rows are written
+        imagenes = {}
         for producto_data in productos_data:
-            # Handle image (download or copy local)
-            imagen_path = None
             try:
                 imagen_name = producto_data.pop('imagen_name')
-                imagen_local_path = os.path.join(media_productos_dir, imagen_name)
-                
                 if 'imagen_local' in producto_data:
                     # Copy from project root
                     imagen_local = producto_data.pop('imagen_local')
                     source_path = os.path.join(settings.BASE_DIR, imagen_local)
                     self.stdout.write(f'Copying local image: {imagen_name}...')
-                    
-                    import shutil
-                    shutil.copy2(source_path, imagen_local_path)
-                    imagen_path = f'productos/{imagen_name}'
-                    
+                    with open(source_path, 'rb') as f:
+                        contenido = f.read()
                 elif 'imagen_url' in producto_data:
                     # Download from URL
                     imagen_url = producto_data.pop('imagen_url')
                     self.stdout.write(f'Downloading image: {imagen_name}...')
-                    urllib.request.urlretrieve(imagen_url, imagen_local_path)
-                    imagen_path = f'productos/{imagen_name}'
-                
+                    with urllib.request.urlopen(imagen_url, timeout=30) as response:
+                        contenido = response.read()
+                else:
+                    continue
+                imagenes[producto_data['nombre']] = (imagen_name, contenido)
             except Exception as e:
+                producto_data.pop('imagen_local', None)
+                producto_data.pop('imagen_url', None)
                 self.stdout.write(
                     self.style.WARNING(f'Could not process image: {e}')
                 )
 
-            # Create product
-            producto = Producto.objects.create(
-                nombre=producto_data['nombre'],
-                descripcion=producto_data['descripcion'],
-                precio=producto_data['precio'],
-                iva=producto_data['iva'],
-                imagen=imagen_path
-            )
+        # Same path as import_catalog: rows validated with ProductoForm and
+        # written with a single bulk_create
+        header = ['nombre', 'descripcion', 'precio', 'iva']
+        result = CatalogImporter(CATALOGS['productos'], header).run(
+            (line, [producto_data[name] for name in header])
+            for line, producto_data in enumerate(productos_data, start=1)
+        )
+        for line, message in result.errors:
+            self.stdout.write(self.style.ERROR(f'Product {line}: {message}'))
 
+        # bulk_create skips signals; FieldFile.save() runs them, so the image
+        # is stored by content hash with its metadata and thumbnails
+        for nombre, (imagen_name, contenido) in imagenes.items():
+            producto = Producto.objects.filter(nombre__iexact=nombre).first()
+            if producto is not None:
+                producto.imagen.save(imagen_name, ContentFile(contenido))
+
+        for producto in Producto.objects.order_by('nombre'):
             self.stdout.write(
                 self.style.SUCCESS(
                     f'Created product: {producto.nombre} - ${producto.precio}'
@@ -115,6 +120,6 @@ class Command(BaseCommand):
 
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully created {len(productos_data)} products!'
+                f'Successfully created {result.created} products!'
             )
-        )
\ No newline at end of file
+        )
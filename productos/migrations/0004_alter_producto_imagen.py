@@ -0,0 +1,19 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:43
+
+import carriacces.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0003_auto_20250628_2005'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='producto',
+            name='imagen',
+            field=models.ImageField(blank=True, help_text='Imagen del producto (opcional)', null=True, storage=carriacces.storage.content_hash_storage, upload_to='productos/', verbose_name='Imagen'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:47
+
+from django.db import migrations, models
+from PIL import Image
+
+
+def registrar_metadatos(apps, schema_editor):
+    """Completar formato y dimensiones de las imágenes ya subidas."""
+    Modelo = apps.get_model('productos', 'Producto')
+    for registro in Modelo.objects.exclude(imagen='').exclude(imagen__isnull=True):
+        try:
+            with registro.imagen.open('rb') as f, Image.open(f) as img:
+                registro.imagen_ancho, registro.imagen_alto = img.size
+                registro.imagen_formato = img.format
+        except (OSError, ValueError):
+            continue
+        registro.save(update_fields=['imagen_ancho', 'imagen_alto', 'imagen_formato'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0004_alter_producto_imagen'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_alto',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Alto de la imagen'),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_ancho',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ancho de la imagen'),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_formato',
+            field=models.CharField(blank=True, editable=False, max_length=10, verbose_name='Formato de la imagen'),
+        ),
+        migrations.RunPython(registrar_metadatos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:10
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TABLA = 'productos_producto'
+
+INSTALAR = [
+    f"""
+    CREATE FUNCTION {TABLA}_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('spanish', coalesce(NEW.nombre, '')), 'A') ||
+            setweight(to_tsvector('spanish', coalesce(NEW.descripcion, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE TRIGGER {TABLA}_search_vector_update
+    BEFORE INSERT OR UPDATE OF nombre, descripcion ON {TABLA}
+    FOR EACH ROW EXECUTE FUNCTION {TABLA}_search_vector()
+    """,
+    # Dispara el trigger para calcular el vector de las filas existentes
+    f"UPDATE {TABLA} SET nombre = nombre",
+    f"CREATE INDEX {TABLA}_search_vector_gin ON {TABLA} USING gin (search_vector)",
+    f"CREATE INDEX {TABLA}_nombre_trgm ON {TABLA} USING gin (nombre gin_trgm_ops)",
+]
+
+ELIMINAR = [
+    f"DROP INDEX IF EXISTS {TABLA}_nombre_trgm",
+    f"DROP INDEX IF EXISTS {TABLA}_search_vector_gin",
+    f"DROP TRIGGER IF EXISTS {TABLA}_search_vector_update ON {TABLA}",
+    f"DROP FUNCTION IF EXISTS {TABLA}_search_vector()",
+]
+
+
+def instalar_busqueda(apps, schema_editor):
+    """Trigger e índices de búsqueda; solo existen en PostgreSQL."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in INSTALAR:
+        schema_editor.execute(sql)
+
+
+def eliminar_busqueda(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in ELIMINAR:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0005_imagen_metadatos'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='producto',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(instalar_busqueda, eliminar_busqueda),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:09
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0007_nombre_unico'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='precio_final',
+            field=models.GeneratedField(db_persist=True, expression=models.F('precio') * (models.F('iva') + 100) * models.Value(Decimal('0.01')), output_field=models.DecimalField(decimal_places=4, max_digits=14), verbose_name='Precio con IVA'),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='monto_iva',
+            field=models.GeneratedField(db_persist=True, expression=models.F('precio') * models.F('iva') * models.Value(Decimal('0.01')), output_field=models.DecimalField(decimal_places=4, max_digits=14), verbose_name='Valor del IVA'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['precio_final', 'id'], name='productos_p_precio__df15db_idx'),
+        ),
+    ]
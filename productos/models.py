@@ -1,7 +1,11 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Upper
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from decimal import Decimal
+from carriacces.storage import content_hash_storage
 
 
 class Producto(models.Model):
@@ -40,12 +44,51 @@ class Producto(models.Model):
 
     imagen = models.ImageField(
         upload_to="productos/",
+        storage=content_hash_storage,
         blank=True,
         null=True,
         verbose_name="Imagen",
         help_text="Imagen del producto (opcional)",
     )
 
+    # Metadatos leídos una sola vez al subir la imagen (ver carriacces.utils)
+    imagen_ancho = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Ancho de la imagen"
+    )
+    imagen_alto = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Alto de la imagen"
+    )
+    imagen_formato = models.CharField(
+        max_length=10, blank=True, editable=False, verbose_name="Formato de la imagen"
+    )
+    # {"<ancho>": "<nombre>"} de las miniaturas generadas al subir la imagen
+    # (ver carriacces.images); el srcset se arma sin tocar el almacenamiento
+    imagen_miniaturas = models.JSONField(
+        default=dict, blank=True, editable=False, verbose_name="Miniaturas de la imagen"
+    )
+
+    # Vector de búsqueda (nombre con peso A, descripción con peso B). En
+    # PostgreSQL lo mantiene un trigger y lo indexa un GIN, ambos creados en
+    # las migraciones; ver carriacces.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Precio con IVA y valor del IVA calculados por la base de datos al
+    # guardar, para ordenar y filtrar el listado por precio final con un
+    # índice. Se multiplica por 0.01 en lugar de dividir por 100 porque
+    # SQLite guarda los precios enteros como INTEGER y truncaría la división
+    precio_final = models.GeneratedField(
+        expression=F("precio") * (F("iva") + 100) * Value(Decimal("0.01")),
+        output_field=models.DecimalField(max_digits=14, decimal_places=4),
+        db_persist=True,
+        verbose_name="Precio con IVA",
+    )
+    monto_iva = models.GeneratedField(
+        expression=F("precio") * F("iva") * Value(Decimal("0.01")),
+        output_field=models.DecimalField(max_digits=14, decimal_places=4),
+        db_persist=True,
+        verbose_name="Valor del IVA",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -56,11 +99,31 @@ class Producto(models.Model):
         indexes = [
             models.Index(fields=["nombre"]),
             models.Index(fields=["precio"]),
+            models.Index(fields=["precio_final", "id"]),
+        ]
+        constraints = [
+            # Nombre único sin distinguir mayúsculas; el índice funcional
+            # también sirve a la validación de ProductoForm
+            models.UniqueConstraint(
+                Upper("nombre"),
+                name="producto_nombre_unico",
+                violation_error_code="nombre_duplicado",
+                violation_error_message="Ya existe un producto con este nombre.",
+            ),
         ]
 
     def __str__(self) -> str:
         return self.nombre
 
+    def save(self, *args, **kwargs):
+        actualizando = not self._state.adding
+        super().save(*args, **kwargs)
+        if actualizando:
+            # Un UPDATE no devuelve las columnas generadas; se descartan los
+            # valores anteriores para que se vuelvan a leer si se usan
+            for campo in ("precio_final", "monto_iva"):
+                self.__dict__.pop(campo, None)
+
     def clean(self) -> None:
         """Validación personalizada del modelo."""
         super().clean()
@@ -83,7 +146,9 @@ class Producto(models.Model):
 
     @property
     def precio_con_iva(self) -> Decimal:
-        """Calcula el precio incluyendo el IVA."""
+        """Precio incluyendo el IVA; usa la columna generada si está cargada."""
+        if self.__dict__.get("precio_final") is not None:
+            return self.precio_final
         if self.precio and self.iva is not None:
             iva_decimal = Decimal(str(self.iva)) / Decimal("100")
             return self.precio * (Decimal("1") + iva_decimal)
@@ -91,7 +156,9 @@ class Producto(models.Model):
 
     @property
     def valor_iva(self) -> Decimal:
-        """Calcula el valor del IVA."""
+        """Valor del IVA; usa la columna generada si está cargada."""
+        if self.__dict__.get("monto_iva") is not None:
+            return self.monto_iva
         if self.precio and self.iva is not None:
             iva_decimal = Decimal(str(self.iva)) / Decimal("100")
             return self.precio * iva_decimal
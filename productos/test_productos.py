@@ -3,18 +3,40 @@ Test cases for Producto model using London School TDD approach.
 Focus on interaction testing and behavior verification.
 """
 
+import csv
+import gzip
+import json
+import shutil
+import tempfile
 from decimal import Decimal
+from unittest import mock
 
+from asgiref.sync import sync_to_async
 from django.contrib.messages import get_messages
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, Client
+from django.db import IntegrityError, connection
+from django.db.models import QuerySet
+from django.http import Http404
+from django.test import AsyncRequestFactory, TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from PIL import Image
 
+from carriacces.cache import get_model_versions
+from carriacces.counts import estimated_count, get_total_count
+from carriacces.images import image_srcset, thumbnail_name, thumbnail_widths
+from carriacces.testing import png_bytes
 from productos.forms import ProductoForm
+from productos.views import ProductoAsyncListView, ProductoListView
 
 from productos.models import Producto
 
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
 
 class ProductoModelTest(TestCase):
     """Test Producto model behavior and validation."""
@@ -206,21 +228,22 @@ class ProductoModelTest(TestCase):
 class ProductoQuerySetTest(TestCase):
     """Test default queryset behavior and ordering."""
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.producto1 = Producto.objects.create(
+        cls.producto1 = Producto.objects.create(
             nombre="Aceite Castrol",
             descripcion="Aceite de motor",
             precio=Decimal("25.00"),
             iva=15,
         )
-        self.producto2 = Producto.objects.create(
+        cls.producto2 = Producto.objects.create(
             nombre="Bujías NGK",
             descripcion="Bujías de encendido",
             precio=Decimal("12.50"),
             iva=15,
         )
-        self.producto3 = Producto.objects.create(
+        cls.producto3 = Producto.objects.create(
             nombre="Aceite Mobil",
             descripcion="Aceite sintético",
             precio=Decimal("30.00"),
@@ -595,6 +618,81 @@ class ProductoFormTest(TestCase):
         self.assertFalse(form.fields["imagen"].required)
 
 
+class ProductoNombreUnicoTest(TestCase):
+    """Test the case-insensitive unique constraint on Producto.nombre."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the producto whose name is taken."""
+        cls.valid_data = {
+            "nombre": "Aceite Castrol GTX",
+            "descripcion": "Aceite de motor sintético de alta calidad para automóviles",
+            "precio": Decimal("25.50"),
+            "iva": 15,
+        }
+        cls.producto = Producto.objects.create(**cls.valid_data)
+
+    def test_database_rejects_duplicate_in_other_case(self):
+        """Test that the functional index enforces the rule for every write."""
+        data = {**self.valid_data, "nombre": "ACEITE castrol gtx"}
+
+        with self.assertRaises(IntegrityError):
+            Producto.objects.create(**data)
+
+    def test_form_reports_duplicate_on_nombre(self):
+        """Test that the constraint error is mapped to the nombre field."""
+        form = ProductoForm(data={**self.valid_data, "nombre": "aceite castrol gtx"})
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors["nombre"], ["Ya existe un producto con este nombre."]
+        )
+        self.assertFalse(form.non_field_errors())
+
+    def test_form_validation_queries_upper_expression(self):
+        """Test that the check compares UPPER(nombre), matching the index."""
+        form = ProductoForm(data={**self.valid_data, "nombre": "Otro Aceite"})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(form.is_valid())
+
+        sql = " ".join(q["sql"] for q in queries.captured_queries)
+        self.assertIn("UPPER", sql)
+        self.assertNotIn("LIKE", sql)
+
+    def test_form_allows_same_instance_on_edit(self):
+        """Test that editing a producto keeps its own name valid."""
+        form = ProductoForm(data=self.valid_data, instance=self.producto)
+
+        self.assertTrue(form.is_valid())
+
+    def test_concurrent_duplicate_is_reported_on_save(self):
+        """Test a duplicate inserted between validation and save."""
+        form = ProductoForm(data={**self.valid_data, "nombre": "Filtro De Aire"})
+        self.assertTrue(form.is_valid())
+        Producto.objects.create(**{**self.valid_data, "nombre": "FILTRO DE AIRE"})
+
+        with self.assertRaises(ValidationError):
+            form.save()
+        self.assertEqual(
+            form.errors["nombre"], ["Ya existe un producto con este nombre."]
+        )
+
+    def test_view_renders_form_when_save_hits_constraint(self):
+        """Test that the create view shows the error instead of a 500."""
+        data = {**self.valid_data, "nombre": "aceite castrol gtx"}
+
+        # Simula la carrera: la validación no ve la fila que ya existe
+        with mock.patch.object(Producto, "validate_constraints"):
+            response = self.client.post(reverse("productos:create"), data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Ya existe un producto con este nombre.")
+        self.assertEqual(
+            Producto.objects.filter(nombre__iexact=data["nombre"]).count(), 1
+        )
+
+
 class ProductoViewsTest(TestCase):
     """Test Producto views behavior and integration."""
 
@@ -911,3 +1009,737 @@ class ProductoViewsTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "No hay productos")
         self.assertContains(response, reverse("productos:create"))
+
+
+class ProductoKeysetPaginationTest(TestCase):
+    """Test cursor (keyset) pagination mode of the producto list view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create enough productos to span several pages."""
+        for i in range(20):
+            Producto.objects.create(
+                nombre=f"Producto {i:02d}",
+                descripcion="Producto de prueba para la paginación por cursor",
+                precio=Decimal("10.00"),
+                iva=15,
+            )
+
+    def _walk(self, url):
+        """Follow next cursors until the last page and return visited pks."""
+        pks = []
+        params = {"cursor": ""}
+        while True:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            page = response.context["page_obj"]
+            self.assertLessEqual(len(page), 15)
+            pks.extend(p.pk for p in response.context["productos"])
+            if not page.has_next():
+                return pks, response
+            params = {"cursor": page.next_cursor}
+
+    def test_keyset_pages_cover_all_rows_in_order(self):
+        """Test that walking the cursors returns every row once, in order."""
+        pks, _ = self._walk(reverse("productos:list"))
+
+        expected = list(
+            Producto.objects.order_by("nombre", "pk").values_list("pk", flat=True)
+        )
+        self.assertEqual(pks, expected)
+
+    def test_keyset_previous_cursor_returns_previous_page(self):
+        """Test that the previous cursor of page 2 yields page 1."""
+        url = reverse("productos:list")
+        first = self.client.get(url, {"cursor": ""})
+        second = self.client.get(url, {"cursor": first.context["page_obj"].next_cursor})
+        back = self.client.get(
+            url, {"cursor": second.context["page_obj"].previous_cursor}
+        )
+
+        self.assertEqual(
+            [p.pk for p in back.context["productos"]],
+            [p.pk for p in first.context["productos"]],
+        )
+        self.assertFalse(back.context["page_obj"].has_previous())
+
+    def test_keyset_mode_does_not_count_rows(self):
+        """Test that keyset pages skip the paginator COUNT(*)."""
+        response = self.client.get(reverse("productos:list"), {"cursor": ""})
+
+        self.assertIsNone(response.context["paginator"])
+        self.assertContains(response, "cursor=")
+
+    def test_keyset_invalid_cursor_returns_404(self):
+        """Test that a tampered cursor is rejected."""
+        response = self.client.get(reverse("productos:list"), {"cursor": "invalido"})
+
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(PAGINATION_MODE="keyset")
+    def test_keyset_mode_enabled_by_setting(self):
+        """Test that PAGINATION_MODE enables cursors without the parameter."""
+        response = self.client.get(reverse("productos:list"))
+
+        self.assertTrue(response.context["page_obj"].is_keyset)
+        self.assertEqual(len(response.context["productos"]), 15)
+
+
+class ProductoSearchTest(TestCase):
+    """Test the ?q= search of the producto list view (icontains fallback)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create productos with distinct names and descriptions."""
+        Producto.objects.all().delete()
+        cls.aceite = Producto.objects.create(
+            nombre="Aceite Castrol",
+            descripcion="Aceite sintético para motor",
+            precio=Decimal("25.50"),
+        )
+        cls.filtro = Producto.objects.create(
+            nombre="Filtro de Aire",
+            descripcion="Filtro para motor diésel",
+            precio=Decimal("12.00"),
+        )
+        for i in range(20):
+            Producto.objects.create(
+                nombre=f"Llanta {i:02d}",
+                descripcion="Llanta radial",
+                precio=Decimal("80.00"),
+            )
+
+    def test_search_matches_nombre_and_descripcion(self):
+        """Test that the query is matched against both fields."""
+        url = reverse("productos:list")
+
+        by_nombre = self.client.get(url, {"q": "castrol"})
+        by_descripcion = self.client.get(url, {"q": "MOTOR"})
+
+        self.assertEqual(list(by_nombre.context["productos"]), [self.aceite])
+        self.assertEqual(
+            set(by_descripcion.context["productos"]), {self.aceite, self.filtro}
+        )
+        self.assertEqual(by_nombre.context["search_query"], "castrol")
+
+    def test_search_requires_every_word(self):
+        """Test that each word of the query must appear in some field."""
+        response = self.client.get(reverse("productos:list"), {"q": "filtro diésel"})
+
+        self.assertEqual(list(response.context["productos"]), [self.filtro])
+
+    def test_search_without_results_shows_message(self):
+        """Test the empty state of a search with no matches."""
+        response = self.client.get(reverse("productos:list"), {"q": "inexistente"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'No se encontraron productos para "inexistente"')
+        self.assertNotContains(response, "No hay productos registrados")
+
+    def test_search_pagination_keeps_query(self):
+        """Test that page links keep ?q= and the paginator counts the matches."""
+        response = self.client.get(reverse("productos:list"), {"q": "llanta"})
+
+        self.assertEqual(response.context["paginator"].count, 20)
+        self.assertContains(response, "?q=llanta&amp;page=2")
+
+    def test_search_uses_offset_pagination_with_cursor(self):
+        """Test that a search ignores keyset mode, since it orders by relevance."""
+        response = self.client.get(
+            reverse("productos:list"), {"q": "llanta", "cursor": ""}
+        )
+
+        self.assertFalse(getattr(response.context["page_obj"], "is_keyset", False))
+        self.assertEqual(response.context["paginator"].count, 20)
+
+
+class ProductoPrecioFinalTest(TestCase):
+    """Test the generated IVA-inclusive price and the list sort/range filter."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Replace the seeded productos with three known prices."""
+        cls.url = reverse("productos:list")
+        Producto.objects.all().delete()
+        cls.barato = Producto.objects.create(
+            nombre="Tapacubos", descripcion="Juego de 4", precio=Decimal("25"), iva=15
+        )
+        cls.medio = Producto.objects.create(
+            nombre="Alfombra", descripcion="Caucho", precio=Decimal("40.00"), iva=0
+        )
+        cls.caro = Producto.objects.create(
+            nombre="Parlantes", descripcion="Par", precio=Decimal("90.50"), iva=15
+        )
+
+    def test_generated_columns_are_returned_on_create(self):
+        """Test that the database computes the price with and without IVA."""
+        self.assertEqual(self.barato.precio_final, Decimal("28.75"))
+        self.assertEqual(self.barato.monto_iva, Decimal("3.75"))
+        self.assertEqual(self.medio.precio_final, Decimal("40.00"))
+        self.assertEqual(self.medio.monto_iva, Decimal("0"))
+
+    def test_properties_read_generated_columns(self):
+        """Test that precio_con_iva/valor_iva use the loaded columns."""
+        producto = Producto.objects.get(pk=self.caro.pk)
+        producto.__dict__["precio_final"] = Decimal("1.00")
+
+        self.assertEqual(producto.precio_con_iva, Decimal("1.00"))
+        self.assertEqual(producto.valor_iva, Decimal("13.575"))
+
+    def test_generated_columns_refresh_after_update(self):
+        """Test that saving a new price does not leave stale values."""
+        self.barato.precio = Decimal("100.00")
+        self.barato.save()
+
+        self.assertEqual(self.barato.precio_con_iva, Decimal("115.00"))
+        self.assertEqual(self.barato.get_precio_con_iva_display(), "$115.00")
+
+    def _pks(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [p.pk for p in response.context["productos"]]
+
+    def test_list_sorts_by_final_price(self):
+        """Test ?orden=precio and ?orden=-precio."""
+        ascending = [self.barato.pk, self.medio.pk, self.caro.pk]
+
+        self.assertEqual(self._pks({"orden": "precio"}), ascending)
+        self.assertEqual(self._pks({"orden": "-precio"}), ascending[::-1])
+
+    def test_list_filters_by_final_price_range(self):
+        """Test that the range applies to the price including IVA."""
+        # Tapacubos is 25.00 before IVA but 28.75 with it
+        self.assertEqual(self._pks({"precio_max": "27"}), [])
+        self.assertEqual(
+            self._pks({"precio_min": "28", "precio_max": "40"}),
+            [self.medio.pk, self.barato.pk],
+        )
+
+    def test_list_ignores_invalid_parameters(self):
+        """Test that bad sort or range values fall back to the default list."""
+        pks = self._pks({"orden": "imagen", "precio_min": "abc", "precio_max": "-1"})
+
+        self.assertEqual(pks, [self.medio.pk, self.caro.pk, self.barato.pk])
+
+    @override_settings(PAGINATION_MODE="keyset")
+    def test_price_sort_uses_page_numbers(self):
+        """Test that sorting by price switches off cursor pagination."""
+        response = self.client.get(self.url, {"orden": "-precio"})
+
+        self.assertFalse(getattr(response.context["page_obj"], "is_keyset", False))
+        self.assertEqual(response.context["productos"][0].pk, self.caro.pk)
+
+    def test_list_template_shows_precomputed_price(self):
+        """Test that the cards display the generated IVA-inclusive price."""
+        response = self.client.get(self.url, {"precio_max": "30"})
+
+        self.assertContains(response, "$28.75")
+        self.assertNotContains(response, "Parlantes".upper())
+
+
+class ProductoFacetTest(TestCase):
+    """Test the facet sidebar of the producto list view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Replace the seeded productos with one per price bucket."""
+        cls.url = reverse("productos:list")
+        Producto.objects.all().delete()
+        cls.productos = [
+            Producto.objects.create(
+                nombre=nombre, descripcion="Accesorio", precio=precio, iva=iva
+            )
+            for nombre, precio, iva in [
+                ("Ambientador", Decimal("5.00"), 15),
+                ("Alfombra", Decimal("40.00"), 0),
+                ("Parlantes", Decimal("200.00"), 15),
+                ("Aros", Decimal("800.00"), 15),
+            ]
+        ]
+        # update() evita abrir un archivo que no existe
+        Producto.objects.filter(pk=cls.productos[3].pk).update(
+            imagen="productos/aros.jpg"
+        )
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def _facets(self, context):
+        return {
+            facet["param"]: {
+                option["value"]: option["count"] for option in facet["options"]
+            }
+            for facet in context["facets"]
+        }
+
+    def test_counts_come_from_one_aggregate_query(self):
+        """Test that every facet is counted in a single query."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        facet_queries = [
+            q["sql"] for q in queries.captured_queries if '"iva_0"' in q["sql"]
+        ]
+        self.assertEqual(len(facet_queries), 1)
+        self.assertEqual(
+            self._facets(response.context),
+            {
+                "rango": {"0-25": 1, "25-100": 1, "100-500": 1, "500-": 1},
+                "iva": {"0": 1, "15": 3},
+                "imagen": {"con": 1, "sin": 3},
+            },
+        )
+
+    def test_selected_option_filters_the_list(self):
+        """Test that ?iva=15&imagen=sin narrows the listed productos."""
+        response = self.client.get(self.url, {"iva": "15", "imagen": "sin"})
+
+        self.assertEqual(
+            [p.nombre for p in response.context["productos"]],
+            ["Ambientador", "Parlantes"],
+        )
+
+    def test_counts_apply_the_other_facets(self):
+        """Test that a facet's own selection does not narrow its counts."""
+        facets = self._facets(self.client.get(self.url, {"iva": "15"}).context)
+
+        self.assertEqual(facets["iva"], {"0": 1, "15": 3})
+        self.assertEqual(
+            facets["rango"], {"0-25": 1, "25-100": 0, "100-500": 1, "500-": 1}
+        )
+        self.assertEqual(facets["imagen"], {"con": 1, "sin": 2})
+
+    def test_unknown_values_are_ignored(self):
+        """Test that an invalid option lists every producto."""
+        response = self.client.get(self.url, {"iva": "12", "rango": "x"})
+
+        self.assertEqual(len(response.context["productos"]), 4)
+
+    def test_option_urls_toggle_the_filter(self):
+        """Test that options link to the list with the facet set or removed."""
+        response = self.client.get(self.url, {"iva": "0", "page": "1"})
+        iva = next(f for f in response.context["facets"] if f["param"] == "iva")
+        options = {option["value"]: option for option in iva["options"]}
+
+        self.assertTrue(options["0"]["selected"])
+        self.assertEqual(options["0"]["url"], "?")
+        self.assertEqual(options["15"]["url"], "?iva=15")
+        self.assertEqual(iva["clear_url"], "?")
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_counts_are_cached_per_filter_combination(self):
+        """Test that a repeated combination skips the query until a write."""
+        self.client.get(self.url, {"iva": "15"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"iva": "15", "page": "1"})
+        self.assertFalse(any('"iva_0"' in q["sql"] for q in queries.captured_queries))
+        self.assertEqual(self._facets(response.context)["imagen"], {"con": 1, "sin": 2})
+
+        # Another combination is counted separately
+        facets = self._facets(self.client.get(self.url, {"iva": "0"}).context)
+        self.assertEqual(facets["imagen"], {"con": 0, "sin": 1})
+
+        Producto.objects.create(
+            nombre="Cobertor", descripcion="Accesorio", precio=Decimal("30"), iva=15
+        )
+        facets = self._facets(self.client.get(self.url, {"iva": "15"}).context)
+        self.assertEqual(facets["imagen"], {"con": 1, "sin": 3})
+
+    async def test_async_view_counts_facets(self):
+        """Test that the async list view provides the same facet counts."""
+        view = ProductoAsyncListView.as_view()
+        response = await view(AsyncRequestFactory().get(self.url, {"imagen": "con"}))
+
+        self.assertEqual(self._facets(response.context_data)["iva"], {"0": 0, "15": 1})
+        self.assertEqual(len(response.context_data["productos"]), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProductoTotalCountTest(TestCase):
+    """Test the cached total count shared by the paginator and the context."""
+
+    def setUp(self):
+        """Start every test with an empty count cache."""
+        cache.clear()
+        self.client = Client()
+        self.valid_data = {
+            "nombre": "Aceite Castrol GTX",
+            "descripcion": "Aceite de motor sintético de alta calidad para automóviles",
+            "precio": Decimal("25.50"),
+            "iva": 15,
+        }
+
+    def test_list_view_reuses_cached_total(self):
+        """Test that a warm list page runs no COUNT(*) at all."""
+        self.client.get(reverse("productos:list"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("productos:list"))
+
+        self.assertFalse(any("COUNT(" in q["sql"] for q in queries.captured_queries))
+
+        self.assertEqual(response.context["total_productos"], Producto.objects.count())
+        self.assertEqual(
+            response.context["paginator"].count, response.context["total_productos"]
+        )
+
+    def test_total_invalidated_on_save_and_delete(self):
+        """Test that post_save and post_delete drop the cached total."""
+        before = get_total_count(Producto)
+
+        producto = Producto.objects.create(**self.valid_data)
+        self.assertEqual(get_total_count(Producto), before + 1)
+
+        producto.delete()
+        self.assertEqual(get_total_count(Producto), before)
+
+    @override_settings(COUNT_ESTIMATE_THRESHOLD=0)
+    def test_estimate_falls_back_to_exact_count_outside_postgresql(self):
+        """Test that the reltuples estimate is skipped on other backends."""
+        if connection.vendor == "postgresql":
+            self.skipTest("La estimación aplica en PostgreSQL")
+
+        self.assertIsNone(estimated_count(Producto))
+        self.assertEqual(get_total_count(Producto), Producto.objects.count())
+
+    @override_settings(COUNT_ESTIMATE_THRESHOLD=0)
+    def test_estimate_only_changes_the_displayed_total(self):
+        """Test that the paginator keeps the exact count under an estimate."""
+        with mock.patch("carriacces.counts.estimated_count", return_value=100000):
+            response = self.client.get(reverse("productos:list"))
+
+        self.assertEqual(response.context["total_productos"], 100000)
+        self.assertEqual(response.context["paginator"].count, Producto.objects.count())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProductoCardCacheTest(TestCase):
+    """Test fragment caching of producto cards keyed by model version."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create one producto."""
+        cls.producto = Producto.objects.create(
+            nombre="Aceite Castrol GTX",
+            descripcion="Aceite de motor sintético de alta calidad para automóviles",
+            precio=Decimal("25.50"),
+            iva=15,
+        )
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def test_card_reflects_update_after_version_bump(self):
+        """Test that editing a producto invalidates its cached card."""
+        self.client.get(reverse("productos:list"))
+        version = get_model_versions(Producto)[0]
+
+        self.producto.precio = Decimal("30.00")
+        self.producto.save()
+        response = self.client.get(reverse("productos:list"))
+
+        self.assertNotEqual(get_model_versions(Producto)[0], version)
+        self.assertContains(response, "$34.50")
+
+
+class ProductoThumbnailTest(TestCase):
+    """Test responsive thumbnails generated for producto images."""
+
+    def setUp(self):
+        """Use a temporary MEDIA_ROOT and an in-memory PNG upload."""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.imagen = SimpleUploadedFile(
+            "llanta.png", png_bytes(size=(1000, 500)), content_type="image/png"
+        )
+
+    def test_thumbnails_generated_on_upload(self):
+        """Test that saving a producto writes one thumbnail per width."""
+        producto = Producto.objects.create(
+            nombre="Llanta Deportiva",
+            descripcion="Llanta deportiva de aleación para pruebas",
+            precio=Decimal("100.00"),
+            imagen=self.imagen,
+        )
+
+        for width in thumbnail_widths():
+            name = thumbnail_name(producto.imagen.name, width)
+            self.assertTrue(producto.imagen.storage.exists(name))
+            with producto.imagen.storage.open(name) as thumb, Image.open(thumb) as img:
+                self.assertEqual(img.width, width)
+        producto.refresh_from_db()
+        self.assertEqual(
+            producto.imagen_miniaturas,
+            {
+                str(width): thumbnail_name(producto.imagen.name, width)
+                for width in thumbnail_widths()
+            },
+        )
+
+    def test_srcset_rendered_without_storage_access(self):
+        """Test that the list view builds srcset from the stored names."""
+        producto = Producto.objects.create(
+            nombre="Llanta Deportiva",
+            descripcion="Llanta deportiva de aleación para pruebas",
+            precio=Decimal("100.00"),
+            imagen=self.imagen,
+        )
+        storage = producto.imagen.storage
+        backend = type(storage._wrapped)
+
+        with (
+            mock.patch.object(backend, "exists") as exists,
+            mock.patch.object(backend, "open") as open_file,
+        ):
+            response = self.client.get(reverse("productos:list"))
+        exists.assert_not_called()
+        open_file.assert_not_called()
+
+        name = thumbnail_name(producto.imagen.name, 320)
+        self.assertContains(response, f"{storage.url(name)} 320w")
+        self.assertContains(response, f"{producto.imagen.url} 1000w")
+
+    def test_small_original_advertises_only_real_widths(self):
+        """Test that widths above the original are neither generated nor listed."""
+        producto = Producto.objects.create(
+            nombre="Llanta Pequeña",
+            descripcion="Llanta deportiva de aleación para pruebas",
+            precio=Decimal("100.00"),
+            imagen=SimpleUploadedFile(
+                "llanta.png", png_bytes(size=(300, 150)), content_type="image/png"
+            ),
+        )
+
+        self.assertEqual(list(producto.imagen_miniaturas), ["160"])
+        self.assertFalse(
+            producto.imagen.storage.exists(thumbnail_name(producto.imagen.name, 320))
+        )
+        self.assertEqual(
+            image_srcset(producto.imagen),
+            f"{producto.imagen.storage.url(producto.imagen_miniaturas['160'])} 160w, "
+            f"{producto.imagen.url} 300w",
+        )
+
+    def test_undecodable_image_is_not_retried(self):
+        """Test that a failed decode stores no thumbnails and renders no srcset."""
+        producto = Producto.objects.create(
+            nombre="Llanta Deportiva",
+            descripcion="Llanta deportiva de aleación para pruebas",
+            precio=Decimal("100.00"),
+            imagen=self.imagen,
+        )
+        with mock.patch(
+            "carriacces.images.ImageOps.exif_transpose", side_effect=OSError
+        ):
+            producto.imagen = SimpleUploadedFile(
+                "rota.png", png_bytes("blue"), content_type="image/png"
+            )
+            with self.assertLogs("carriacces.images", "WARNING"):
+                producto.save()
+
+        self.assertEqual(producto.imagen_miniaturas, {})
+        self.assertEqual(image_srcset(producto.imagen), "")
+
+
+class ProductoAsyncListViewTest(TestCase):
+    """Test the async variant of the producto list view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create two pages of productos."""
+        Producto.objects.all().delete()
+        for i in range(20):
+            Producto.objects.create(
+                nombre=f"Producto {i:02d}",
+                descripcion="Producto de prueba para la vista asíncrona",
+                precio=Decimal("10.00"),
+                iva=15,
+            )
+
+    def setUp(self):
+        """Build the async view and its request factory."""
+        self.factory = AsyncRequestFactory()
+        self.view = ProductoAsyncListView.as_view()
+
+    def test_view_is_async(self):
+        """Test that Django dispatches the view as a coroutine."""
+        self.assertTrue(ProductoAsyncListView.view_is_async)
+        self.assertFalse(ProductoListView.view_is_async)
+
+    async def test_first_page_matches_sync_view(self):
+        """Test that the async view builds the same context as the sync one."""
+        response = await self.view(self.factory.get("/productos/"))
+        context = response.context_data
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(context["total_productos"], 20)
+        self.assertEqual(context["paginator"].count, 20)
+        self.assertEqual(context["paginator"].num_pages, 2)
+        expected = await sync_to_async(list)(
+            Producto.objects.order_by("nombre").values_list("pk", flat=True)[:15]
+        )
+        self.assertEqual([p.pk for p in context["productos"]], expected)
+        self.assertTrue(context["is_paginated"])
+
+    @override_settings(COUNT_ESTIMATE_THRESHOLD=0)
+    async def test_estimate_only_changes_the_displayed_total(self):
+        """Test that ?page=last stays on the real rows under an estimate."""
+        with mock.patch("carriacces.counts.estimated_count", return_value=100000):
+            response = await self.view(
+                self.factory.get("/productos/", {"page": "last"})
+            )
+        context = response.context_data
+
+        self.assertEqual(context["total_productos"], 100000)
+        self.assertEqual(context["paginator"].count, 20)
+        self.assertEqual(context["page_obj"].number, 2)
+
+    async def test_last_page(self):
+        """Test that ?page=last returns the remaining rows."""
+        response = await self.view(self.factory.get("/productos/", {"page": "last"}))
+        page = response.context_data["page_obj"]
+
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page), 5)
+        self.assertFalse(page.has_next())
+
+    async def test_invalid_page_raises_404(self):
+        """Test that out-of-range and malformed pages are 404, as in ListView."""
+        for value in ("3", "abc"):
+            with self.assertRaises(Http404):
+                await self.view(self.factory.get("/productos/", {"page": value}))
+
+    async def test_keyset_mode(self):
+        """Test that cursor pagination works in the async view."""
+        response = await self.view(self.factory.get("/productos/", {"cursor": ""}))
+        page = response.context_data["page_obj"]
+
+        self.assertTrue(page.is_keyset)
+        self.assertEqual(len(page), 15)
+        self.assertTrue(page.has_next())
+        self.assertEqual(response.context_data["total_productos"], 20)
+
+        response = await self.view(
+            self.factory.get("/productos/", {"cursor": page.next_cursor})
+        )
+        self.assertEqual(len(response.context_data["page_obj"]), 5)
+
+    async def test_renders_template(self):
+        """Test that the template renders outside the event loop."""
+        response = await self.view(self.factory.get("/productos/"))
+        await sync_to_async(response.render)()
+
+        self.assertContains(response, "PRODUCTO 00")
+
+
+class ProductoExportViewTest(TestCase):
+    """Test the streaming CSV/JSON export of productos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create productos with and without IVA."""
+        Producto.objects.all().delete()
+        cls.con_iva = Producto.objects.create(
+            nombre="Aceite Castrol",
+            descripcion="Aceite sintético, 5W-30",
+            precio=Decimal("100.00"),
+            iva=15,
+        )
+        cls.sin_iva = Producto.objects.create(
+            nombre="Filtro De Aire",
+            descripcion="Filtro para motor",
+            precio=Decimal("10.00"),
+            iva=0,
+        )
+
+    def get_content(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_csv_export_includes_computed_fields(self):
+        """Test the CSV header, rows and IVA columns."""
+        response = self.client.get(reverse("productos:export"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn(
+            'attachment; filename="productos-', response["Content-Disposition"]
+        )
+        rows = list(csv.DictReader(self.get_content(response).decode().splitlines()))
+        self.assertEqual(
+            [row["nombre"] for row in rows], ["Aceite Castrol", "Filtro De Aire"]
+        )
+        self.assertEqual(rows[0]["descripcion"], "Aceite sintético, 5W-30")
+        self.assertEqual(Decimal(rows[0]["precio_con_iva"]), Decimal("115.00"))
+        self.assertEqual(Decimal(rows[0]["valor_iva"]), Decimal("15.00"))
+        self.assertEqual(Decimal(rows[1]["valor_iva"]), Decimal("0"))
+
+    def test_json_export(self):
+        """Test that ?format=json streams a valid JSON array."""
+        response = self.client.get(reverse("productos:export"), {"format": "json"})
+
+        data = json.loads(self.get_content(response))
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[1]["nombre"], "Filtro De Aire")
+        self.assertEqual(Decimal(data[0]["precio_con_iva"]), Decimal("115.00"))
+
+    def test_json_export_of_empty_table(self):
+        """Test that an empty table still yields valid JSON."""
+        Producto.objects.all().delete()
+
+        response = self.client.get(reverse("productos:export"), {"format": "json"})
+
+        self.assertEqual(json.loads(self.get_content(response)), [])
+
+    def test_gzip_export(self):
+        """Test that ?gzip=1 compresses the stream on the fly."""
+        response = self.client.get(reverse("productos:export"), {"gzip": "1"})
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertTrue(response["Content-Disposition"].endswith('.csv.gz"'))
+        content = gzip.decompress(self.get_content(response)).decode()
+        self.assertTrue(content.startswith("id,nombre,descripcion,precio,iva"))
+        self.assertIn("Filtro De Aire", content)
+
+    def test_unknown_format_is_rejected(self):
+        """Test that unsupported formats return 400."""
+        response = self.client.get(reverse("productos:export"), {"format": "xml"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_reads_rows_in_chunks(self):
+        """Test that the queryset is consumed with iterator(chunk_size)."""
+        with mock.patch(
+            "django.db.models.query.QuerySet.iterator", autospec=True
+        ) as iterator:
+            iterator.return_value = iter([])
+            self.get_content(self.client.get(reverse("productos:export")))
+
+        self.assertEqual(iterator.call_args.kwargs, {"chunk_size": 2000})
+
+    async def test_asgi_export_streams_asynchronously(self):
+        """Test that under ASGI the body is an async generator over aiterator."""
+        with mock.patch(
+            "django.db.models.query.QuerySet.aiterator",
+            autospec=True,
+            side_effect=QuerySet.aiterator,
+        ) as aiterator:
+            response = await self.async_client.get(
+                reverse("productos:export"), {"format": "json", "gzip": "1"}
+            )
+            self.assertTrue(response.is_async)
+            content = b"".join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(aiterator.call_args.kwargs, {"chunk_size": 2000})
+        data = json.loads(gzip.decompress(content))
+        self.assertEqual(
+            [row["nombre"] for row in data], ["Aceite Castrol", "Filtro De Aire"]
+        )
@@ -1,16 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     ProductoListView,
+    ProductoAsyncListView,
     ProductoCreateView,
     ProductoUpdateView,
     ProductoDeleteView,
+    ProductoExportView,
 )
 
 app_name = "productos"
 
+# Variante asíncrona cuando se sirve con ASGI (ver carriacces.async_views)
+list_view = ProductoAsyncListView if settings.ASYNC_VIEWS else ProductoListView
+
 urlpatterns = [
-    path("", ProductoListView.as_view(), name="list"),
+    path("", list_view.as_view(), name="list"),
     path("agregar/", ProductoCreateView.as_view(), name="create"),
     path("<int:pk>/editar/", ProductoUpdateView.as_view(), name="update"),
     path("<int:pk>/eliminar/", ProductoDeleteView.as_view(), name="delete"),
+    path("exportar/", ProductoExportView.as_view(), name="export"),
 ]
@@ -1,26 +1,161 @@
+from decimal import Decimal, InvalidOperation
+from django.db.models import Q
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib import messages
+from carriacces.async_views import AsyncListMixin
+from carriacces.counts import CachedCountMixin
+from carriacces.exports import ExportView
+from carriacces.facets import Facet, FacetMixin, FacetOption
+from carriacces.pagination import KeysetPaginationMixin
+from carriacces.routers import ReplicaReadMixin
+from carriacces.search import SearchMixin
+from carriacces.views import (
+    AtomicViewMixin,
+    ReadOnlyViewMixin,
+    UniqueConstraintViewMixin,
+)
 from .models import Producto
 from .forms import ProductoForm
 
+# Ordenamientos del listado por ?orden=; el precio final tiene índice
+ORDENES = {
+    "precio": ("precio_final", "pk"),
+    "-precio": ("-precio_final", "-pk"),
+}
+
+
+def parse_precio(value):
+    """Convierte un límite de precio de la URL; None si no es válido."""
+    try:
+        precio = Decimal(value)
+    except (InvalidOperation, TypeError):
+        return None
+    if not precio.is_finite() or precio < 0:
+        return None
+    return precio
+
+
+SIN_IMAGEN = Q(imagen__isnull=True) | Q(imagen="")
+
+# Facetas del listado; los rangos usan el índice del precio con IVA
+FACETAS = (
+    Facet(
+        "rango",
+        "Precio",
+        (
+            FacetOption("0-25", "Hasta $25", Q(precio_final__lt=25)),
+            FacetOption(
+                "25-100", "$25 a $100", Q(precio_final__gte=25, precio_final__lt=100)
+            ),
+            FacetOption(
+                "100-500",
+                "$100 a $500",
+                Q(precio_final__gte=100, precio_final__lt=500),
+            ),
+            FacetOption("500-", "Más de $500", Q(precio_final__gte=500)),
+        ),
+    ),
+    Facet(
+        "iva",
+        "IVA",
+        tuple(
+            FacetOption(str(valor), etiqueta, Q(iva=valor))
+            for valor, etiqueta in Producto.IVA_CHOICES
+        ),
+    ),
+    Facet(
+        "imagen",
+        "Imagen",
+        (
+            FacetOption("con", "Con imagen", ~SIN_IMAGEN),
+            FacetOption("sin", "Sin imagen", SIN_IMAGEN),
+        ),
+    ),
+)
+
+
+class RangoPrecioMixin:
+    """Filtra el listado por precio con IVA con ``?precio_min=``/``?precio_max=``."""
+
+    def get_rango_precio(self):
+        """Límites ``?precio_min=`` y ``?precio_max=`` del precio con IVA."""
+        return (
+            parse_precio(self.request.GET.get("precio_min")),
+            parse_precio(self.request.GET.get("precio_max")),
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        precio_min, precio_max = self.get_rango_precio()
+        if precio_min is not None:
+            queryset = queryset.filter(precio_final__gte=precio_min)
+        if precio_max is not None:
+            queryset = queryset.filter(precio_final__lte=precio_max)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["precio_min"], context["precio_max"] = self.get_rango_precio()
+        return context
+
 
-class ProductoListView(ListView):
+class ProductoListView(
+    ReadOnlyViewMixin,
+    ReplicaReadMixin,
+    FacetMixin,
+    RangoPrecioMixin,
+    SearchMixin,
+    CachedCountMixin,
+    KeysetPaginationMixin,
+    ListView,
+):
     """Vista para listar todos los productos."""
 
     model = Producto
     template_name = "productos/list.html"
     context_object_name = "productos"
     paginate_by = 15  # 3 columnas x 5 filas
+    keyset_ordering = ("nombre", "pk")
+    facets = FACETAS
+    facet_cache_params = ("q", "precio_min", "precio_max")
+
+    def get_orden(self):
+        """Devuelve el ordenamiento pedido con ``?orden=``, o una cadena vacía."""
+        orden = self.request.GET.get("orden", "")
+        return orden if orden in ORDENES else ""
+
+    def use_keyset_pagination(self):
+        # El cursor solo recorre el orden por nombre
+        if self.get_orden():
+            return False
+        return super().use_keyset_pagination()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        orden = self.get_orden()
+        if orden:
+            queryset = queryset.order_by(*ORDENES[orden])
+        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["title"] = "NUESTROS PRODUCTOS"
-        context["total_productos"] = Producto.objects.count()
+        context["total_productos"] = self.get_display_count()
+        context["orden"] = self.get_orden()
         return context
 
 
-class ProductoCreateView(CreateView):
+class ProductoAsyncListView(AsyncListMixin, ProductoListView):
+    """Variante asíncrona del listado, usada al servir con ASGI."""
+
+    async def get(self, request, *args, **kwargs):
+        # get_context_data reutiliza los conteos ya obtenidos
+        await self.aget_facet_counts()
+        return await super().get(request, *args, **kwargs)
+
+
+class ProductoCreateView(AtomicViewMixin, UniqueConstraintViewMixin, CreateView):
     """Vista para crear un nuevo producto."""
 
     model = Producto
@@ -47,7 +182,7 @@ class ProductoCreateView(CreateView):
         return super().form_invalid(form)
 
 
-class ProductoUpdateView(UpdateView):
+class ProductoUpdateView(AtomicViewMixin, UniqueConstraintViewMixin, UpdateView):
     """Vista para editar un producto existente."""
 
     model = Producto
@@ -75,7 +210,7 @@ class ProductoUpdateView(UpdateView):
         return super().form_invalid(form)
 
 
-class ProductoDeleteView(DeleteView):
+class ProductoDeleteView(AtomicViewMixin, DeleteView):
     """Vista para eliminar un producto."""
 
     model = Producto
@@ -96,3 +231,22 @@ class ProductoDeleteView(DeleteView):
             request, f'El producto "{nombre}" ha sido eliminado exitosamente.'
         )
         return response
+
+
+class ProductoExportView(ExportView):
+    """Exporta todos los productos en CSV o JSON."""
+
+    model = Producto
+    export_fields = (
+        "id",
+        "nombre",
+        "descripcion",
+        "precio",
+        "iva",
+        "precio_con_iva",
+        "valor_iva",
+        "created_at",
+        "updated_at",
+    )
+    # Las propiedades precio_con_iva y valor_iva leen las columnas generadas
+    load_fields = ("precio_final", "monto_iva")
@@ -1,11 +1,15 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import Proveedor
+from .models import Proveedor, normalizar_pais
+from carriacces.forms import UniqueConstraintFormMixin
 
 
-class ProveedorForm(forms.ModelForm):
+class ProveedorForm(UniqueConstraintFormMixin, forms.ModelForm):
     """Formulario para crear y editar proveedores."""
 
+    # El nombre duplicado lo detecta la restricción única del modelo
+    constraint_fields = {"proveedor_nombre_unico": "nombre"}
+
     class Meta:
         model = Proveedor
         fields = ["nombre", "descripcion", "telefono", "pais", "correo", "direccion"]
@@ -113,7 +117,7 @@ class ProveedorForm(forms.ModelForm):
         """Validación personalizada para el país."""
         pais = self.cleaned_data.get("pais")
         if pais:
-            pais = pais.strip().title()
+            pais = normalizar_pais(pais)
             if len(pais) < 2:
                 raise ValidationError(
                     "El nombre del país debe tener al menos 2 caracteres."
@@ -148,28 +152,3 @@ class ProveedorForm(forms.ModelForm):
                     "La dirección debe ser más específica (al menos 10 caracteres)."
                 )
         return direccion
-
-    def clean(self):
-        """Validación global del formulario."""
-        cleaned_data = super().clean()
-
-        # Validar duplicados de nombre (opcional, según reglas de negocio)
-        nombre = cleaned_data.get("nombre")
-        if nombre:
-            if self.instance.pk:
-                # Editando registro existente
-                existing = Proveedor.objects.filter(nombre__iexact=nombre).exclude(
-                    pk=self.instance.pk
-                )
-                if existing.exists():
-                    raise ValidationError(
-                        {"nombre": "Ya existe un proveedor con este nombre."}
-                    )
-            else:
-                # Creando nuevo registro
-                if Proveedor.objects.filter(nombre__iexact=nombre).exists():
-                    raise ValidationError(
-                        {"nombre": "Ya existe un proveedor con este nombre."}
-                    )
-
-        return cleaned_data
@@ -2,6 +2,7 @@
 Management command to populate proveedores with mock data from South America.
 """
 from django.core.management.base import BaseCommand
+from carriacces.catalog_import import CATALOGS, CatalogImporter
 from proveedores.models import Proveedor
 
 
@@ -84,25 +85,27 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS('Creating mock proveedores...'))
 
-        for proveedor_data in proveedores_data:
-            # Create proveedor
-            proveedor = Proveedor.objects.create(
-                nombre=proveedor_data['nombre'],
-                descripcion=proveedor_data['descripcion'],
-                telefono=proveedor_data['telefono'],
-                pais=proveedor_data['pais'],
-                correo=proveedor_data['correo'],
-                direccion=proveedor_data['direccion']
-            )
+        # Same path as import_catalog: rows validated with ProveedorForm and
+        # written with a single bulk_create
+        header = list(proveedores_data[0])
+        result = CatalogImporter(CATALOGS['proveedores'], header).run(
+            (line, [proveedor_data[name] for name in header])
+            for line, proveedor_data in enumerate(proveedores_data, start=1)
+        )
 
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'Created proveedor: {proveedor.nombre} - {proveedor.pais}'
+        failed = {line for line, _ in result.errors}
+        for line, message in result.errors:
+            self.stdout.write(self.style.ERROR(f'Proveedor {line}: {message}'))
+        for line, proveedor_data in enumerate(proveedores_data, start=1):
+            if line not in failed:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'Created proveedor: {proveedor_data["nombre"]} - {proveedor_data["pais"]}'
+                    )
                 )
-            )
 
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully created {len(proveedores_data)} proveedores!'
+                f'Successfully created {result.created} proveedores!'
             )
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+
+def renombrar_duplicados(apps, schema_editor):
+    """
+    Los nombres repetidos sin distinguir mayúsculas impedirían crear la
+    restricción; se conserva el más antiguo y al resto se le agrega su id.
+    """
+    Modelo = apps.get_model('proveedores', 'Proveedor')
+    por_clave = Modelo.objects.annotate(clave=Upper('nombre'))
+    duplicados = (
+        por_clave.values('clave')
+        .annotate(total=models.Count('pk'))
+        .filter(total__gt=1)
+        .values_list('clave', flat=True)
+    )
+    for clave in list(duplicados):
+        for registro in por_clave.filter(clave=clave).order_by('pk')[1:]:
+            sufijo = f' ({registro.pk})'
+            registro.nombre = registro.nombre[:200 - len(sufijo)] + sufijo
+            registro.save(update_fields=['nombre'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedores', '0003_busqueda'),
+    ]
+
+    operations = [
+        migrations.RunPython(renombrar_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='proveedor',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Upper('nombre'), name='proveedor_nombre_unico', violation_error_code='nombre_duplicado', violation_error_message='Ya existe un proveedor con este nombre.'),
+        ),
+    ]
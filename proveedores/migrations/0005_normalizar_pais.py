@@ -0,0 +1,27 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:40
+
+from django.db import migrations
+
+
+def normalizar_paises(apps, schema_editor):
+    """
+    Guarda los países como lo hace Proveedor.clean, para que ?pais= los
+    encuentre con una comparación exacta sobre el índice.
+    """
+    Modelo = apps.get_model('proveedores', 'Proveedor')
+    paises = Modelo.objects.order_by('pais').values_list('pais', flat=True).distinct()
+    for pais in list(paises):
+        normalizado = pais.strip().title()
+        if normalizado != pais:
+            Modelo.objects.filter(pais=pais).update(pais=normalizado)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedores', '0004_nombre_unico'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalizar_paises, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,14 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.core.validators import EmailValidator, RegexValidator
 
 
+def normalizar_pais(pais: str) -> str:
+    """Normaliza el nombre de un país como se guarda en la base de datos."""
+    return pais.strip().title()
+
+
 class Proveedor(models.Model):
     """Modelo para proveedores de CarriAcces."""
 
@@ -44,6 +51,11 @@ class Proveedor(models.Model):
         verbose_name="Dirección", help_text="Dirección física completa del proveedor"
     )
 
+    # Vector de búsqueda (nombre con peso A, descripción con peso B). En
+    # PostgreSQL lo mantiene un trigger y lo indexa un GIN, ambos creados en
+    # las migraciones; ver carriacces.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -55,6 +67,16 @@ class Proveedor(models.Model):
             models.Index(fields=["nombre"]),
             models.Index(fields=["pais"]),
         ]
+        constraints = [
+            # Nombre único sin distinguir mayúsculas; el índice funcional
+            # también sirve a la validación de ProveedorForm
+            models.UniqueConstraint(
+                Upper("nombre"),
+                name="proveedor_nombre_unico",
+                violation_error_code="nombre_duplicado",
+                violation_error_message="Ya existe un proveedor con este nombre.",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.nombre
@@ -69,7 +91,7 @@ class Proveedor(models.Model):
         if self.descripcion:
             self.descripcion = self.descripcion.strip()
         if self.pais:
-            self.pais = self.pais.strip().title()
+            self.pais = normalizar_pais(self.pais)
         if self.correo:
             self.correo = self.correo.strip().lower()
         if self.direccion:
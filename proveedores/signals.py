@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from carriacces.cache import bump_model_version
+from carriacces.counts import invalidate_total_count
+from .models import Proveedor
+
+
+@receiver(post_save, sender=Proveedor)
+@receiver(post_delete, sender=Proveedor)
+def invalidar_cache_proveedores(sender, **kwargs):
+    """Invalida el total y las tarjetas cacheadas cuando cambia la tabla."""
+    invalidate_total_count(sender)
+    bump_model_version(sender)
@@ -3,13 +3,24 @@ Test cases for Proveedor model using London School TDD approach.
 Focus on interaction testing and behavior verification.
 """
 
+from io import StringIO
+
 from django.contrib.messages import get_messages
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.test import TestCase, Client
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from proveedores.forms import ProveedorForm
 from proveedores.models import Proveedor
+from proveedores.views import ProveedorAsyncListView
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
 
 
 class ProveedorModelTest(TestCase):
@@ -204,9 +215,10 @@ class ProveedorModelTest(TestCase):
 class ProveedorQuerySetTest(TestCase):
     """Test default queryset behavior and ordering."""
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.proveedor1 = Proveedor.objects.create(
+        cls.proveedor1 = Proveedor.objects.create(
             nombre="Alpha Proveedores",
             descripcion="Proveedor de repuestos",
             telefono="02-1234567",
@@ -214,7 +226,7 @@ class ProveedorQuerySetTest(TestCase):
             correo="alpha@provider.com",
             direccion="Calle Alpha 123",
         )
-        self.proveedor2 = Proveedor.objects.create(
+        cls.proveedor2 = Proveedor.objects.create(
             nombre="Beta Importadores",
             descripcion="Importador de accesorios",
             telefono="02-7654321",
@@ -222,7 +234,7 @@ class ProveedorQuerySetTest(TestCase):
             correo="beta@importer.com",
             direccion="Calle Beta 456",
         )
-        self.proveedor3 = Proveedor.objects.create(
+        cls.proveedor3 = Proveedor.objects.create(
             nombre="Gamma Distribuidores",
             descripcion="Distribuidor especializado",
             telefono="02-9876543",
@@ -958,3 +970,197 @@ class ProveedorViewsTest(TestCase):
         self.assertContains(response, proveedor.correo)
         self.assertContains(response, proveedor.telefono)
         self.assertContains(response, proveedor.pais)
+
+
+class ProveedorSearchTest(TestCase):
+    """Test the ?q= search of the proveedor list view (icontains fallback)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create proveedores with distinct names and descriptions."""
+        Proveedor.objects.all().delete()
+        datos = {
+            "telefono": "+593-2-2234567",
+            "pais": "Ecuador",
+            "correo": "ventas@proveedor.com",
+            "direccion": "Av. Amazonas 123, Quito",
+        }
+        cls.llantas = Proveedor.objects.create(
+            nombre="Llantas Del Pacífico",
+            descripcion="Distribuidor de neumáticos",
+            **datos,
+        )
+        cls.lubricantes = Proveedor.objects.create(
+            nombre="Lubricantes Andinos",
+            descripcion="Aceites y grasas industriales",
+            **datos,
+        )
+
+    def test_search_filters_proveedores(self):
+        """Test that only matching proveedores are listed."""
+        response = self.client.get(reverse("proveedores:list"), {"q": "neumáticos"})
+
+        self.assertEqual(list(response.context["proveedores"]), [self.llantas])
+        self.assertContains(response, 'value="neumáticos"')
+
+    def test_blank_search_lists_everything(self):
+        """Test that a whitespace-only query does not filter."""
+        response = self.client.get(reverse("proveedores:list"), {"q": "   "})
+
+        self.assertEqual(len(response.context["proveedores"]), 2)
+        self.assertEqual(response.context["search_query"], "")
+
+
+class ProveedorPaisTest(TestCase):
+    """Test the ?pais= filter and the per-country summary of the list view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create proveedores in two countries."""
+        cls.url = reverse("proveedores:list")
+        Proveedor.objects.all().delete()
+        datos = {
+            "descripcion": "Distribuidor de accesorios",
+            "telefono": "+593-2-2234567",
+            "correo": "ventas@proveedor.com",
+            "direccion": "Av. Amazonas 123",
+        }
+        cls.quito = Proveedor.objects.create(
+            nombre="Accesorios Quito", pais="Ecuador", **datos
+        )
+        cls.guayaquil = Proveedor.objects.create(
+            nombre="Repuestos Guayaquil", pais="Ecuador", **datos
+        )
+        cls.lima = Proveedor.objects.create(nombre="Autos Lima", pais="Perú", **datos)
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def _resumen(self, context):
+        (facet,) = context["facets"]
+        return {option["value"]: option["count"] for option in facet["options"]}
+
+    def test_pais_filter_is_normalized(self):
+        """Test that ?pais= is title-cased like Proveedor.clean."""
+        response = self.client.get(self.url, {"pais": "  ecuador "})
+
+        self.assertEqual(
+            list(response.context["proveedores"]), [self.quito, self.guayaquil]
+        )
+        self.assertEqual(response.context["pais"], "Ecuador")
+
+    def test_unknown_pais_shows_empty_state(self):
+        """Test that a country without proveedores lists nothing."""
+        response = self.client.get(self.url, {"pais": "Chile"})
+
+        self.assertEqual(len(response.context["proveedores"]), 0)
+        self.assertContains(response, "No hay proveedores en Chile")
+
+    def test_summary_uses_one_grouped_query(self):
+        """Test the per-country totals come from a single GROUP BY."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        grouped = [q for q in queries.captured_queries if "GROUP BY" in q["sql"]]
+        self.assertEqual(len(grouped), 1)
+        self.assertEqual(self._resumen(response.context), {"Ecuador": 2, "Perú": 1})
+
+    def test_summary_links_toggle_the_filter(self):
+        """Test that a selected country links back to the unfiltered list."""
+        response = self.client.get(self.url, {"pais": "Ecuador", "page": "1"})
+        (facet,) = response.context["facets"]
+        options = {option["value"]: option for option in facet["options"]}
+
+        self.assertTrue(options["Ecuador"]["selected"])
+        self.assertEqual(options["Ecuador"]["url"], "?")
+        self.assertEqual(options["Perú"]["url"], "?pais=Per%C3%BA")
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_summary_is_cached_until_a_write(self):
+        """Test that the summary query is skipped until a proveedor changes."""
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertFalse(any("GROUP BY" in q["sql"] for q in queries.captured_queries))
+
+        self.lima.pais = "Ecuador"
+        self.lima.save()
+        response = self.client.get(self.url)
+        self.assertEqual(self._resumen(response.context), {"Ecuador": 3})
+
+    async def test_async_view_builds_the_summary(self):
+        """Test that the async list view provides the same summary."""
+        view = ProveedorAsyncListView.as_view()
+        response = await view(AsyncRequestFactory().get(self.url, {"pais": "perú"}))
+
+        self.assertEqual(
+            self._resumen(response.context_data), {"Ecuador": 2, "Perú": 1}
+        )
+        self.assertEqual(len(response.context_data["proveedores"]), 1)
+
+
+class ProveedorNombreUnicoTest(TestCase):
+    """Test the case-insensitive unique constraint on Proveedor.nombre."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the proveedor whose name is taken."""
+        cls.valid_data = {
+            "nombre": "Importadora AutoParts S.A.",
+            "descripcion": "Importadora especializada en repuestos automotrices",
+            "telefono": "+593-2-2234567",
+            "pais": "Ecuador",
+            "correo": "ventas@autoparts.com.ec",
+            "direccion": "Av. Amazonas 123, Quito, Ecuador",
+        }
+        cls.proveedor = Proveedor.objects.create(**cls.valid_data)
+
+    def test_form_reports_duplicate_on_nombre(self):
+        """Test that a name differing only in case is rejected on nombre."""
+        data = {
+            **self.valid_data,
+            "nombre": "IMPORTADORA AUTOPARTS S.A.",
+            "correo": "otro@autoparts.com.ec",
+        }
+        form = ProveedorForm(data=data)
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors["nombre"], ["Ya existe un proveedor con este nombre."]
+        )
+
+    def test_form_allows_same_instance_on_edit(self):
+        """Test that editing a proveedor keeps its own name valid."""
+        form = ProveedorForm(data=self.valid_data, instance=self.proveedor)
+
+        self.assertTrue(form.is_valid(), form.errors)
+
+
+class ProveedorExportViewTest(TestCase):
+    """Test the streaming export of proveedores."""
+
+    def test_csv_export_lists_every_proveedor(self):
+        """Test that the CSV has a row per proveedor."""
+        response = self.client.get(reverse("proveedores:export"))
+
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(content.splitlines()), Proveedor.objects.count() + 1)
+        self.assertTrue(content.startswith("id,nombre,descripcion,telefono,pais"))
+
+
+class PopulateProveedoresCommandTest(TestCase):
+    """Test the populate_proveedores command on the bulk import path."""
+
+    def test_populates_with_a_single_bulk_insert(self):
+        """Test that every proveedor is validated and written in one INSERT."""
+        Proveedor.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command("populate_proveedores", stdout=StringIO())
+
+        self.assertEqual(Proveedor.objects.count(), 6)
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
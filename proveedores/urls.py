@@ -1,16 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     ProveedorListView,
+    ProveedorAsyncListView,
     ProveedorCreateView,
     ProveedorUpdateView,
     ProveedorDeleteView,
+    ProveedorExportView,
 )
 
 app_name = "proveedores"
 
+# Variante asíncrona cuando se sirve con ASGI (ver carriacces.async_views)
+list_view = ProveedorAsyncListView if settings.ASYNC_VIEWS else ProveedorListView
+
 urlpatterns = [
-    path("", ProveedorListView.as_view(), name="list"),
+    path("", list_view.as_view(), name="list"),
     path("agregar/", ProveedorCreateView.as_view(), name="create"),
     path("<int:pk>/editar/", ProveedorUpdateView.as_view(), name="update"),
     path("<int:pk>/eliminar/", ProveedorDeleteView.as_view(), name="delete"),
+    path("exportar/", ProveedorExportView.as_view(), name="export"),
 ]
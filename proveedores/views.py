@@ -1,26 +1,124 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib import messages
-from .models import Proveedor
+from carriacces.async_views import AsyncListMixin
+from carriacces.cache import get_model_versions
+from carriacces.counts import CachedCountMixin
+from carriacces.exports import ExportView
+from carriacces.facets import facet_url
+from carriacces.pagination import KeysetPaginationMixin
+from carriacces.routers import ReplicaReadMixin, replica_cache_timeout
+from carriacces.search import SearchMixin
+from carriacces.views import (
+    AtomicViewMixin,
+    ReadOnlyViewMixin,
+    UniqueConstraintViewMixin,
+)
+from .models import Proveedor, normalizar_pais
 from .forms import ProveedorForm
 
+PAISES_CACHE_PREFIX = "carriacces:proveedores:paises"
 
-class ProveedorListView(ListView):
+
+def resumen_por_pais():
+    """
+    Return ``[{"pais": ..., "total": ...}]`` ordered by country.
+
+    One ``GROUP BY pais`` query, cached until the next write to Proveedor.
+    """
+    (version,) = get_model_versions(Proveedor)
+    key = f"{PAISES_CACHE_PREFIX}:{version}"
+    resumen = cache.get(key)
+    if resumen is None:
+        resumen = list(
+            Proveedor.objects.values("pais")
+            .annotate(total=Count("pk"))
+            .order_by("pais")
+        )
+        timeout = getattr(settings, "FACET_CACHE_TIMEOUT", 300)
+        cache.set(key, resumen, replica_cache_timeout(timeout))
+    return resumen
+
+
+class ProveedorListView(
+    ReadOnlyViewMixin,
+    ReplicaReadMixin,
+    SearchMixin,
+    CachedCountMixin,
+    KeysetPaginationMixin,
+    ListView,
+):
     """Vista para listar todos los proveedores."""
 
     model = Proveedor
     template_name = "proveedores/list.html"
     context_object_name = "proveedores"
     paginate_by = 15  # 3 columnas x 5 filas
+    keyset_ordering = ("nombre", "pk")
+
+    def get_pais(self):
+        """País pedido con ``?pais=``, normalizado como en Proveedor.clean."""
+        return normalizar_pais(self.request.GET.get("pais", ""))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        pais = self.get_pais()
+        if pais:
+            # Comparación exacta: usa el índice de pais
+            queryset = queryset.filter(pais=pais)
+        return queryset
+
+    def get_resumen_paises(self):
+        if getattr(self, "resumen_paises", None) is None:
+            self.resumen_paises = resumen_por_pais()
+        return self.resumen_paises
+
+    def get_facet_paises(self):
+        """Resumen por país con la forma de ``components/facets.html``."""
+        pais = self.get_pais()
+        return {
+            "param": "pais",
+            "label": "País",
+            "options": [
+                {
+                    "value": fila["pais"],
+                    "label": fila["pais"],
+                    "count": fila["total"],
+                    "selected": fila["pais"] == pais,
+                    "url": facet_url(
+                        self.request.GET,
+                        "pais",
+                        None if fila["pais"] == pais else fila["pais"],
+                    ),
+                }
+                for fila in self.get_resumen_paises()
+            ],
+            "clear_url": facet_url(self.request.GET, "pais", None) if pais else None,
+        }
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["title"] = "NUESTROS PROVEEDORES"
-        context["total_proveedores"] = Proveedor.objects.count()
+        context["total_proveedores"] = self.get_display_count()
+        context["pais"] = self.get_pais()
+        context["facets"] = [self.get_facet_paises()]
         return context
 
 
-class ProveedorCreateView(CreateView):
+class ProveedorAsyncListView(AsyncListMixin, ProveedorListView):
+    """Variante asíncrona del listado, usada al servir con ASGI."""
+
+    async def get(self, request, *args, **kwargs):
+        # get_context_data reutiliza el resumen ya obtenido
+        self.resumen_paises = await sync_to_async(resumen_por_pais)()
+        return await super().get(request, *args, **kwargs)
+
+
+class ProveedorCreateView(AtomicViewMixin, UniqueConstraintViewMixin, CreateView):
     """Vista para crear un nuevo proveedor."""
 
     model = Proveedor
@@ -47,7 +145,7 @@ class ProveedorCreateView(CreateView):
         return super().form_invalid(form)
 
 
-class ProveedorUpdateView(UpdateView):
+class ProveedorUpdateView(AtomicViewMixin, UniqueConstraintViewMixin, UpdateView):
     """Vista para editar un proveedor existente."""
 
     model = Proveedor
@@ -75,7 +173,7 @@ class ProveedorUpdateView(UpdateView):
         return super().form_invalid(form)
 
 
-class ProveedorDeleteView(DeleteView):
+class ProveedorDeleteView(AtomicViewMixin, DeleteView):
     """Vista para eliminar un proveedor."""
 
     model = Proveedor
@@ -96,3 +194,20 @@ class ProveedorDeleteView(DeleteView):
             request, f'El proveedor "{nombre}" ha sido eliminado exitosamente.'
         )
         return response
+
+
+class ProveedorExportView(ExportView):
+    """Exporta todos los proveedores en CSV o JSON."""
+
+    model = Proveedor
+    export_fields = (
+        "id",
+        "nombre",
+        "descripcion",
+        "telefono",
+        "pais",
+        "correo",
+        "direccion",
+        "created_at",
+        "updated_at",
+    )
@@ -1,15 +1,23 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from .models import Trabajador
-from carriacces.utils import validate_uploaded_image
+from carriacces.forms import BatchedUniqueFormMixin, ImageUploadField
 
 
-class TrabajadorForm(forms.ModelForm):
+class TrabajadorForm(BatchedUniqueFormMixin, forms.ModelForm):
     """Formulario para crear y editar trabajadores."""
 
+    # Los tres campos únicos se comprueban juntos en una sola consulta
+    unique_error_messages = {
+        "correo": "Ya existe un trabajador con este correo electrónico.",
+        "cedula": "Ya existe un trabajador con esta cédula.",
+        "codigo_empleado": "Ya existe un trabajador con este código de empleado.",
+    }
+
     class Meta:
         model = Trabajador
         fields = ["nombre", "apellido", "correo", "cedula", "codigo_empleado", "imagen"]
+        field_classes = {"imagen": ImageUploadField}
         widgets = {
             "nombre": forms.TextInput(
                 attrs={
@@ -99,23 +107,6 @@ class TrabajadorForm(forms.ModelForm):
         correo = self.cleaned_data.get("correo")
         if correo:
             correo = correo.strip().lower()
-            # Verificar unicidad
-            if self.instance.pk:
-                # Editando registro existente
-                if (
-                    Trabajador.objects.filter(correo=correo)
-                    .exclude(pk=self.instance.pk)
-                    .exists()
-                ):
-                    raise ValidationError(
-                        "Ya existe un trabajador con este correo electrónico."
-                    )
-            else:
-                # Creando nuevo registro
-                if Trabajador.objects.filter(correo=correo).exists():
-                    raise ValidationError(
-                        "Ya existe un trabajador con este correo electrónico."
-                    )
         return correo
 
     def clean_cedula(self):
@@ -125,20 +116,6 @@ class TrabajadorForm(forms.ModelForm):
             cedula = cedula.strip()
             if not cedula.isdigit() or len(cedula) != 10:
                 raise ValidationError("La cédula debe contener exactamente 10 dígitos.")
-
-            # Verificar unicidad
-            if self.instance.pk:
-                # Editando registro existente
-                if (
-                    Trabajador.objects.filter(cedula=cedula)
-                    .exclude(pk=self.instance.pk)
-                    .exists()
-                ):
-                    raise ValidationError("Ya existe un trabajador con esta cédula.")
-            else:
-                # Creando nuevo registro
-                if Trabajador.objects.filter(cedula=cedula).exists():
-                    raise ValidationError("Ya existe un trabajador con esta cédula.")
         return cedula
 
     def clean_codigo_empleado(self):
@@ -150,30 +127,4 @@ class TrabajadorForm(forms.ModelForm):
                 raise ValidationError(
                     "El código de empleado debe tener al menos 3 caracteres."
                 )
-
-            # Verificar unicidad
-            if self.instance.pk:
-                # Editando registro existente
-                if (
-                    Trabajador.objects.filter(codigo_empleado=codigo)
-                    .exclude(pk=self.instance.pk)
-                    .exists()
-                ):
-                    raise ValidationError(
-                        "Ya existe un trabajador con este código de empleado."
-                    )
-            else:
-                # Creando nuevo registro
-                if Trabajador.objects.filter(codigo_empleado=codigo).exists():
-                    raise ValidationError(
-                        "Ya existe un trabajador con este código de empleado."
-                    )
         return codigo
-
-    def clean_imagen(self):
-        """Validación personalizada para la imagen."""
-        imagen = self.cleaned_data.get("imagen")
-        if imagen:
-            # Use the centralized validation utility
-            imagen = validate_uploaded_image(imagen)
-        return imagen
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:43
+
+import carriacces.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trabajadores', '0004_remove_trabajador_tipo_trabajador'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trabajador',
+            name='imagen',
+            field=models.ImageField(blank=True, help_text='Foto del trabajador (opcional)', null=True, storage=carriacces.storage.content_hash_storage, upload_to='trabajadores/', verbose_name='Imagen'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.2 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+from carriacces.images import generate_thumbnails
+
+
+def generar_miniaturas(apps, schema_editor):
+    """Generar y guardar las miniaturas de las imágenes ya subidas."""
+    Modelo = apps.get_model('trabajadores', 'Trabajador')
+    for registro in Modelo.objects.exclude(imagen='').exclude(imagen__isnull=True):
+        miniaturas = generate_thumbnails(registro.imagen)
+        registro.imagen_miniaturas = {
+            str(ancho): nombre for ancho, nombre in sorted(miniaturas.items())
+        }
+        registro.save(update_fields=['imagen_miniaturas'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trabajadores', '0006_imagen_metadatos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajador',
+            name='imagen_miniaturas',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Miniaturas de la imagen'),
+        ),
+        migrations.RunPython(generar_miniaturas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.2 on 2026-10-17 00:10
+
+import os
+import re
+
+from django.db import migrations
+
+from carriacces.images import generate_thumbnails
+
+# trabajadores/<sha256>.<ext>
+NOMBRE_HASH = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+
+
+def renombrar_por_hash(apps, schema_editor):
+    """
+    Copiar las imágenes existentes a su nombre por contenido y actualizar las filas.
+
+    La migración 0002 siembra las fotos con el almacenamiento por defecto, así
+    que apuntan a copias con su nombre original o con sufijo
+    (``empleado_1_AbC123.jpg``). Las copias viejas quedan huérfanas y las
+    elimina ``gc_media``, que conserva las imágenes de ``MEDIA_SEED_FILES``.
+    """
+    Trabajador = apps.get_model('trabajadores', 'Trabajador')
+    for registro in Trabajador.objects.exclude(imagen='').exclude(imagen__isnull=True):
+        if NOMBRE_HASH.match(os.path.basename(registro.imagen.name)):
+            continue
+        storage = registro.imagen.storage
+        if not storage.exists(registro.imagen.name):
+            continue
+        with registro.imagen.open('rb') as f:
+            registro.imagen = storage.save(registro.imagen.name, f)
+        miniaturas = generate_thumbnails(registro.imagen)
+        registro.imagen_miniaturas = {
+            str(ancho): nombre for ancho, nombre in sorted(miniaturas.items())
+        }
+        registro.save(update_fields=['imagen', 'imagen_miniaturas'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trabajadores', '0007_imagen_miniaturas'),
+    ]
+
+    operations = [
+        migrations.RunPython(renombrar_por_hash, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.validators import EmailValidator, RegexValidator
 from carriacces.utils import validate_uploaded_image
+from carriacces.storage import content_hash_storage
 
 
 class Trabajador(models.Model):
@@ -43,12 +44,29 @@ class Trabajador(models.Model):
 
     imagen = models.ImageField(
         upload_to="trabajadores/",
+        storage=content_hash_storage,
         blank=True,
         null=True,
         verbose_name="Imagen",
         help_text="Foto del trabajador (opcional)",
     )
 
+    # Metadatos leídos una sola vez al subir la imagen (ver carriacces.utils)
+    imagen_ancho = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Ancho de la imagen"
+    )
+    imagen_alto = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Alto de la imagen"
+    )
+    imagen_formato = models.CharField(
+        max_length=10, blank=True, editable=False, verbose_name="Formato de la imagen"
+    )
+    # {"<ancho>": "<nombre>"} de las miniaturas generadas al subir la imagen
+    # (ver carriacces.images); el srcset se arma sin tocar el almacenamiento
+    imagen_miniaturas = models.JSONField(
+        default=dict, blank=True, editable=False, verbose_name="Miniaturas de la imagen"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
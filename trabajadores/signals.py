@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from carriacces.cache import bump_model_version
+from carriacces.counts import invalidate_total_count
+from carriacces.images import record_thumbnails
+from carriacces.utils import image_changed, record_image_metadata
+from .models import Trabajador
+
+
+@receiver(post_save, sender=Trabajador)
+@receiver(post_delete, sender=Trabajador)
+def invalidar_cache_trabajadores(sender, **kwargs):
+    """Invalida el total y las tarjetas cacheadas cuando cambia la tabla."""
+    invalidate_total_count(sender)
+    bump_model_version(sender)
+
+
+@receiver(pre_save, sender=Trabajador)
+def registrar_metadatos_imagen(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """Guarda formato, dimensiones y miniaturas de una imagen nueva."""
+    if not raw and image_changed(instance, update_fields=update_fields):
+        record_image_metadata(instance)
+        record_thumbnails(instance)
@@ -3,10 +3,25 @@ Test cases for Trabajadores app using London School TDD approach.
 Focus on interaction testing and behavior verification.
 """
 
+import json
+import os
+import shutil
+import tempfile
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 
+from carriacces.storage import media_storage
+from carriacces.testing import png_bytes
 from trabajadores.models import Trabajador
 from trabajadores.forms import TrabajadorForm
 
@@ -392,6 +407,76 @@ class TrabajadorFormTest(TestCase):
         self.assertIn("correo", form.errors)
 
 
+class TrabajadorUniqueValidationTest(TestCase):
+    """Test the batched uniqueness check of TrabajadorForm."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the trabajador whose unique values are taken."""
+        cls.trabajador = Trabajador.objects.create(
+            nombre="Ana",
+            apellido="Mora",
+            correo="ana.mora@test.com",
+            cedula="0912345678",
+            codigo_empleado="TST900",
+        )
+        cls.data = {
+            "nombre": "Luis",
+            "apellido": "Vera",
+            "correo": "luis.vera@test.com",
+            "cedula": "0987654321",
+            "codigo_empleado": "TST901",
+        }
+
+    def test_valid_form_checks_uniqueness_with_one_query(self):
+        """Test that the three unique fields cost a single query."""
+        form = TrabajadorForm(data=self.data)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(form.is_valid(), form.errors)
+
+        self.assertEqual(len(queries), 1)
+        self.assertIn(" OR ", queries[0]["sql"])
+
+    def test_reports_every_duplicated_field(self):
+        """Test that each taken value gets its own field error."""
+        data = {**self.data, "correo": "ANA.MORA@test.com", "codigo_empleado": "tst900"}
+        form = TrabajadorForm(data=data)
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors["correo"],
+            ["Ya existe un trabajador con este correo electrónico."],
+        )
+        self.assertEqual(
+            form.errors["codigo_empleado"],
+            ["Ya existe un trabajador con este código de empleado."],
+        )
+        self.assertNotIn("cedula", form.errors)
+
+    def test_edit_keeps_own_values(self):
+        """Test that the edited instance does not conflict with itself."""
+        data = {
+            "nombre": "Ana",
+            "apellido": "Mora",
+            "correo": "ana.mora@test.com",
+            "cedula": "0912345678",
+            "codigo_empleado": "TST900",
+        }
+        form = TrabajadorForm(data=data, instance=self.trabajador)
+
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_invalid_field_is_not_checked(self):
+        """Test that a field failing its own validation is left out."""
+        form = TrabajadorForm(data={**self.data, "cedula": "123"})
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors["cedula"], ["La cédula debe contener exactamente 10 dígitos."]
+        )
+
+
 class TrabajadorViewTest(TestCase):
     """Test Trabajador views and templates."""
 
@@ -561,3 +646,129 @@ class TrabajadorViewTest(TestCase):
         )
         self.assertEqual(response.context["title"], "ELIMINAR TRABAJADOR")
         self.assertEqual(response.context["trabajador"], trabajador)
+
+
+class TrabajadorKeysetPaginationTest(TestCase):
+    """Test cursor (keyset) pagination mode of the trabajador list view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create trabajadores sharing apellido to exercise the tie-breakers."""
+        for i in range(15):
+            Trabajador.objects.create(
+                nombre=f"Nombre{'ab'[i % 2]}",
+                apellido=f"Apellido{i % 3}",
+                correo=f"keyset{i}@carriacces.com",
+                cedula=f"{1500000000 + i}",
+                codigo_empleado=f"KEY{i:03d}",
+            )
+
+    def test_keyset_pages_follow_apellido_nombre_pk(self):
+        """Test that cursor pages follow the (apellido, nombre, pk) ordering."""
+        url = reverse("trabajadores:list")
+        pks = []
+        params = {"cursor": ""}
+        while True:
+            response = self.client.get(url, params)
+            page = response.context["page_obj"]
+            pks.extend(t.pk for t in response.context["trabajadores"])
+            if not page.has_next():
+                break
+            params = {"cursor": page.next_cursor}
+
+        expected = list(
+            Trabajador.objects.order_by("apellido", "nombre", "pk").values_list(
+                "pk", flat=True
+            )
+        )
+        self.assertEqual(pks, expected)
+
+
+class TrabajadorExportViewTest(TestCase):
+    """Test the streaming export of trabajadores."""
+
+    def test_json_export_lists_every_trabajador(self):
+        """Test that the JSON export has an object per trabajador."""
+        Trabajador.objects.create(
+            nombre="Ana",
+            apellido="Mora",
+            correo="ana.export@test.com",
+            cedula="0933333333",
+            codigo_empleado="EXP001",
+        )
+        response = self.client.get(reverse("trabajadores:export"), {"format": "json"})
+
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(data), Trabajador.objects.count())
+        self.assertNotIn("imagen", data[0])
+        self.assertIn("codigo_empleado", data[0])
+
+
+class TrabajadorImagenHashMigrationTest(TestCase):
+    """Test the seed photos and the migration renaming them by content hash."""
+
+    def test_seeded_photos_end_up_named_by_content(self):
+        """Test that 0008 repoints the photos stored by the seed migration."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        shutil.copytree(
+            settings.BASE_DIR / "media" / "trabajadores",
+            os.path.join(media_root, "trabajadores"),
+        )
+        semilla = import_module("trabajadores.migrations.0002_populate_trabajadores")
+        migracion = import_module(
+            "trabajadores.migrations.0008_renombrar_imagenes_por_hash"
+        )
+        Trabajador.objects.all().delete()
+
+        with self.settings(
+            MEDIA_ROOT=media_root,
+            STORAGES={
+                **settings.STORAGES,
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "media": {"BACKEND": "carriacces.storage.ContentHashStorage"},
+            },
+        ):
+            # The historical model of 0002 saves through the default storage
+            with mock.patch.object(
+                Trabajador._meta.get_field("imagen"), "storage", default_storage
+            ):
+                semilla.populate_trabajadores(apps, None)
+            sembrados = list(Trabajador.objects.values_list("imagen", flat=True))
+            migracion.renombrar_por_hash(apps, None)
+
+        nombres = list(Trabajador.objects.values_list("imagen", flat=True))
+        self.assertEqual(len(nombres), 4)
+        for sembrado in sembrados:
+            self.assertNotRegex(sembrado, r"[0-9a-f]{64}")
+        for nombre in nombres:
+            self.assertRegex(nombre, r"^trabajadores/[0-9a-f]{64}\.jpg$")
+            self.assertTrue(os.path.exists(os.path.join(media_root, nombre)))
+
+    def test_suffixed_photos_are_rehashed(self):
+        """Test that rows pointing to suffixed copies are repointed."""
+        migracion = import_module(
+            "trabajadores.migrations.0008_renombrar_imagenes_por_hash"
+        )
+        viejo = media_storage.save_derivative(
+            "trabajadores/empleado_9_AbC123x.png",
+            ContentFile(png_bytes(size=(400, 200))),
+        )
+        self.addCleanup(media_storage.delete, viejo)
+        trabajador = Trabajador.objects.create(
+            nombre="Luis",
+            apellido="Vera",
+            correo="luis.vera@carriacces.com",
+            cedula="0912345678",
+            codigo_empleado="EMP090",
+        )
+        Trabajador.objects.filter(pk=trabajador.pk).update(imagen=viejo)
+
+        migracion.renombrar_por_hash(apps, None)
+        trabajador.refresh_from_db()
+
+        self.assertRegex(trabajador.imagen.name, r"^trabajadores/[0-9a-f]{64}\.png$")
+        self.assertTrue(media_storage.exists(trabajador.imagen.name))
+        self.assertEqual(sorted(trabajador.imagen_miniaturas), ["160", "320"])
+        # The old copy is left for gc_media
+        self.assertTrue(media_storage.exists(viejo))
@@ -1,16 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     TrabajadorListView,
+    TrabajadorAsyncListView,
     TrabajadorCreateView,
     TrabajadorUpdateView,
     TrabajadorDeleteView,
+    TrabajadorExportView,
 )
 
 app_name = "trabajadores"
 
+# Variante asíncrona cuando se sirve con ASGI (ver carriacces.async_views)
+list_view = TrabajadorAsyncListView if settings.ASYNC_VIEWS else TrabajadorListView
+
 urlpatterns = [
-    path("", TrabajadorListView.as_view(), name="list"),
+    path("", list_view.as_view(), name="list"),
     path("agregar/", TrabajadorCreateView.as_view(), name="create"),
     path("<int:pk>/editar/", TrabajadorUpdateView.as_view(), name="update"),
     path("<int:pk>/eliminar/", TrabajadorDeleteView.as_view(), name="delete"),
+    path("exportar/", TrabajadorExportView.as_view(), name="export"),
 ]
@@ -1,26 +1,43 @@
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib import messages
+from carriacces.async_views import AsyncListMixin
+from carriacces.counts import CachedCountMixin
+from carriacces.exports import ExportView
+from carriacces.pagination import KeysetPaginationMixin
+from carriacces.routers import ReplicaReadMixin
+from carriacces.views import AtomicViewMixin, ReadOnlyViewMixin
 from .models import Trabajador
 from .forms import TrabajadorForm
 
 
-class TrabajadorListView(ListView):
+class TrabajadorListView(
+    ReadOnlyViewMixin,
+    ReplicaReadMixin,
+    CachedCountMixin,
+    KeysetPaginationMixin,
+    ListView,
+):
     """Vista para listar todos los trabajadores."""
 
     model = Trabajador
     template_name = "trabajadores/list.html"
     context_object_name = "trabajadores"
     paginate_by = 12  # 2 columnas x 6 filas
+    keyset_ordering = ("apellido", "nombre", "pk")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["title"] = "NUESTRO PERSONAL"
-        context["total_trabajadores"] = Trabajador.objects.count()
+        context["total_trabajadores"] = self.get_display_count()
         return context
 
 
-class TrabajadorCreateView(CreateView):
+class TrabajadorAsyncListView(AsyncListMixin, TrabajadorListView):
+    """Variante asíncrona del listado, usada al servir con ASGI."""
+
+
+class TrabajadorCreateView(AtomicViewMixin, CreateView):
     """Vista para crear un nuevo trabajador."""
 
     model = Trabajador
@@ -47,7 +64,7 @@ class TrabajadorCreateView(CreateView):
         return super().form_invalid(form)
 
 
-class TrabajadorUpdateView(UpdateView):
+class TrabajadorUpdateView(AtomicViewMixin, UpdateView):
     """Vista para editar un trabajador existente."""
 
     model = Trabajador
@@ -75,7 +92,7 @@ class TrabajadorUpdateView(UpdateView):
         return super().form_invalid(form)
 
 
-class TrabajadorDeleteView(DeleteView):
+class TrabajadorDeleteView(AtomicViewMixin, DeleteView):
     """Vista para eliminar un trabajador."""
 
     model = Trabajador
@@ -96,3 +113,19 @@ class TrabajadorDeleteView(DeleteView):
             request, f"El trabajador {nombre_completo} ha sido eliminado exitosamente."
         )
         return response
+
+
+class TrabajadorExportView(ExportView):
+    """Exporta todos los trabajadores en CSV o JSON."""
+
+    model = Trabajador
+    export_fields = (
+        "id",
+        "codigo_empleado",
+        "nombre",
+        "apellido",
+        "correo",
+        "cedula",
+        "created_at",
+        "updated_at",
+    )